@@ -0,0 +1,172 @@
+"""
+Carátulas de álbumes
+Descarga en segundo plano las miniaturas que pide la vista (solo filas
+visibles), las reduce con Pillow, las guarda en disco por ID + etiqueta de
+imagen y mantiene en memoria un LRU de QPixmap listos para pintar
+"""
+
+import glob
+import io
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
+
+from task_pool import TaskPool
+
+try:
+    from PIL import Image
+except ImportError:  # Dependencia opcional: sin Pillow se usa la imagen escalada por el servidor
+    Image = None
+
+
+def _ruta_miniatura(cache_dir: str, item_id: str, tag: Optional[str]) -> str:
+    return os.path.join(cache_dir, f"{item_id}_{tag or 'sin-tag'}.jpg")
+
+
+def _reducir(data: bytes, size: int, quality: int) -> bytes:
+    """Reduce una imagen a una miniatura JPEG de size x size como máximo"""
+    if Image is None:
+        return data
+    with Image.open(io.BytesIO(data)) as img:
+        # Con JPEG, draft decodifica directamente a una escala reducida
+        img.draft("RGB", (size, size))
+        img = img.convert("RGB")
+        img.thumbnail((size, size), Image.LANCZOS)
+        out = io.BytesIO()
+        img.save(out, "JPEG", quality=quality, optimize=True)
+        return out.getvalue()
+
+
+def tarea_cargar_miniatura(ctx, jellyfin_api, cache_dir, item_id, tag, size, quality):
+    """Tarea del pool: lee la miniatura del disco o la descarga y la guarda"""
+    path = _ruta_miniatura(cache_dir, item_id, tag)
+    if os.path.exists(path):
+        image = QImage(path)
+        if not image.isNull():
+            return image
+    
+    # El servidor ya la escala; Pillow la deja en el tamaño exacto y pequeña en disco.
+    # Un fallo de red o del servidor se relanza (se reintenta más tarde); None es un 404
+    data = jellyfin_api.obtener_imagen(
+        item_id, max_width=size * 2, max_height=size * 2, quality=quality, tag=tag,
+        lanzar_errores=True
+    )
+    if not data or ctx.is_cancelled():
+        return None
+    data = _reducir(data, size, quality)
+    
+    # Las miniaturas de etiquetas anteriores ya no sirven
+    for old in glob.glob(os.path.join(cache_dir, f"{glob.escape(item_id)}_*.jpg")):
+        if old != path:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Error al guardar la miniatura de {item_id}: {e}")
+    
+    image = QImage.fromData(data)
+    return None if image.isNull() else image
+
+
+class AlbumArtCache(QObject):
+    """Caché de miniaturas: LRU de QPixmap en memoria sobre una caché en disco"""
+    # Se emite (en el hilo de la UI) cuando la miniatura de un item está disponible
+    art_ready = pyqtSignal(str)
+    
+    # Descargas pendientes máximas: al desplazarse rápido se descartan las más viejas
+    MAX_PENDING = 64
+    # Segundos antes de volver a pedir una carátula cuya descarga falló
+    RETRY_S = 60.0
+    
+    def __init__(self, jellyfin_api, cache_dir: str, size: int = 32, max_pixmaps: int = 512,
+                 max_threads: int = 4, quality: int = 85, parent=None):
+        """
+        Args:
+            jellyfin_api: Instancia de JellyfinAPI
+            cache_dir: Directorio de la caché en disco
+            size: Lado de las miniaturas en píxeles
+            max_pixmaps: Miniaturas guardadas en memoria
+            max_threads: Descargas simultáneas
+            quality: Calidad JPEG pedida al servidor y usada al guardar
+        """
+        super().__init__(parent)
+        os.makedirs(cache_dir, exist_ok=True)
+        self.jellyfin_api = jellyfin_api
+        self.cache_dir = cache_dir
+        self.size = size
+        self.max_pixmaps = max_pixmaps
+        self.quality = quality
+        self._pixmaps: "OrderedDict[str, QPixmap]" = OrderedDict()
+        self._pending: "OrderedDict[str, None]" = OrderedDict()
+        self._missing = set()  # Items sin imagen en el servidor (404)
+        self._failed: Dict[str, float] = {}  # Item -> momento del último fallo transitorio
+        
+        # Pixmap transparente para las filas sin carátula cargada (todas las filas
+        # miden lo mismo, como requiere uniformItemSizes)
+        self.placeholder = QPixmap(size, size)
+        self.placeholder.fill(Qt.transparent)
+        
+        self._pool = TaskPool(max_threads, self)
+        self._pool.result_ready.connect(self._on_loaded)
+        self._pool.task_failed.connect(self._on_failed)
+    
+    def pixmap(self, item_id: str, tag: Optional[str] = None) -> Optional[QPixmap]:
+        """
+        Miniatura de un item; si no está en memoria se pide en segundo plano
+        
+        Returns:
+            El QPixmap, o None mientras se carga (o si el item no tiene imagen)
+        """
+        pixmap = self._pixmaps.get(item_id)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(item_id)
+            return pixmap
+        if item_id in self._pending or item_id in self._missing:
+            return None
+        failed_at = self._failed.get(item_id)
+        if failed_at is not None and time.monotonic() - failed_at < self.RETRY_S:
+            return None
+        self._request(item_id, tag)
+        return None
+    
+    def _request(self, item_id: str, tag: Optional[str]):
+        self._pending[item_id] = None
+        self._pool.submit(
+            f"art:{item_id}", tarea_cargar_miniatura,
+            self.jellyfin_api, self.cache_dir, item_id, tag, self.size, self.quality
+        )
+        while len(self._pending) > self.MAX_PENDING:
+            old_id, _ = self._pending.popitem(last=False)
+            self._pool.cancel(f"art:{old_id}")
+    
+    def _on_loaded(self, channel, request_id, image):
+        item_id = channel[len("art:"):]
+        self._pending.pop(item_id, None)
+        self._failed.pop(item_id, None)
+        if image is None:
+            self._missing.add(item_id)
+            return
+        self._pixmaps[item_id] = QPixmap.fromImage(image)
+        while len(self._pixmaps) > self.max_pixmaps:
+            self._pixmaps.popitem(last=False)
+        self.art_ready.emit(item_id)
+    
+    def _on_failed(self, channel, request_id, message):
+        item_id = channel[len("art:"):]
+        self._pending.pop(item_id, None)
+        self._failed[item_id] = time.monotonic()
+    
+    def cancel_pending(self):
+        """Cancela las descargas que todavía no empezaron"""
+        self._pool.cancel_all()
+        self._pending.clear()
@@ -0,0 +1,107 @@
+"""
+Caché de respuestas para JellyfinAPI
+LRU acotado en memoria con expiración opcional (TTL) y contadores de aciertos
+"""
+
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class ResponseCache:
+    """Caché LRU con TTL opcional, segura para usar desde varios hilos"""
+    
+    def __init__(self, max_entries: int = 256, ttl: Optional[float] = None):
+        """
+        Args:
+            max_entries: Cantidad máxima de respuestas guardadas (0 desactiva la caché)
+            ttl: Segundos que una respuesta se considera válida (None = sin expiración)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Devuelve el valor guardado para key, o default si no existe o expiró"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                if self.ttl is None or time.monotonic() - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+    
+    def put(self, key: Hashable, value: Any):
+        """Guarda un valor, descartando el menos usado si se supera el límite"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, key: Hashable):
+        """Elimina una entrada concreta"""
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def invalidate_namespace(self, namespace: str):
+        """Elimina todas las entradas de un método (primer elemento de la clave)"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == namespace]:
+                del self._entries[key]
+    
+    def clear(self):
+        """Vacía la caché"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> dict:
+        """Devuelve los contadores de la caché"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+def cached_response(method):
+    """
+    Decorador para métodos de JellyfinAPI que devuelven listas
+    
+    La clave es (nombre del método, *argumentos), con los argumentos en el
+    orden de la firma y los valores por defecto completados: buscar_canciones(q),
+    buscar_canciones(q, 50) y buscar_canciones(q, limit=50) comparten entrada.
+    Las listas vacías no se guardan, porque los métodos de la API también
+    devuelven [] cuando hay un error.
+    """
+    namespace = method.__name__
+    signature = inspect.signature(method)
+    
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        key = (namespace,) + bound.args[1:]
+        cached = self.cache.get(key)
+        if cached is not None:
+            return list(cached)
+        
+        result = method(self, *args, **kwargs)
+        if result:
+            self.cache.put(key, list(result))
+        return result
+    
+    return wrapper
@@ -0,0 +1,292 @@
+"""
+Caché local de audio
+Guarda en disco los archivos descargados de /Items/{id}/Download para que las
+canciones ya escuchadas se reproduzcan desde el disco. Tamaño acotado (LRU),
+descargas reanudables con Range y verificación del tamaño de cada archivo
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Callable, Iterable, Tuple
+
+import requests
+
+
+class AudioCache:
+    """Caché LRU de archivos de audio en disco"""
+    
+    MANIFEST = "cache.json"
+    CHUNK_SIZE = 64 * 1024
+    
+    def __init__(self, cache_dir: str, max_bytes: int, session: Optional[requests.Session] = None):
+        """
+        Abre (o crea) la caché
+        
+        Args:
+            cache_dir: Directorio donde se guardan los archivos
+            max_bytes: Tamaño máximo total de la caché en bytes
+            session: Sesión HTTP para las descargas (la de JellyfinAPI, con su token)
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.session = session or requests.Session()
+        self._lock = threading.Lock()
+        # item_id -> {"size": bytes, "etag": validador HTTP}; el orden es el de uso (LRU)
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._total_bytes = 0
+        self._load_manifest()
+    
+    def _path(self, item_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{item_id}.audio")
+    
+    def _part_path(self, item_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{item_id}.part")
+    
+    def _load_manifest(self):
+        """Carga el manifiesto descartando archivos ausentes, incompletos o huérfanos"""
+        try:
+            with open(os.path.join(self.cache_dir, self.MANIFEST), encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        
+        # El manifiesto guarda las entradas de la menos a la más usada
+        for item_id, entry in manifest.items():
+            try:
+                size = os.path.getsize(self._path(item_id))
+            except OSError:
+                continue
+            if size != entry.get("size"):
+                self._remove_file(self._path(item_id))
+                continue
+            self._entries[item_id] = entry
+            self._total_bytes += size
+        
+        for name in os.listdir(self.cache_dir):
+            item_id, ext = os.path.splitext(name)
+            if ext == ".audio" and item_id not in self._entries:
+                self._remove_file(os.path.join(self.cache_dir, name))
+    
+    def _save_manifest(self):
+        """Escribe el manifiesto de forma atómica (llamar con el lock tomado)"""
+        path = os.path.join(self.cache_dir, self.MANIFEST)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error al guardar el manifiesto de la caché de audio: {e}")
+    
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            # No existe o está abierto por el reproductor (Windows)
+            pass
+    
+    def local_path(self, item_id: str) -> Optional[str]:
+        """
+        Ruta del archivo en caché si está completo y conserva su tamaño
+        
+        Returns:
+            Ruta local, o None si la canción no está en caché
+        """
+        with self._lock:
+            entry = self._entries.get(item_id)
+            if entry is None:
+                return None
+            path = self._path(item_id)
+            try:
+                valid = os.path.getsize(path) == entry["size"]
+            except OSError:
+                valid = False
+            if not valid:
+                del self._entries[item_id]
+                self._total_bytes -= entry["size"]
+                self._remove_file(path)
+                self._save_manifest()
+                return None
+            self._entries.move_to_end(item_id)
+            return path
+    
+    def contains(self, item_id: str) -> bool:
+        with self._lock:
+            return item_id in self._entries
+    
+    def download(self, item_id: str, url: str,
+                 is_cancelled: Optional[Callable[[], bool]] = None,
+                 on_transfer: Optional[Callable[[int, float], None]] = None) -> Optional[str]:
+        """
+        Descarga una canción a la caché, reanudando una descarga parcial previa
+        
+        Args:
+            item_id: ID de la canción
+            url: URL de descarga del archivo original
+            is_cancelled: Función que indica si hay que abandonar la descarga
+                (lo ya descargado se conserva para reanudar)
+            on_transfer: Recibe (bytes, segundos) de lo transferido, para medir el caudal
+        
+        Returns:
+            Ruta local del archivo completo, o None si no se completó
+        """
+        path = self.local_path(item_id)
+        if path:
+            return path
+        
+        part_path = self._part_path(item_id)
+        etag_path = part_path + ".etag"
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        etag = None
+        if offset:
+            try:
+                with open(etag_path, encoding="utf-8") as f:
+                    etag = f.read().strip() or None
+            except OSError:
+                etag = None
+        
+        headers = {}
+        if offset and etag:
+            # If-Range: si el archivo cambió en el servidor llega completo (200)
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = etag
+        else:
+            offset = 0
+        
+        start = time.monotonic()
+        written = offset
+        try:
+            with self.session.get(url, headers=headers, stream=True, timeout=(5, 30)) as response:
+                if response.status_code == 206:
+                    total = self._total_from_content_range(response.headers.get("Content-Range"))
+                    mode = "ab"
+                elif response.status_code == 200:
+                    offset = 0
+                    length = response.headers.get("Content-Length")
+                    total = int(length) if length and length.isdigit() else None
+                    mode = "wb"
+                else:
+                    print(f"Error HTTP {response.status_code} al descargar {item_id}")
+                    return None
+                
+                validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+                if mode == "wb":
+                    if validator:
+                        with open(etag_path, "w", encoding="utf-8") as f:
+                            f.write(validator)
+                    else:
+                        self._remove_file(etag_path)
+                
+                written = offset
+                with open(part_path, mode) as f:
+                    for chunk in response.iter_content(self.CHUNK_SIZE):
+                        if is_cancelled and is_cancelled():
+                            return None
+                        f.write(chunk)
+                        written += len(chunk)
+        except (requests.RequestException, OSError) as e:
+            print(f"Error al descargar {item_id} a la caché: {e}")
+            return None
+        finally:
+            if on_transfer:
+                on_transfer(written - offset, time.monotonic() - start)
+        
+        # Verificación de integridad: el archivo debe tener el tamaño anunciado
+        if total is not None and written != total:
+            print(f"Descarga incompleta de {item_id}: {written} de {total} bytes")
+            if written > total:
+                self._remove_file(part_path)
+                self._remove_file(etag_path)
+            return None
+        
+        return self._commit(item_id, part_path, etag_path, written, validator)
+    
+    @staticmethod
+    def _total_from_content_range(value: Optional[str]) -> Optional[int]:
+        """Extrae el tamaño total de "bytes inicio-fin/total" """
+        if not value or "/" not in value:
+            return None
+        total = value.rsplit("/", 1)[1]
+        return int(total) if total.isdigit() else None
+    
+    def _commit(self, item_id: str, part_path: str, etag_path: str,
+                size: int, etag: Optional[str]) -> Optional[str]:
+        """Mueve una descarga completa a la caché y aplica el límite de tamaño"""
+        if size > self.max_bytes:
+            self._remove_file(part_path)
+            self._remove_file(etag_path)
+            return None
+        
+        path = self._path(item_id)
+        with self._lock:
+            try:
+                os.replace(part_path, path)
+            except OSError as e:
+                print(f"Error al guardar {item_id} en la caché: {e}")
+                return None
+            self._remove_file(etag_path)
+            
+            old = self._entries.pop(item_id, None)
+            if old is not None:
+                self._total_bytes -= old["size"]
+            self._entries[item_id] = {"size": size, "etag": etag, "saved_at": int(time.time())}
+            self._total_bytes += size
+            self._evict()
+            self._save_manifest()
+        return path
+    
+    def _evict(self):
+        """Elimina las canciones menos usadas hasta respetar max_bytes (con el lock tomado)"""
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            item_id, entry = self._entries.popitem(last=False)
+            self._total_bytes -= entry["size"]
+            self._remove_file(self._path(item_id))
+    
+    def fill(self, items: Iterable[Tuple[str, str]],
+             is_cancelled: Optional[Callable[[], bool]] = None,
+             on_transfer: Optional[Callable[[int, float], None]] = None) -> int:
+        """
+        Descarga en orden las canciones indicadas que no estén en caché
+        
+        Args:
+            items: Pares (item_id, url)
+            is_cancelled: Función que indica si hay que detenerse
+            on_transfer: Recibe (bytes, segundos) de cada descarga
+        
+        Returns:
+            Cantidad de canciones descargadas
+        """
+        descargadas = 0
+        for item_id, url in items:
+            if is_cancelled and is_cancelled():
+                break
+            if self.contains(item_id):
+                continue
+            if self.download(item_id, url, is_cancelled, on_transfer):
+                descargadas += 1
+        return descargadas
+    
+    def stats(self) -> Dict[str, int]:
+        """Cantidad de canciones y bytes ocupados"""
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._total_bytes,
+                    "max_bytes": self.max_bytes}
+    
+    def clear(self):
+        """Elimina todas las canciones de la caché"""
+        with self._lock:
+            for item_id in self._entries:
+                self._remove_file(self._path(item_id))
+            self._entries.clear()
+            self._total_bytes = 0
+            self._save_manifest()
+    
+    def close(self):
+        """Guarda el orden de uso actual"""
+        with self._lock:
+            self._save_manifest()
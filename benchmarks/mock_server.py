@@ -0,0 +1,313 @@
+"""
+Servidor Jellyfin simulado para los benchmarks
+Sirve una biblioteca sintética (determinista según la semilla) con los
+endpoints que usa la aplicación: /System/Info, /Users/{id}/Items, /Items,
+/Artists/AlbumArtists, /Items/{id}/Images/Primary, /Items/{id}/Download y
+/Audio/{id}/universal. La latencia de cada respuesta se puede inyectar y
+cambiar en caliente (server.latency_ms)
+"""
+
+import base64
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlparse
+
+_PALABRAS = (
+    "amor noche luna sol mar cielo fuego tierra viento lluvia sombra luz camino "
+    "ciudad sueño tiempo verano invierno río montaña estrella corazón silencio "
+    "eco ritmo danza canción memoria horizonte deseo niebla ocaso aurora "
+    "blue night dream electric golden midnight summer city heart wild fire "
+    "ocean silver echo shadow velvet neon paradise thunder crystal"
+).split()
+
+# JPEG de 1x1 píxel: las carátulas no se decodifican en los benchmarks de tiempos
+_JPEG_1X1 = base64.b64decode(
+    "/9j/4AAQSkZJRgABAQAAAQABAAD/2wBDAAgGBgcGBQgHBwcJCQgKDBQNDAsLDBkSEw8UHRofHh0a"
+    "HBwgJC4nICIsIxwcKDcpLDAxNDQ0Hyc5PTgyPC4zNDL/wAALCAABAAEBAREA/8QAFAABAAAAAAAA"
+    "AAAAAAAAAAAACf/EABQQAQAAAAAAAAAAAAAAAAAAAAD/2gAIAQEAAD8AKp//2Q=="
+)
+
+# 100 ns por tick (RunTimeTicks de Jellyfin)
+_TICKS_POR_SEGUNDO = 10_000_000
+
+
+class ItemOptions:
+    """Opciones de /Items que cambian el contenido de cada item, como en Jellyfin"""
+    
+    def __init__(self, params: Optional[Dict] = None):
+        params = params or {}
+        self.fields = set(filter(None, params.get("Fields", "").split(",")))
+        self.user_data = params.get("EnableUserData", "true").lower() != "false"
+        self.images = params.get("EnableImages", "true").lower() != "false"
+        self.image_types = set(filter(None, params.get("EnableImageTypes", "").split(",")))
+    
+    def add_images(self, item: Dict, tag: str):
+        if not self.images:
+            return
+        item["ImageTags"] = {"Primary": tag}
+        item["ImageBlurHashes"] = {"Primary": {tag: "eDGt]|00~q%MRjt7M{xuWBRj"}}
+        if not self.image_types or "Backdrop" in self.image_types:
+            item["BackdropImageTags"] = []
+            item["ParentBackdropImageTags"] = [tag]
+            item["ImageBlurHashes"]["Backdrop"] = {tag: "eDGt]|00~q%MRjt7M{xuWBRj"}
+
+
+class SyntheticLibrary:
+    """Biblioteca de música generada: álbumes ordenados por nombre, con artistas y canciones"""
+    
+    def __init__(self, albums: int = 1000, tracks_per_album: int = 12,
+                 artists: Optional[int] = None, seed: int = 0):
+        rng = random.Random(seed)
+        self.tracks_per_album = tracks_per_album
+        num_artists = artists or max(1, albums // 8)
+        self.artists = [
+            f"{rng.choice(_PALABRAS).title()} {rng.choice(_PALABRAS).title()} {i}"
+            for i in range(num_artists)
+        ]
+        nombres = [
+            " ".join(rng.choice(_PALABRAS) for _ in range(rng.randint(1, 4))).title() + f" {i}"
+            for i in range(albums)
+        ]
+        # El servidor devuelve los álbumes ordenados por SortName
+        nombres.sort(key=str.lower)
+        self.names = nombres
+        self.album_artist = [rng.randrange(num_artists) for _ in range(albums)]
+        self.years = [rng.randint(1960, 2024) for _ in range(albums)]
+        self._index = {self.album_id(i): i for i in range(albums)}
+    
+    def __len__(self):
+        return len(self.names)
+    
+    @staticmethod
+    def album_id(index: int) -> str:
+        return f"{index:032x}"
+    
+    @staticmethod
+    def track_id(album_index: int, track: int) -> str:
+        return f"{album_index:024x}{track:08x}"
+    
+    def album_index(self, album_id: str) -> Optional[int]:
+        return self._index.get(album_id)
+    
+    def album(self, index: int, options: Optional["ItemOptions"] = None) -> Dict:
+        """Item MusicAlbum como lo devuelve /Users/{id}/Items"""
+        options = options or ItemOptions()
+        artist = self.artists[self.album_artist[index]]
+        item = {
+            "Name": self.names[index],
+            "ServerId": "mock",
+            "Id": self.album_id(index),
+            "IsFolder": True,
+            "Type": "MusicAlbum",
+            "ProductionYear": self.years[index],
+            "Artists": [artist],
+            "ArtistItems": [{"Name": artist, "Id": f"{self.album_artist[index]:032x}"}],
+            "AlbumArtist": artist,
+            "AlbumArtists": [{"Name": artist, "Id": f"{self.album_artist[index]:032x}"}],
+            "LocationType": "FileSystem",
+        }
+        if "Overview" in options.fields:
+            item["Overview"] = f"Reseña del álbum {self.names[index]}. " * 3
+        if "PrimaryImageAspectRatio" in options.fields:
+            item["PrimaryImageAspectRatio"] = 1.0
+        if "DateCreated" in options.fields:
+            item["DateCreated"] = "2020-01-01T00:00:00.0000000Z"
+        if options.user_data:
+            item["UserData"] = {"PlaybackPositionTicks": 0, "PlayCount": 0, "IsFavorite": False,
+                                "Played": False, "Key": self.album_id(index)}
+        options.add_images(item, f"{index:08x}")
+        return item
+    
+    def tracks(self, index: int, options: Optional["ItemOptions"] = None) -> List[Dict]:
+        """Items Audio de un álbum"""
+        options = options or ItemOptions()
+        album = self.names[index]
+        artist = self.artists[self.album_artist[index]]
+        items = []
+        for n in range(1, self.tracks_per_album + 1):
+            item = {
+                "Name": f"{_PALABRAS[(index + n) % len(_PALABRAS)].title()} {n}",
+                "ServerId": "mock",
+                "Id": self.track_id(index, n),
+                "Type": "Audio",
+                "IndexNumber": n,
+                "RunTimeTicks": (150 + (index * 7 + n * 13) % 150) * _TICKS_POR_SEGUNDO,
+                "AlbumId": self.album_id(index),
+                "Album": album,
+                "AlbumArtist": artist,
+                "MediaType": "Audio",
+            }
+            if "Path" in options.fields:
+                item["Path"] = f"/music/{artist}/{album}/{n:02d}.flac"
+            if options.user_data:
+                item["UserData"] = {"PlaybackPositionTicks": 0, "PlayCount": 0, "IsFavorite": False,
+                                    "Played": False, "Key": self.track_id(index, n)}
+            options.add_images(item, f"{index:08x}")
+            items.append(item)
+        return items
+    
+    def search_albums(self, term: str) -> List[int]:
+        term = term.lower()
+        return [i for i, name in enumerate(self.names) if term in name.lower()]
+    
+    def search_tracks(self, term: str, limit: int, options: Optional[ItemOptions] = None) -> List[Dict]:
+        term = term.lower()
+        results = []
+        for i in self.search_albums(term)[:limit]:
+            results.extend(self.tracks(i, options)[:1])
+        return results
+    
+    def search_artists(self, term: str, limit: int) -> List[str]:
+        term = term.lower()
+        return [a for a in self.artists if term in a.lower()][:limit]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def do_GET(self):
+        server: "MockJellyfinServer" = self.server.mock
+        url = urlparse(self.path)
+        params = dict(parse_qsl(url.query))
+        server.count(url.path)
+        if server.latency_ms:
+            time.sleep(server.latency_ms / 1000.0)
+        
+        library = server.library
+        path = url.path
+        if path == "/System/Info":
+            return self._json({"ServerName": "mock", "Version": "10.8.13", "Id": "mock"})
+        if path == "/Artists/AlbumArtists":
+            limit = int(params.get("Limit", 20))
+            names = library.search_artists(params.get("SearchTerm", ""), limit)
+            return self._json({"Items": [{"Name": n} for n in names], "TotalRecordCount": len(names)})
+        if re.fullmatch(r"(/Users/[^/]+)?/Items", path):
+            return self._items(library, params)
+        
+        match = re.fullmatch(r"/Items/([^/]+)/Images/Primary", path)
+        if match:
+            return self._bytes(_JPEG_1X1, "image/jpeg")
+        match = re.fullmatch(r"/(?:Items/([^/]+)/Download|Audio/([^/]+)/universal)", path)
+        if match:
+            return self._audio(server.track_bytes)
+        self.send_error(404)
+    
+    def _items(self, library: SyntheticLibrary, params: Dict):
+        tipo = params.get("IncludeItemTypes")
+        search = params.get("SearchTerm")
+        parent_id = params.get("ParentId")
+        options = ItemOptions(params)
+        if parent_id:
+            index = library.album_index(parent_id)
+            items = library.tracks(index, options) if index is not None else []
+            return self._json({"Items": items, "TotalRecordCount": len(items)})
+        if tipo == "Audio" and search:
+            items = library.search_tracks(search, int(params.get("Limit", 50)), options)
+            return self._json({"Items": items, "TotalRecordCount": len(items)})
+        if tipo == "MusicAlbum":
+            if params.get("MinDateLastSaved"):
+                # La biblioteca sintética no cambia entre sincronizaciones
+                indices = []
+            elif search:
+                indices = library.search_albums(search)
+            else:
+                indices = range(len(library))
+            total = len(indices)
+            start = int(params.get("StartIndex", 0))
+            limit = int(params.get("Limit", total))
+            items = [library.album(i, options) for i in indices[start:start + limit]]
+            return self._json({"Items": items, "TotalRecordCount": total, "StartIndex": start})
+        return self._json({"Items": [], "TotalRecordCount": 0})
+    
+    def _json(self, data):
+        self._bytes(json.dumps(data, ensure_ascii=False).encode("utf-8"), "application/json")
+    
+    def _bytes(self, body: bytes, content_type: str, status: int = 200, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.mock.count_bytes(len(body))
+    
+    def _audio(self, size: int):
+        body = bytes(range(256)) * (size // 256 + 1)
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if not match:
+            return self._bytes(body[:size], "audio/mpeg", headers={"Accept-Ranges": "bytes"})
+        start = int(match.group(1))
+        end = min(int(match.group(2)) if match.group(2) else size - 1, size - 1)
+        if start >= size:
+            return self._bytes(b"", "audio/mpeg", 416, {"Content-Range": f"bytes */{size}"})
+        self._bytes(body[start:end + 1], "audio/mpeg", 206,
+                    {"Content-Range": f"bytes {start}-{end}/{size}", "Accept-Ranges": "bytes"})
+
+
+class MockJellyfinServer:
+    """Servidor HTTP local con una biblioteca sintética"""
+    
+    def __init__(self, library: SyntheticLibrary, latency_ms: float = 0.0,
+                 track_bytes: int = 1024 * 1024, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            library: Biblioteca a servir
+            latency_ms: Demora agregada a cada respuesta
+            track_bytes: Tamaño de cada archivo de audio servido
+            port: Puerto (0 = uno libre)
+        """
+        self.library = library
+        self.latency_ms = latency_ms
+        self.track_bytes = track_bytes
+        self.requests: Dict[str, int] = {}
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self._thread = None
+    
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def count(self, path: str):
+        # Agrupa por tipo de endpoint (sin IDs)
+        key = re.sub(r"/[0-9a-f]{24,}", "/{id}", path)
+        key = re.sub(r"^/Users/[^/]+", "/Users/{id}", key)
+        with self._lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+    
+    def count_bytes(self, size: int):
+        with self._lock:
+            self.bytes_sent += size
+    
+    def reset_stats(self):
+        with self._lock:
+            self.requests = {}
+            self.bytes_sent = 0
+    
+    def start(self) -> "MockJellyfinServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-jellyfin", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
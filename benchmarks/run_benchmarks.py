@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Benchmarks del reproductor contra un servidor Jellyfin simulado
+Mide, sin red ni audio (Qt offscreen), cómo escalan con el tamaño de la
+biblioteca:
+
+- album_load: carga paginada de álbumes (API sola y ventana, índice local
+  vacío, arranque con el índice guardado y sincronización incremental)
+- track_load: canciones de un álbum (primera vez y ya guardadas)
+- search: latencia por tecla del filtro local
+- queue: reconstrucción de la cola (reemplazar, agregar, marcar la actual, mezclar)
+
+El resultado es un JSON (salida estándar o --output) para comparar versiones.
+
+Uso:
+    python benchmarks/run_benchmarks.py --albums 1000 20000 --latency-ms 0 20
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QT_VERSION_STR, PYQT_VERSION_STR
+from PyQt5.QtWidgets import QApplication, QMessageBox
+
+from mock_server import MockJellyfinServer, SyntheticLibrary
+
+SCHEMA_VERSION = 1
+BENCHMARKS = ("album_load", "track_load", "search", "queue")
+
+
+def resumen(samples_s):
+    """Estadísticas en ms de una lista de duraciones en segundos"""
+    if not samples_s:
+        return {"n": 0}
+    ms = sorted(s * 1000 for s in samples_s)
+    return {
+        "n": len(ms),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "p50_ms": round(ms[len(ms) // 2], 3),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 3),
+        "max_ms": round(ms[-1], 3),
+    }
+
+
+def esperar(app, condicion, timeout_s=600.0):
+    """Procesa eventos de Qt hasta que condicion() sea verdadera"""
+    limite = time.perf_counter() + timeout_s
+    while not condicion():
+        if time.perf_counter() > limite:
+            raise TimeoutError("El benchmark no terminó a tiempo")
+        app.processEvents()
+        time.sleep(0.0005)
+
+
+class Resultados:
+    """Registra cuándo llega cada resultado de un canal del pool de la ventana"""
+    
+    def __init__(self, window):
+        self.results = {}
+        self.partials = {}
+        window.task_pool.result_ready.connect(self._on_result)
+        window.task_pool.partial_result.connect(self._on_partial)
+    
+    def _on_result(self, channel, request_id, result):
+        self.results[channel] = time.perf_counter()
+    
+    def _on_partial(self, channel, request_id, value):
+        self.partials.setdefault(channel, time.perf_counter())
+    
+    def reset(self, channel):
+        self.results.pop(channel, None)
+        self.partials.pop(channel, None)
+
+
+def configurar(data_dir, url, args):
+    """Apunta la configuración de la aplicación a un directorio temporal y al servidor simulado"""
+    import config_ui
+    import jellyfin_api
+    
+    jellyfin_api.DEFAULT_CONFIG["JELLYFIN_URL"] = url
+    config_ui.INTERFACE_CONFIG["auto_connect"] = False
+    config_ui.LIBRARY_CONFIG["db_path"] = os.path.join(data_dir, "library.db")
+    config_ui.LIBRARY_CONFIG["enable_local_index"] = True
+    config_ui.PLAYBACK_CONFIG["session_path"] = os.path.join(data_dir, "queue.json")
+    config_ui.PLAYBACK_CONFIG["audio_cache_dir"] = os.path.join(data_dir, "audio")
+    config_ui.UI_CONFIG["album_art_cache_dir"] = os.path.join(data_dir, "art")
+    config_ui.UI_CONFIG["show_album_art"] = args.with_art
+    # Solo el filtro local: la búsqueda en el servidor es asíncrona y no bloquea la tecla
+    config_ui.UI_CONFIG["search_mode"] = "local"
+
+
+def crear_ventana(app):
+    from reproductor_gui_ui import ReproductorJellyfinUI
+    
+    window = ReproductorJellyfinUI()
+    window.show()
+    return window
+
+
+def ventana_con_catalogo(app, library):
+    """Ventana con todos los álbumes cargados (sincroniza el índice si hace falta)"""
+    window = crear_ventana(app)
+    # Primer ciclo del event loop: carga el índice local guardado
+    app.processEvents()
+    if window.album_model.rowCount() < len(library):
+        resultados = Resultados(window)
+        window.load_albums()
+        esperar(app, lambda: "albums" in resultados.results)
+    esperar(app, lambda: window.search_index is not None)
+    return window
+
+
+def cerrar_ventana(app, window):
+    window.close()
+    window.task_pool.wait_for_done(10000)
+    if window.library_store:
+        window.library_store.close()
+    window.deleteLater()
+    app.processEvents()
+
+
+def cargar_albumes_api(server, page_size, lean_fetch):
+    """Carga paginada con JellyfinAPI sola: tiempos, bytes recibidos y pico de memoria"""
+    from jellyfin_api import JellyfinAPI, DEFAULT_CONFIG
+    
+    api = JellyfinAPI(server.url, DEFAULT_CONFIG["API_KEY"], DEFAULT_CONFIG["USER_ID"], lean_fetch=lean_fetch)
+    bytes_before = server.bytes_sent
+    start = time.perf_counter()
+    first_page = None
+    total = 0
+    for page in api.iterar_paginas_albumes(page_size):
+        if first_page is None:
+            first_page = time.perf_counter() - start
+        total += len(page)
+    api_s = time.perf_counter() - start
+    bytes_received = server.bytes_sent - bytes_before
+    
+    # Segunda pasada con tracemalloc (su costo no debe afectar los tiempos)
+    tracemalloc.start()
+    for page in api.iterar_paginas_albumes(page_size):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "albums": total,
+        "first_page_ms": round(first_page * 1000, 3),
+        "total_ms": round(api_s * 1000, 3),
+        "albums_per_s": round(total / api_s, 1),
+        "bytes": bytes_received,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def bench_album_load(app, server, library, args):
+    page_size = args.page_size
+    result = {
+        "api": cargar_albumes_api(server, page_size, lean_fetch=True),
+        "api_all_fields": cargar_albumes_api(server, page_size, lean_fetch=False),
+    }
+    
+    # Ventana con el índice local vacío: sincronización completa
+    window = crear_ventana(app)
+    app.processEvents()
+    resultados = Resultados(window)
+    start = time.perf_counter()
+    window.load_albums()
+    esperar(app, lambda: "albums" in resultados.results)
+    esperar(app, lambda: window.search_index is not None)
+    result["ui_cold"] = {
+        "first_page_ms": round((resultados.partials.get("albums", start) - start) * 1000, 3),
+        "finished_ms": round((resultados.results["albums"] - start) * 1000, 3),
+        "search_index_ms": round((time.perf_counter() - start) * 1000, 3),
+        "rows": window.album_model.rowCount(),
+    }
+    
+    # Sincronización incremental sobre el índice ya guardado
+    resultados.reset("albums")
+    start = time.perf_counter()
+    window.load_albums()
+    esperar(app, lambda: "albums" in resultados.results)
+    result["ui_incremental_sync_ms"] = round((resultados.results["albums"] - start) * 1000, 3)
+    cerrar_ventana(app, window)
+    
+    # Arranque con el índice guardado: hasta ver el catálogo completo
+    start = time.perf_counter()
+    window = crear_ventana(app)
+    esperar(app, lambda: window.album_model.rowCount() == len(library))
+    result["ui_warm_start_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    cerrar_ventana(app, window)
+    return result
+
+
+def bench_track_load(app, server, library, args):
+    window = ventana_con_catalogo(app, library)
+    resultados = Resultados(window)
+    rng = random.Random(1)
+    rows = [rng.randrange(window.album_filter.rowCount()) for _ in range(args.track_samples)]
+    
+    def cargar(row):
+        resultados.reset("songs")
+        start = time.perf_counter()
+        window.on_album_selected(window.album_filter.index(row, 0))
+        esperar(app, lambda: "songs" in resultados.results)
+        return resultados.results["songs"] - start
+    
+    # Primera vez: del servidor; segunda: índice local + caché de respuestas
+    cold = [cargar(row) for row in rows]
+    warm = [cargar(row) for row in rows]
+    cerrar_ventana(app, window)
+    return {"cold": resumen(cold), "warm": resumen(warm)}
+
+
+def bench_search(app, server, library, args):
+    window = ventana_con_catalogo(app, library)
+    rng = random.Random(2)
+    queries = [library.names[rng.randrange(len(library))].split()[0] for _ in range(args.search_queries)]
+    keystrokes = []
+    matches = []
+    for query in queries:
+        for n in range(1, len(query) + 1):
+            window.searchInput.setText(query[:n])
+            # Se omite la espera del debounce: se mide el trabajo al aplicarlo
+            start = time.perf_counter()
+            window.aplicar_busqueda()
+            keystrokes.append(time.perf_counter() - start)
+        matches.append(window.album_filter.rowCount())
+        window.searchInput.setText("")
+        window.aplicar_busqueda()
+    cerrar_ventana(app, window)
+    result = resumen(keystrokes)
+    result["queries"] = len(queries)
+    result["mean_matches"] = round(statistics.fmean(matches), 1) if matches else 0
+    return result
+
+
+def bench_queue(app, server, library, args):
+    window = crear_ventana(app)
+    result = {}
+    for size in args.queue_sizes:
+        songs = [
+            {"Id": f"{i:032x}", "Titulo": f"Canción {i}", "Numero": i % 20 + 1, "Duracion": "03:30"}
+            for i in range(size)
+        ]
+        times = {}
+        start = time.perf_counter()
+        window.queue_model.set_songs(songs, 0)
+        window.actualizar_lista_cola()
+        times["replace_ms"] = time.perf_counter() - start
+        
+        chunk = songs[:max(1, size // 10)]
+        start = time.perf_counter()
+        window.queue_model.append_songs(chunk)
+        window.actualizar_lista_cola()
+        times["append_10pct_ms"] = time.perf_counter() - start
+        
+        advance = []
+        for _ in range(min(100, size - 1)):
+            start = time.perf_counter()
+            window.queue.current += 1
+            window.actualizar_lista_cola()
+            advance.append(time.perf_counter() - start)
+        
+        start = time.perf_counter()
+        window.queue_model.shuffle_remaining()
+        times["shuffle_ms"] = time.perf_counter() - start
+        app.processEvents()
+        
+        entry = {key: round(value * 1000, 3) for key, value in times.items()}
+        entry["advance"] = resumen(advance)
+        result[str(size)] = entry
+    window.queue_model.clear()
+    cerrar_ventana(app, window)
+    return result
+
+
+def ejecutar(app, albums, latency_ms, args):
+    library = SyntheticLibrary(albums, args.tracks_per_album, seed=args.seed)
+    data_dir = tempfile.mkdtemp(prefix="jellystream-bench-")
+    run = {"albums": albums, "latency_ms": latency_ms, "results": {}}
+    try:
+        with MockJellyfinServer(library, latency_ms) as server:
+            configurar(data_dir, server.url, args)
+            # Siempre en el mismo orden: album_load mide con el índice local vacío
+            for name in (n for n in BENCHMARKS if n in args.only):
+                print(f"⏱️  {name}: {albums} álbumes, {latency_ms} ms de latencia", file=sys.stderr)
+                server.reset_stats()
+                bench = globals()[f"bench_{name}"]
+                result = bench(app, server, library, args)
+                result["requests"] = dict(server.requests)
+                result["bytes_sent"] = server.bytes_sent
+                run["results"][name] = result
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    return run
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de jellyStream contra un servidor simulado")
+    parser.add_argument("--albums", type=int, nargs="+", default=[1000, 10000],
+                        help="Tamaños de biblioteca (1000 a 200000)")
+    parser.add_argument("--latency-ms", type=float, nargs="+", default=[0.0],
+                        help="Latencia inyectada en cada respuesta del servidor")
+    parser.add_argument("--tracks-per-album", type=int, default=12)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--track-samples", type=int, default=20)
+    parser.add_argument("--search-queries", type=int, default=20)
+    parser.add_argument("--queue-sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--with-art", action="store_true", help="Pedir carátulas durante los benchmarks")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", "-o", help="Archivo JSON de salida (por defecto, salida estándar)")
+    args = parser.parse_args()
+    
+    stdout = sys.stdout
+    # Los mensajes de la aplicación van a stderr para no mezclarse con el JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        app = QApplication(sys.argv[:1])
+        for name in ("critical", "warning", "information"):
+            setattr(QMessageBox, name, staticmethod(lambda *a, **k: QMessageBox.Ok))
+        runs = [
+            ejecutar(app, albums, latency_ms, args)
+            for albums in args.albums
+            for latency_ms in args.latency_ms
+        ]
+    
+    report = {
+        "schema": SCHEMA_VERSION,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "environment": {
+            "python": platform.python_version(),
+            "qt": QT_VERSION_STR,
+            "pyqt": PYQT_VERSION_STR,
+            "platform": platform.platform(),
+        },
+        "parameters": {
+            key: value for key, value in vars(args).items() if key not in ("output",)
+        },
+        "runs": runs,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"✅ Resultados guardados en {args.output}", file=sys.stderr)
+    else:
+        stdout.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
 # Configuración para la versión con archivos .ui
 # Este archivo contiene configuraciones para personalizar el comportamiento del reproductor
 
+import os
+
+# Directorio donde se guardan los datos locales (índice, cachés, sesión)
+DATA_DIR = os.path.join(os.path.expanduser("~"), ".jellystream")
+
 # Configuración de la interfaz
 INTERFACE_CONFIG = {
     "window_title": "Reproductor jellyStream",
@@ -31,12 +36,15 @@ STYLE_CONFIG = {
 # Configuración de funcionalidad
 FEATURE_CONFIG = {
     "enable_visualizer": True,
+    "spectrum_streams": False,  # Espectro real también sin caché: cada canción se descarga dos veces
     "enable_search": True,
     "enable_shuffle": True,
     "auto_play_next": True,
     "show_progress_bar": True,
     "enable_volume_control": True,
-    "enable_balance_control": True
+    "enable_balance_control": True,
+    "metrics_dump_interval_s": 60,  # Volcado periódico de métricas (0 = desactivado)
+    "metrics_dir": os.path.join(DATA_DIR, "metrics")  # metrics.json y metrics.prom
 }
 
 # Configuración de reproducción
@@ -45,16 +53,59 @@ PLAYBACK_CONFIG = {
     "default_balance": 0,
     "auto_advance": True,
     "fade_duration": 0.5,
-    "cache_duration": 1.5
+    "cache_duration": 1.5,  # Segundos de búfer de red de VLC antes de empezar a sonar
+    "file_cache_duration": 0.3,  # Búfer de VLC para las canciones de la caché de audio
+    "fast_start": True,  # Inicializar VLC poco después de mostrar la ventana y analizar el álbum seleccionado
+    "preparse_tracks": 4,  # Canciones del álbum seleccionado que VLC analiza por adelantado
+    "gapless": True,  # Precargar la siguiente canción de la cola
+    "audio_cache_mb": 2048,  # Tamaño máximo de la caché de audio en disco (0 = sin caché)
+    "audio_cache_dir": os.path.join(DATA_DIR, "audio"),
+    "audio_cache_prefetch": 2,  # Canciones siguientes de la cola que se descargan por adelantado
+    "stream_quality": "auto",  # "auto" (según el caudal medido), "original" o bitrate fijo en kbps
+    "stream_tiers_kbps": [320, 192, 128, 96, 64],  # Niveles de transcodificación
+    "stream_original_min_kbps": 1500,  # Caudal útil mínimo para pedir el archivo original
+    "transcode_container": "mp3",
+    "transcode_codec": "mp3",
+    "restore_session": True,  # Restaurar la cola y la posición al iniciar
+    "session_path": os.path.join(DATA_DIR, "queue.json")
+}
+
+# Configuración de la biblioteca
+LIBRARY_CONFIG = {
+    "album_page_size": 200,  # Álbumes por página al cargar la biblioteca
+    "worker_threads": 4,  # Hilos del pool de tareas en segundo plano
+    "enable_local_index": True,  # Guardar el catálogo en SQLite y sincronizar solo cambios
+    "db_path": os.path.join(DATA_DIR, "library.db"),
+    "response_cache_size": 256,  # Respuestas de la API guardadas en memoria (0 = sin caché)
+    "response_cache_ttl": 600,  # Segundos de validez de cada respuesta (None = sin expiración)
+    "lean_fetch": True  # Pedir al servidor solo los campos que se muestran (respuestas más chicas)
+}
+
+# Configuración de red (peticiones a la API de Jellyfin)
+NETWORK_CONFIG = {
+    "pool_size": 16,  # Conexiones keep-alive al servidor (hilos del pool + carátulas + descargas)
+    "connect_timeout": 5,  # Segundos máximos para conectar
+    "read_timeout": 30,  # Segundos máximos sin recibir datos
+    "retries": 3,  # Reintentos de cada consulta tras un error de red o un 5xx
+    "backoff_base": 0.5,  # Espera máxima antes del primer reintento (se duplica en cada uno)
+    "backoff_max": 8,  # Tope de la espera entre reintentos
+    "breaker_failures": 5,  # Fallos seguidos que cortan las peticiones al servidor
+    "breaker_reset_s": 30  # Segundos con las peticiones cortadas antes de volver a probar
 }
 
 # Configuración de la interfaz de usuario
 UI_CONFIG = {
-    "show_album_art": False,  # Futura funcionalidad
+    "show_album_art": True,  # Miniaturas de carátulas en la lista de álbumes
+    "album_art_size": 32,  # Lado de las miniaturas en píxeles
+    "album_art_memory_items": 512,  # Miniaturas guardadas en memoria
+    "album_art_cache_dir": os.path.join(DATA_DIR, "art"),
     "show_lyrics": False,      # Futura funcionalidad
     "enable_dark_mode": True,
     "enable_animations": True,
-    "show_tooltips": True
+    "show_tooltips": True,
+    "search_debounce_ms": 150,  # Espera tras la última tecla antes de filtrar
+    "search_mode": "hybrid",  # "hybrid" (local + servidor) o "local"
+    "server_search_min_chars": 3  # Largo mínimo de la consulta para buscar en el servidor
 }
 
 def get_config():
@@ -66,6 +117,8 @@ def get_config():
         "style": STYLE_CONFIG,
         "features": FEATURE_CONFIG,
         "playback": PLAYBACK_CONFIG,
+        "library": LIBRARY_CONFIG,
+        "network": NETWORK_CONFIG,
         "ui": UI_CONFIG
     }
 
@@ -86,6 +139,10 @@ def update_config(section, key, value):
         FEATURE_CONFIG[key] = value
     elif section == "playback" and key in PLAYBACK_CONFIG:
         PLAYBACK_CONFIG[key] = value
+    elif section == "library" and key in LIBRARY_CONFIG:
+        LIBRARY_CONFIG[key] = value
+    elif section == "network" and key in NETWORK_CONFIG:
+        NETWORK_CONFIG[key] = value
     elif section == "ui" and key in UI_CONFIG:
         UI_CONFIG[key] = value
     else:
@@ -53,9 +53,10 @@ def main():
     """Función principal"""
     print("🎨 Creando íconos de respaldo...")
     
-    # Crear directorio icons si no existe
-    if not os.path.exists('icons'):
-        os.makedirs('icons')
+    # Crear directorio icons (junto al script) si no existe
+    icons_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'icons')
+    if not os.path.exists(icons_dir):
+        os.makedirs(icons_dir)
         print("📁 Creado directorio 'icons'")
     
     # Definir íconos a crear
@@ -71,7 +72,7 @@ def main():
     
     # Crear cada ícono
     for filename, symbol in icons.items():
-        filepath = os.path.join('icons', filename)
+        filepath = os.path.join(icons_dir, filename)
         create_icon(symbol, filepath)
     
     print("\n🎉 ¡Íconos creados exitosamente!")
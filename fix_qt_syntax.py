@@ -8,6 +8,81 @@ import os
 import sys
 import re
 
+# Mapeo de correcciones Qt6 → Qt5
+CORRECTIONS = {
+    # QFrame
+    r'QFrame::Shape::Box': 'QFrame::Box',
+    r'QFrame::Shape::NoFrame': 'QFrame::NoFrame',
+    r'QFrame::Shadow::Raised': 'QFrame::Raised',
+    r'QFrame::Shadow::Sunken': 'QFrame::Sunken',
+    r'QFrame::Shadow::Plain': 'QFrame::Plain',
+    
+    # Qt Orientation
+    r'Qt::Orientation::Horizontal': 'Qt::Horizontal',
+    r'Qt::Orientation::Vertical': 'Qt::Vertical',
+    
+    # Qt Alignment
+    r'Qt::AlignmentFlag::AlignCenter': 'Qt::AlignCenter',
+    r'Qt::AlignmentFlag::AlignLeft': 'Qt::AlignLeft',
+    r'Qt::AlignmentFlag::AlignRight': 'Qt::AlignRight',
+    r'Qt::AlignmentFlag::AlignTop': 'Qt::AlignTop',
+    r'Qt::AlignmentFlag::AlignBottom': 'Qt::AlignBottom',
+    r'Qt::AlignmentFlag::AlignVCenter': 'Qt::AlignVCenter',
+    r'Qt::AlignmentFlag::AlignHCenter': 'Qt::AlignHCenter',
+    
+    # Qt Window Flags
+    r'Qt::WindowType::Window': 'Qt::Window',
+    r'Qt::WindowType::Dialog': 'Qt::Dialog',
+    r'Qt::WindowType::Tool': 'Qt::Tool',
+    
+    # QSlider
+    r'QSlider::TickPosition::TicksAbove': 'QSlider::TicksAbove',
+    r'QSlider::TickPosition::TicksBelow': 'QSlider::TicksBelow',
+    r'QSlider::TickPosition::TicksBothSides': 'QSlider::TicksBothSides',
+    r'QSlider::TickPosition::NoTicks': 'QSlider::NoTicks',
+    
+    # QComboBox
+    r'QComboBox::InsertPolicy::InsertAtTop': 'QComboBox::InsertAtTop',
+    r'QComboBox::InsertPolicy::InsertAtBottom': 'QComboBox::InsertAtBottom',
+    r'QComboBox::InsertPolicy::InsertAtCurrent': 'QComboBox::InsertAtCurrent',
+    r'QComboBox::InsertPolicy::InsertAfterCurrent': 'QComboBox::InsertAfterCurrent',
+    r'QComboBox::InsertPolicy::InsertBeforeCurrent': 'QComboBox::InsertBeforeCurrent',
+    r'QComboBox::InsertPolicy::InsertAlphabetically': 'QComboBox::InsertAlphabetically',
+    
+    # QTabWidget
+    r'QTabWidget::TabPosition::North': 'QTabWidget::North',
+    r'QTabWidget::TabPosition::South': 'QTabWidget::South',
+    r'QTabWidget::TabPosition::East': 'QTabWidget::East',
+    r'QTabWidget::TabPosition::West': 'QTabWidget::West',
+    
+    # QTabBar
+    r'QTabBar::Shape::RoundedNorth': 'QTabBar::RoundedNorth',
+    r'QTabBar::Shape::RoundedSouth': 'QTabBar::RoundedSouth',
+    r'QTabBar::Shape::RoundedEast': 'QTabBar::RoundedEast',
+    r'QTabBar::Shape::RoundedWest': 'QTabBar::RoundedWest',
+    r'QTabBar::Shape::TriangularNorth': 'QTabBar::TriangularNorth',
+    r'QTabBar::Shape::TriangularSouth': 'QTabBar::TriangularSouth',
+    r'QTabBar::Shape::TriangularEast': 'QTabBar::TriangularEast',
+    r'QTabBar::Shape::TriangularWest': 'QTabBar::TriangularWest',
+}
+
+def fix_qt_syntax_content(content):
+    """
+    Corrige la sintaxis de Qt6 a Qt5 en el contenido de un archivo .ui
+    
+    Args:
+        content: Texto XML del archivo .ui
+        
+    Returns:
+        (contenido corregido, lista de (patrón, reemplazo, ocurrencias))
+    """
+    changes = []
+    for old_pattern, new_pattern in CORRECTIONS.items():
+        content, count = re.subn(old_pattern, new_pattern, content)
+        if count:
+            changes.append((old_pattern, new_pattern, count))
+    return content, changes
+
 def fix_qt_syntax(file_path):
     """
     Corrige la sintaxis de Qt6 a Qt5 en un archivo .ui
@@ -25,72 +100,12 @@ def fix_qt_syntax(file_path):
     with open(file_path, 'r', encoding='utf-8') as f:
         content = f.read()
     
-    # Mapeo de correcciones
-    corrections = {
-        # QFrame
-        r'QFrame::Shape::Box': 'QFrame::Box',
-        r'QFrame::Shape::NoFrame': 'QFrame::NoFrame',
-        r'QFrame::Shadow::Raised': 'QFrame::Raised',
-        r'QFrame::Shadow::Sunken': 'QFrame::Sunken',
-        r'QFrame::Shadow::Plain': 'QFrame::Plain',
-        
-        # Qt Orientation
-        r'Qt::Orientation::Horizontal': 'Qt::Horizontal',
-        r'Qt::Orientation::Vertical': 'Qt::Vertical',
-        
-        # Qt Alignment
-        r'Qt::AlignmentFlag::AlignCenter': 'Qt::AlignCenter',
-        r'Qt::AlignmentFlag::AlignLeft': 'Qt::AlignLeft',
-        r'Qt::AlignmentFlag::AlignRight': 'Qt::AlignRight',
-        r'Qt::AlignmentFlag::AlignTop': 'Qt::AlignTop',
-        r'Qt::AlignmentFlag::AlignBottom': 'Qt::AlignBottom',
-        r'Qt::AlignmentFlag::AlignVCenter': 'Qt::AlignVCenter',
-        r'Qt::AlignmentFlag::AlignHCenter': 'Qt::AlignHCenter',
-        
-        # Qt Window Flags
-        r'Qt::WindowType::Window': 'Qt::Window',
-        r'Qt::WindowType::Dialog': 'Qt::Dialog',
-        r'Qt::WindowType::Tool': 'Qt::Tool',
-        
-        # QSlider
-        r'QSlider::TickPosition::TicksAbove': 'QSlider::TicksAbove',
-        r'QSlider::TickPosition::TicksBelow': 'QSlider::TicksBelow',
-        r'QSlider::TickPosition::TicksBothSides': 'QSlider::TicksBothSides',
-        r'QSlider::TickPosition::NoTicks': 'QSlider::NoTicks',
-        
-        # QComboBox
-        r'QComboBox::InsertPolicy::InsertAtTop': 'QComboBox::InsertAtTop',
-        r'QComboBox::InsertPolicy::InsertAtBottom': 'QComboBox::InsertAtBottom',
-        r'QComboBox::InsertPolicy::InsertAtCurrent': 'QComboBox::InsertAtCurrent',
-        r'QComboBox::InsertPolicy::InsertAfterCurrent': 'QComboBox::InsertAfterCurrent',
-        r'QComboBox::InsertPolicy::InsertBeforeCurrent': 'QComboBox::InsertBeforeCurrent',
-        r'QComboBox::InsertPolicy::InsertAlphabetically': 'QComboBox::InsertAlphabetically',
-        
-        # QTabWidget
-        r'QTabWidget::TabPosition::North': 'QTabWidget::North',
-        r'QTabWidget::TabPosition::South': 'QTabWidget::South',
-        r'QTabWidget::TabPosition::East': 'QTabWidget::East',
-        r'QTabWidget::TabPosition::West': 'QTabWidget::West',
-        
-        # QTabBar
-        r'QTabBar::Shape::RoundedNorth': 'QTabBar::RoundedNorth',
-        r'QTabBar::Shape::RoundedSouth': 'QTabBar::RoundedSouth',
-        r'QTabBar::Shape::RoundedEast': 'QTabBar::RoundedEast',
-        r'QTabBar::Shape::RoundedWest': 'QTabBar::RoundedWest',
-        r'QTabBar::Shape::TriangularNorth': 'QTabBar::TriangularNorth',
-        r'QTabBar::Shape::TriangularSouth': 'QTabBar::TriangularSouth',
-        r'QTabBar::Shape::TriangularEast': 'QTabBar::TriangularEast',
-        r'QTabBar::Shape::TriangularWest': 'QTabBar::TriangularWest',
-    }
-    
     # Aplicar correcciones
+    content, changes = fix_qt_syntax_content(content)
     changes_made = 0
-    for old_pattern, new_pattern in corrections.items():
-        matches = re.findall(old_pattern, content)
-        if matches:
-            content = re.sub(old_pattern, new_pattern, content)
-            changes_made += len(matches)
-            print(f"  ✅ Corregido: {old_pattern} → {new_pattern} ({len(matches)} ocurrencias)")
+    for old_pattern, new_pattern, count in changes:
+        changes_made += count
+        print(f"  ✅ Corregido: {old_pattern} → {new_pattern} ({count} ocurrencias)")
     
     # Guardar el archivo corregido
     if changes_made > 0:
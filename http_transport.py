@@ -0,0 +1,203 @@
+"""
+Transporte HTTP de JellyfinAPI
+Pool de conexiones dimensionado, tiempos máximos de conexión y lectura,
+reintentos con espera exponencial y jitter para los GET (son idempotentes),
+compresión de respuestas (gzip, y br si está instalado brotli) y un
+disyuntor (circuit breaker) que, tras varios fallos seguidos, rechaza las
+peticiones al instante durante un tiempo en lugar de esperar cada timeout
+"""
+
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import brotli  # noqa: F401  Dependencia opcional: urllib3 la usa para decodificar br
+except ImportError:
+    try:
+        import brotlicffi as brotli  # noqa: F401
+    except ImportError:
+        brotli = None
+
+from metrics import REGISTRY, endpoint_label
+
+REGISTRY.describe("jellyfin_retries_total", "Reintentos de peticiones GET al servidor")
+REGISTRY.describe("jellyfin_circuit_open_total", "Veces que el disyuntor cortó las peticiones al servidor")
+
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+
+# Códigos que indican un fallo transitorio del servidor o de un proxy
+RETRY_STATUS = frozenset((429, 500, 502, 503, 504))
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """El disyuntor está abierto: el servidor falló varias veces seguidas"""
+
+
+class CircuitBreaker:
+    """
+    Disyuntor de tres estados, seguro entre hilos
+    
+    closed: las peticiones pasan; failure_threshold fallos seguidos lo abren.
+    open: se rechazan las peticiones hasta que pasan reset_timeout segundos.
+    half_open: se deja pasar una sola petición de prueba; si funciona se
+    cierra y si falla vuelve a abrirse
+    """
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+    
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+    
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+    
+    def allow(self) -> bool:
+        """Indica si una petición puede salir; en half_open solo autoriza una"""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+    
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or (self._opened_at is None and self._failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+                REGISTRY.inc("jellyfin_circuit_open_total")
+            self._probing = False
+    
+    def reset(self):
+        self.record_success()
+
+
+class HttpTransport:
+    """Política de conexión y reintentos compartida por las peticiones de JellyfinAPI"""
+    
+    def __init__(self, pool_size: int = 16, connect_timeout: float = 5.0, read_timeout: float = 30.0,
+                 retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 breaker: Optional[CircuitBreaker] = None):
+        """
+        Args:
+            pool_size: Conexiones keep-alive máximas hacia el servidor
+                (al menos los hilos del pool de tareas más las descargas)
+            connect_timeout: Segundos máximos para establecer la conexión
+            read_timeout: Segundos máximos sin recibir datos
+            retries: Reintentos de cada GET tras un fallo transitorio
+            backoff_base: Espera máxima antes del primer reintento; se duplica
+                en cada intento (la espera real es aleatoria entre 0 y ese valor)
+            backoff_max: Tope de la espera entre reintentos
+            breaker: Disyuntor (por defecto uno de 5 fallos y 30 segundos)
+        """
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+    
+    def mount(self, session: requests.Session):
+        """Instala en session el adaptador con el pool dimensionado y la compresión"""
+        # Los reintentos los hace get(), que conoce el disyuntor y las métricas
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size, max_retries=0)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    
+    def backoff(self, attempt: int) -> float:
+        """Espera antes del reintento attempt (0, 1, ...): full jitter"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+    
+    def get(self, session: requests.Session, url: str, params: Optional[Dict] = None,
+            timeout: Optional[Timeout] = None, retries: Optional[int] = None,
+            use_breaker: bool = True, stream: bool = False) -> requests.Response:
+        """
+        GET con timeouts, reintentos y disyuntor
+        
+        Se reintentan los errores de conexión, los timeouts y los códigos de
+        RETRY_STATUS. Tras agotar los reintentos se devuelve la última
+        respuesta (el llamador decide qué hacer con el código) o se relanza
+        la última excepción
+        
+        Args:
+            timeout: (conexión, lectura) o un único valor; por defecto el del transporte
+            retries: Reintentos; por defecto los del transporte
+            use_breaker: False para saltarse el disyuntor (la prueba de conexión
+                manual); el resultado igualmente se registra en él
+            stream: No leer el cuerpo al recibir la respuesta (response.iter_content)
+        
+        Raises:
+            CircuitOpenError: Si el disyuntor está abierto
+            requests.RequestException: Si el último intento falló sin respuesta
+        """
+        if use_breaker and not self.breaker.allow():
+            raise CircuitOpenError(f"Servidor no disponible (disyuntor abierto): {url}")
+        
+        timeout = timeout if timeout is not None else self.timeout
+        retries = self.retries if retries is None else retries
+        endpoint = None
+        attempt = 0
+        while True:
+            try:
+                response = session.get(url, params=params, timeout=timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= retries:
+                    self.breaker.record_failure()
+                    raise
+                wait = self.backoff(attempt)
+                print(f"Reintento {attempt + 1}/{retries} en {wait:.1f} s: {e}")
+            except requests.RequestException:
+                # Error no transitorio (respuesta corrupta, URL inválida): sin reintento
+                self.breaker.record_failure()
+                raise
+            else:
+                if response.status_code not in RETRY_STATUS:
+                    self.breaker.record_success()
+                    return response
+                if attempt >= retries:
+                    self.breaker.record_failure()
+                    return response
+                wait = max(self.backoff(attempt), self._retry_after(response))
+                print(f"Reintento {attempt + 1}/{retries} en {wait:.1f} s: HTTP {response.status_code}")
+                response.close()
+            
+            if endpoint is None:
+                endpoint = endpoint_label(requests.utils.urlparse(url).path)
+            REGISTRY.inc("jellyfin_retries_total", endpoint=endpoint)
+            time.sleep(wait)
+            attempt += 1
+    
+    def _retry_after(self, response: requests.Response) -> float:
+        """Espera pedida por el servidor en Retry-After (solo en segundos), acotada a backoff_max"""
+        try:
+            return min(float(response.headers.get("Retry-After", 0)), self.backoff_max)
+        except ValueError:
+            return 0.0
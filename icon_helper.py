@@ -5,6 +5,9 @@ from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import QPushButton
 import os
 
+# Íconos de respaldo junto al código, sin depender del directorio actual
+ICONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "icons")
+
 class IconHelper:
     """Clase para manejar íconos del tema y fallbacks"""
     
@@ -20,7 +23,7 @@ class IconHelper:
     }
     
     @staticmethod
-    def get_icon(theme_name, fallback_path="icons"):
+    def get_icon(theme_name, fallback_path=ICONS_DIR):
         """
         Obtiene un ícono del tema o usa un fallback
         
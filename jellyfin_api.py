@@ -1,8 +1,19 @@
+import time
 import requests
-from typing import List, Dict, Optional
+from urllib.parse import urlencode
+from typing import List, Dict, Optional, Iterator
+from api_cache import ResponseCache, cached_response
+from http_transport import HttpTransport, Timeout
+from json_stream import iter_items
+from metrics import defer_stream_metrics, observe_response, requests_hook
+
+# Tamaño de los fragmentos leídos al decodificar Items de forma incremental
+ITEMS_CHUNK_SIZE = 64 * 1024
 
 class JellyfinAPI:
-    def __init__(self, jellyfin_url: str, api_key: str, user_id: str):
+    def __init__(self, jellyfin_url: str, api_key: str, user_id: str,
+                 cache: Optional[ResponseCache] = None,
+                 transport: Optional[HttpTransport] = None, lean_fetch: bool = True):
         """
         Inicializa la conexión con Jellyfin
         
@@ -10,22 +21,81 @@ class JellyfinAPI:
             jellyfin_url: URL del servidor Jellyfin (ej: http://192.168.1.144:8096)
             api_key: Clave API de Jellyfin
             user_id: ID del usuario
+            cache: Caché de respuestas para canciones y búsquedas
+                (por defecto una ResponseCache en memoria sin expiración)
+            transport: Pool de conexiones, timeouts, reintentos y disyuntor
+                (por defecto un HttpTransport con sus valores por omisión)
+            lean_fetch: Pedir solo los campos que usa la aplicación (sin
+                Fields opcionales, datos de usuario ni imágenes que no sean
+                la principal)
         """
         self.jellyfin_url = jellyfin_url.rstrip('/')
         self.api_key = api_key
         self.user_id = user_id
+        self.cache = cache if cache is not None else ResponseCache()
+        self.lean_fetch = lean_fetch
         self.session = requests.Session()
         self.session.headers.update({
             'X-Emby-Token': api_key,
             'Content-Type': 'application/json'
         })
+        # Latencia y tamaño de cada respuesta por endpoint
+        self.session.hooks["response"].append(requests_hook)
+        self.transport = transport if transport is not None else HttpTransport()
+        self.transport.mount(self.session)
+    
+    def _get(self, url: str, params: Optional[Dict] = None, timeout: Optional[Timeout] = None,
+             **kwargs) -> requests.Response:
+        """
+        GET al servidor a través del transporte (timeouts, reintentos, disyuntor)
+        
+        Todas las consultas de la API pasan por aquí; ver HttpTransport.get
+        """
+        return self.transport.get(self.session, url, params, timeout, **kwargs)
+    
+    def _get_items(self, url: str, params: Dict) -> requests.Response:
+        """
+        GET en streaming de una consulta de items, para leerla con _read_items
+        
+        La latencia y el tamaño de las respuestas exitosas se registran al
+        terminar de leer el cuerpo, no al llegar los encabezados
+        """
+        with defer_stream_metrics():
+            return self._get(url, params, stream=True)
+    
+    def _read_items(self, response: requests.Response, parse,
+                    extra: Optional[Dict] = None) -> List:
+        """
+        Convierte los Items de una respuesta (pedida con stream=True) a medida que llegan
+        
+        Cada item se pasa por parse apenas se decodifica, así el cuerpo
+        completo y los diccionarios originales nunca están en memoria a la vez
+        
+        Args:
+            parse: Conversor de cada item (_parse_album, _parse_song...)
+            extra: Si se indica, recibe TotalRecordCount y los demás campos
+        """
+        start = time.perf_counter()
+        size = 0
+        
+        def chunks():
+            nonlocal size
+            for chunk in response.iter_content(ITEMS_CHUNK_SIZE):
+                size += len(chunk)
+                yield chunk
+        
+        try:
+            return [parse(item) for item in iter_items(chunks(), "Items", extra)]
+        finally:
+            observe_response(response, response.elapsed.total_seconds() + time.perf_counter() - start, size)
     
     def test_connection(self) -> bool:
         """Prueba la conexión con el servidor Jellyfin"""
         try:
             url = f"{self.jellyfin_url}/System/Info"
             params = {"api_key": self.api_key}
-            response = self.session.get(url, params=params, timeout=5)
+            # Prueba manual: sin reintentos y aunque el disyuntor esté abierto
+            response = self._get(url, params, timeout=5, retries=0, use_breaker=False)
             return response.status_code == 200
         except Exception as e:
             print(f"Error de conexión: {e}")
@@ -39,35 +109,105 @@ class JellyfinAPI:
             Lista de diccionarios con información de los álbumes
         """
         url = f"{self.jellyfin_url}/Users/{self.user_id}/Items"
+        params = self._album_params()
+        
+        try:
+            with self._get_items(url, params) as response:
+                if response.status_code == 200:
+                    return self._read_items(response, self._parse_album)
+                else:
+                    print(f"Error al obtener álbumes: {response.status_code}")
+                    return []
+        except Exception as e:
+            print(f"Error en listar_albumes: {e}")
+            return []
+    
+    def iterar_paginas_albumes(self, page_size: int = 200,
+                               min_date_last_saved: Optional[str] = None,
+                               strict: bool = False) -> Iterator[List[Dict]]:
+        """
+        Recorre los álbumes de música página a página (StartIndex/Limit)
+        
+        A diferencia de listar_albumes, cada página se entrega en cuanto llega
+        del servidor, por lo que el primer resultado tarda lo mismo sin importar
+        el tamaño de la biblioteca.
+        
+        Args:
+            page_size: Cantidad de álbumes por página
+            min_date_last_saved: Fecha ISO 8601; si se indica, solo se devuelven
+                los álbumes guardados/modificados desde esa fecha
+            strict: Si es True, un error a mitad de la paginación se lanza en
+                lugar de terminar la iteración, para que quien sincroniza pueda
+                distinguir una respuesta fallida del final de los datos
+            
+        Yields:
+            Listas de diccionarios con información de los álbumes
+        
+        Raises:
+            requests.RequestException, ValueError: Solo con strict, si falló una página
+        """
+        url = f"{self.jellyfin_url}/Users/{self.user_id}/Items"
+        start_index = 0
+        total = None
+        
+        while total is None or start_index < total:
+            params = self._album_params(start_index, page_size, min_date_last_saved)
+            
+            extra = {}
+            try:
+                with self._get_items(url, params) as response:
+                    if response.status_code != 200:
+                        raise requests.HTTPError(
+                            f"HTTP {response.status_code} al obtener álbumes (página {start_index})",
+                            response=response
+                        )
+                    albums = self._read_items(response, self._parse_album, extra)
+            except Exception as e:
+                print(f"Error en iterar_paginas_albumes: {e}")
+                if strict:
+                    raise
+                return
+            
+            if not albums:
+                return
+            
+            # Sin TotalRecordCount se sigue pidiendo hasta una página incompleta
+            total = extra.get("TotalRecordCount")
+            start_index += len(albums)
+            yield albums
+            
+            # Una página incompleta indica que no quedan más álbumes
+            if len(albums) < page_size:
+                return
+    
+    def listar_ids_albumes(self) -> Optional[List[str]]:
+        """
+        Obtiene solo los IDs de todos los álbumes (consulta liviana)
+        
+        Returns:
+            Lista de IDs, o None si la consulta falló
+        """
+        url = f"{self.jellyfin_url}/Users/{self.user_id}/Items"
         params = {
             "IncludeItemTypes": "MusicAlbum",
             "Recursive": True,
-            "Fields": "PrimaryImageAspectRatio,Overview",
-            "SortBy": "SortName",
-            "SortOrder": "Ascending",
+            "EnableImages": False,
+            "EnableUserData": False,
             "api_key": self.api_key
         }
         
         try:
-            response = self.session.get(url, params=params)
-            if response.status_code == 200:
-                data = response.json()
-                return [
-                    {
-                        "Nombre": item["Name"],
-                        "Id": item["Id"],
-                        "Artista": item.get("AlbumArtist", "Desconocido"),
-                        "Año": item.get("ProductionYear"),
-                        "Imagen": self._get_image_url(item.get("Id")) if item.get("HasPrimaryImage") else None
-                    } for item in data.get("Items", [])
-                ]
-            else:
-                print(f"Error al obtener álbumes: {response.status_code}")
-                return []
+            with self._get_items(url, params) as response:
+                if response.status_code == 200:
+                    return self._read_items(response, lambda item: item["Id"])
+                else:
+                    print(f"Error al obtener IDs de álbumes: {response.status_code}")
+                    return None
         except Exception as e:
-            print(f"Error en listar_albumes: {e}")
-            return []
+            print(f"Error en listar_ids_albumes: {e}")
+            return None
     
+    @cached_response
     def obtener_canciones_del_album(self, album_id: str) -> List[Dict]:
         """
         Obtiene las canciones de un álbum específico
@@ -79,36 +219,20 @@ class JellyfinAPI:
             Lista de diccionarios con información de las canciones
         """
         url = f"{self.jellyfin_url}/Items"
-        params = {
-            "ParentId": album_id,
-            "IncludeItemTypes": "Audio",
-            "Recursive": True,
-            "SortBy": "IndexNumber",
-            "SortOrder": "Ascending",
-            "Fields": "Path,RunTimeTicks",
-            "api_key": self.api_key
-        }
+        params = self._song_params(album_id)
         
         try:
-            response = self.session.get(url, params=params)
-            if response.status_code == 200:
-                data = response.json()
-                return [
-                    {
-                        "Titulo": item["Name"],
-                        "Id": item["Id"],
-                        "Numero": item.get("IndexNumber", 0),
-                        "Duracion": self._format_duration(item.get("RunTimeTicks", 0)),
-                        "StreamUrl": f"{self.jellyfin_url}/Items/{item['Id']}/Download?api_key={self.api_key}"
-                    } for item in data.get("Items", [])
-                ]
-            else:
-                print(f"Error al obtener canciones: {response.status_code}")
-                return []
+            with self._get_items(url, params) as response:
+                if response.status_code == 200:
+                    return self._read_items(response, self._parse_song)
+                else:
+                    print(f"Error al obtener canciones: {response.status_code}")
+                    return []
         except Exception as e:
             print(f"Error en obtener_canciones_del_album: {e}")
             return []
     
+    @cached_response
     def buscar_albumes(self, query: str) -> List[Dict]:
         """
         Busca álbumes por nombre o artista
@@ -120,39 +244,254 @@ class JellyfinAPI:
             Lista de álbumes que coinciden con la búsqueda
         """
         url = f"{self.jellyfin_url}/Users/{self.user_id}/Items"
+        params = self._album_params()
+        params["SearchTerm"] = query
+        
+        try:
+            with self._get_items(url, params) as response:
+                if response.status_code == 200:
+                    return self._read_items(response, self._parse_album)
+                else:
+                    print(f"Error en búsqueda: {response.status_code}")
+                    return []
+        except Exception as e:
+            print(f"Error en buscar_albumes: {e}")
+            return []
+    
+    @cached_response
+    def buscar_canciones(self, query: str, limit: int = 50) -> List[Dict]:
+        """
+        Busca canciones por título
+        
+        Args:
+            query: Término de búsqueda
+            limit: Máximo de resultados
+            
+        Returns:
+            Lista de canciones; además de los campos habituales incluyen
+            "AlbumId", "Album" y "AlbumArtist"
+        """
+        url = f"{self.jellyfin_url}/Users/{self.user_id}/Items"
         params = {
-            "IncludeItemTypes": "MusicAlbum",
+            "IncludeItemTypes": "Audio",
             "Recursive": True,
             "SearchTerm": query,
-            "Fields": "PrimaryImageAspectRatio,Overview",
+            "Limit": limit,
+            "api_key": self.api_key
+        }
+        self._trim_params(params, "RunTimeTicks", images=False)
+        
+        try:
+            with self._get_items(url, params) as response:
+                if response.status_code == 200:
+                    return self._read_items(response, self._parse_song_result)
+                else:
+                    print(f"Error en búsqueda de canciones: {response.status_code}")
+                    return []
+        except Exception as e:
+            print(f"Error en buscar_canciones: {e}")
+            return []
+    
+    @cached_response
+    def buscar_artistas(self, query: str, limit: int = 20) -> List[str]:
+        """
+        Busca artistas de álbum por nombre
+        
+        Args:
+            query: Término de búsqueda
+            limit: Máximo de resultados
+            
+        Returns:
+            Lista de nombres de artistas
+        """
+        url = f"{self.jellyfin_url}/Artists/AlbumArtists"
+        params = {
+            "UserId": self.user_id,
+            "SearchTerm": query,
+            "Limit": limit,
+            "api_key": self.api_key
+        }
+        
+        try:
+            with self._get_items(url, params) as response:
+                if response.status_code == 200:
+                    return self._read_items(response, lambda item: item["Name"])
+                else:
+                    print(f"Error en búsqueda de artistas: {response.status_code}")
+                    return []
+        except Exception as e:
+            print(f"Error en buscar_artistas: {e}")
+            return []
+    
+    def _album_params(self, start_index: Optional[int] = None, limit: Optional[int] = None,
+                      min_date_last_saved: Optional[str] = None) -> Dict:
+        """Parámetros de consulta para listar álbumes"""
+        params = {
+            "IncludeItemTypes": "MusicAlbum",
+            "Recursive": True,
             "SortBy": "SortName",
             "SortOrder": "Ascending",
             "api_key": self.api_key
         }
+        self._trim_params(params, "PrimaryImageAspectRatio,Overview", images=True)
+        if start_index is not None:
+            params["StartIndex"] = start_index
+        if limit is not None:
+            params["Limit"] = limit
+        if min_date_last_saved:
+            params["MinDateLastSaved"] = min_date_last_saved
+        return params
+    
+    def _song_params(self, album_id: str) -> Dict:
+        """Parámetros de consulta para listar las canciones de un álbum"""
+        params = {
+            "ParentId": album_id,
+            "IncludeItemTypes": "Audio",
+            "Recursive": True,
+            "SortBy": "IndexNumber",
+            "SortOrder": "Ascending",
+            "api_key": self.api_key
+        }
+        return self._trim_params(params, "Path,RunTimeTicks", images=False)
+    
+    def _trim_params(self, params: Dict, fields: str, images: bool) -> Dict:
+        """
+        Agrega a params los campos a pedir
+        
+        Sin lean_fetch se piden los Fields indicados. Con lean_fetch no se
+        pide ningún campo opcional: lo que usan _parse_album y _parse_song
+        (Name, Id, AlbumArtist, ProductionYear, IndexNumber, RunTimeTicks,
+        ImageTags) viene siempre en la respuesta. Tampoco se piden los datos
+        de usuario ni más imagen que la principal (o ninguna si images es False)
+        """
+        if not self.lean_fetch:
+            params["Fields"] = fields
+            return params
+        params["EnableUserData"] = False
+        if images:
+            params["EnableImageTypes"] = "Primary"
+            params["ImageTypeLimit"] = 1
+        else:
+            params["EnableImages"] = False
+        return params
+    
+    def _parse_album(self, item: Dict) -> Dict:
+        """Convierte un item MusicAlbum de Jellyfin al formato usado por la interfaz"""
+        image_tag = (item.get("ImageTags") or {}).get("Primary")
+        has_image = item.get("HasPrimaryImage") or image_tag
+        return {
+            "Nombre": item["Name"],
+            "Id": item["Id"],
+            "Artista": item.get("AlbumArtist", "Desconocido"),
+            "Año": item.get("ProductionYear"),
+            "Imagen": self._get_image_url(item.get("Id")) if has_image else None,
+            "ImagenTag": image_tag
+        }
+    
+    def _parse_song(self, item: Dict) -> Dict:
+        """Convierte un item Audio de Jellyfin al formato usado por la interfaz"""
+        return {
+            "Titulo": item["Name"],
+            "Id": item["Id"],
+            "Numero": item.get("IndexNumber", 0),
+            "Duracion": self._format_duration(item.get("RunTimeTicks", 0)),
+            "StreamUrl": self.url_stream(item["Id"])
+        }
+    
+    def _parse_song_result(self, item: Dict) -> Dict:
+        """Como _parse_song, con el álbum al que pertenece (resultados de búsqueda)"""
+        song = self._parse_song(item)
+        song["AlbumId"] = item.get("AlbumId")
+        song["Album"] = item.get("Album")
+        song["AlbumArtist"] = item.get("AlbumArtist")
+        return song
+    
+    def invalidar_cache(self, album_id: Optional[str] = None):
+        """
+        Invalida respuestas cacheadas
+        
+        Args:
+            album_id: Si se indica, solo se descartan las canciones de ese álbum;
+                si no, se vacía toda la caché
+        """
+        if album_id:
+            self.cache.invalidate(("obtener_canciones_del_album", album_id))
+        else:
+            self.cache.clear()
+    
+    def url_stream(self, item_id: str) -> str:
+        """Genera la URL de streaming de una canción"""
+        return f"{self.jellyfin_url}/Items/{item_id}/Download?api_key={self.api_key}"
+    
+    def url_stream_universal(self, item_id: str, max_bitrate: int,
+                             container: str = "mp3", audio_codec: str = "mp3") -> str:
+        """
+        Genera la URL de /Audio/{id}/universal limitada a un bitrate
         
+        El servidor entrega el archivo original si cumple el límite y, si no,
+        lo transcodifica al contenedor y códec indicados
+        
+        Args:
+            item_id: ID de la canción
+            max_bitrate: Bitrate máximo en bits por segundo
+            container: Contenedor de la transcodificación (mp3, aac, opus...)
+            audio_codec: Códec de la transcodificación
+        """
+        params = urlencode({
+            "UserId": self.user_id,
+            "api_key": self.api_key,
+            "MaxStreamingBitrate": max_bitrate,
+            "AudioBitRate": max_bitrate,
+            "Container": "flac,mp3,aac,m4a,ogg,opus,webma,wav",
+            "TranscodingContainer": container,
+            "TranscodingProtocol": "http",
+            "AudioCodec": audio_codec
+        })
+        return f"{self.jellyfin_url}/Audio/{item_id}/universal?{params}"
+    
+    def _get_image_url(self, item_id: str, max_width: Optional[int] = None,
+                       max_height: Optional[int] = None, quality: Optional[int] = None,
+                       tag: Optional[str] = None) -> str:
+        """
+        Genera la URL para la imagen del álbum
+        
+        Args:
+            item_id: ID del item
+            max_width: Ancho máximo (el servidor escala la imagen)
+            max_height: Alto máximo
+            quality: Calidad JPEG (0-100)
+            tag: Etiqueta de la imagen; permite al servidor y a las cachés
+                distinguir versiones
+        """
+        url = f"{self.jellyfin_url}/Items/{item_id}/Images/Primary?api_key={self.api_key}"
+        params = {"maxWidth": max_width, "maxHeight": max_height, "quality": quality, "tag": tag}
+        extra = urlencode({k: v for k, v in params.items() if v is not None})
+        return f"{url}&{extra}" if extra else url
+    
+    def obtener_imagen(self, item_id: str, max_width: Optional[int] = None,
+                       max_height: Optional[int] = None, quality: Optional[int] = None,
+                       tag: Optional[str] = None, lanzar_errores: bool = False) -> Optional[bytes]:
+        """
+        Descarga la imagen principal de un item; None si no existe o falló
+        
+        Args:
+            lanzar_errores: Relanzar los fallos de red y del servidor en lugar de
+                devolver None, que queda solo para un item sin imagen (404)
+        """
         try:
-            response = self.session.get(url, params=params)
+            response = self._get(
+                self._get_image_url(item_id, max_width, max_height, quality, tag), timeout=(5, 10)
+            )
             if response.status_code == 200:
-                data = response.json()
-                return [
-                    {
-                        "Nombre": item["Name"],
-                        "Id": item["Id"],
-                        "Artista": item.get("AlbumArtist", "Desconocido"),
-                        "Año": item.get("ProductionYear"),
-                        "Imagen": self._get_image_url(item.get("Id")) if item.get("HasPrimaryImage") else None
-                    } for item in data.get("Items", [])
-                ]
-            else:
-                print(f"Error en búsqueda: {response.status_code}")
-                return []
+                return response.content
+            if lanzar_errores and response.status_code != 404:
+                response.raise_for_status()
+            return None
         except Exception as e:
-            print(f"Error en buscar_albumes: {e}")
-            return []
-    
-    def _get_image_url(self, item_id: str) -> str:
-        """Genera la URL para la imagen del álbum"""
-        return f"{self.jellyfin_url}/Items/{item_id}/Images/Primary?api_key={self.api_key}"
+            if lanzar_errores:
+                raise
+            print(f"Error en obtener_imagen: {e}")
+            return None
     
     def _format_duration(self, ticks: int) -> str:
         """Convierte ticks de Jellyfin a formato MM:SS"""
@@ -0,0 +1,205 @@
+"""
+Cliente asíncrono de Jellyfin (asyncio + aiohttp)
+Misma interfaz que JellyfinAPI, pensado para lanzar cientos de consultas
+(álbumes, canciones, imágenes) desde un único event loop sin crear hilos
+"""
+
+import asyncio
+from typing import List, Dict, Optional, AsyncIterator
+
+try:
+    import aiohttp
+except ImportError:  # Dependencia opcional
+    aiohttp = None
+
+from jellyfin_api import JellyfinAPI
+
+
+class AsyncJellyfinAPI:
+    """Cliente asyncio con pool de conexiones y concurrencia acotada"""
+    
+    # Se reutilizan los constructores de parámetros y conversores del cliente síncrono
+    _album_params = JellyfinAPI._album_params
+    _song_params = JellyfinAPI._song_params
+    _trim_params = JellyfinAPI._trim_params
+    _parse_album = JellyfinAPI._parse_album
+    _parse_song = JellyfinAPI._parse_song
+    url_stream = JellyfinAPI.url_stream
+    url_stream_universal = JellyfinAPI.url_stream_universal
+    _get_image_url = JellyfinAPI._get_image_url
+    _format_duration = JellyfinAPI._format_duration
+    
+    def __init__(self, jellyfin_url: str, api_key: str, user_id: str,
+                 max_concurrency: int = 16, timeout: float = 15.0, pool_size: int = 32,
+                 lean_fetch: bool = True):
+        """
+        Inicializa el cliente (la sesión HTTP se crea al primer uso)
+        
+        Args:
+            jellyfin_url: URL del servidor Jellyfin
+            api_key: Clave API de Jellyfin
+            user_id: ID del usuario
+            max_concurrency: Máximo de peticiones simultáneas en vuelo
+            timeout: Tiempo máximo en segundos de cada petición
+            pool_size: Conexiones keep-alive máximas hacia el servidor
+            lean_fetch: Pedir solo los campos que usa la aplicación (ver JellyfinAPI)
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncJellyfinAPI requiere aiohttp (pip install aiohttp)")
+        
+        self.jellyfin_url = jellyfin_url.rstrip('/')
+        self.api_key = api_key
+        self.user_id = user_id
+        self.lean_fetch = lean_fetch
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.pool_size = pool_size
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        self._session = None
+    
+    async def __aenter__(self):
+        await self._get_session()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    async def _get_session(self) -> "aiohttp.ClientSession":
+        """Crea la sesión compartida dentro del event loop en curso"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers={
+                    'X-Emby-Token': self.api_key,
+                    'Content-Type': 'application/json'
+                }
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+    
+    async def close(self):
+        """Cierra la sesión y libera las conexiones del pool"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def _get_json(self, url: str, params: Dict, timeout: Optional[float] = None) -> Optional[Dict]:
+        """GET con concurrencia acotada; devuelve el JSON o None si falló"""
+        session = await self._get_session()
+        # aiohttp no acepta booleanos en la query string
+        params = {k: str(v).lower() if isinstance(v, bool) else v for k, v in params.items()}
+        # Sin timeout propio se usa el de la sesión: pasar timeout=None lo desactivaría
+        extra = {"timeout": aiohttp.ClientTimeout(total=timeout)} if timeout else {}
+        
+        async with self._semaphore:
+            async with session.get(url, params=params, **extra) as response:
+                if response.status != 200:
+                    print(f"Error HTTP {response.status} en {url}")
+                    return None
+                return await response.json(content_type=None)
+    
+    async def test_connection(self) -> bool:
+        """Prueba la conexión con el servidor Jellyfin"""
+        try:
+            data = await self._get_json(
+                f"{self.jellyfin_url}/System/Info", {"api_key": self.api_key}, timeout=5
+            )
+            return data is not None
+        except Exception as e:
+            print(f"Error de conexión: {e}")
+            return False
+    
+    async def listar_albumes(self) -> List[Dict]:
+        """Obtiene la lista de álbumes de música"""
+        albums = []
+        async for page in self.iterar_paginas_albumes():
+            albums.extend(page)
+        return albums
+    
+    async def iterar_paginas_albumes(self, page_size: int = 200,
+                                     min_date_last_saved: Optional[str] = None) -> AsyncIterator[List[Dict]]:
+        """
+        Recorre los álbumes página a página (StartIndex/Limit)
+        
+        Yields:
+            Listas de diccionarios con información de los álbumes
+        """
+        url = f"{self.jellyfin_url}/Users/{self.user_id}/Items"
+        start_index = 0
+        total = None
+        
+        while total is None or start_index < total:
+            params = self._album_params(start_index, page_size, min_date_last_saved)
+            try:
+                data = await self._get_json(url, params)
+            except Exception as e:
+                print(f"Error en iterar_paginas_albumes: {e}")
+                return
+            if data is None:
+                return
+            
+            items = data.get("Items", [])
+            if not items:
+                return
+            
+            # Sin TotalRecordCount se sigue pidiendo hasta una página incompleta
+            total = data.get("TotalRecordCount")
+            start_index += len(items)
+            yield [self._parse_album(item) for item in items]
+            
+            if len(items) < page_size:
+                return
+    
+    async def obtener_canciones_del_album(self, album_id: str) -> List[Dict]:
+        """Obtiene las canciones de un álbum específico"""
+        try:
+            data = await self._get_json(f"{self.jellyfin_url}/Items", self._song_params(album_id))
+        except Exception as e:
+            print(f"Error en obtener_canciones_del_album: {e}")
+            return []
+        if data is None:
+            return []
+        return [self._parse_song(item) for item in data.get("Items", [])]
+    
+    async def obtener_canciones_de_albumes(self, album_ids: List[str]) -> Dict[str, List[Dict]]:
+        """
+        Obtiene en paralelo las canciones de varios álbumes
+        
+        Returns:
+            Diccionario album_id -> lista de canciones
+        """
+        results = await asyncio.gather(
+            *(self.obtener_canciones_del_album(album_id) for album_id in album_ids)
+        )
+        return dict(zip(album_ids, results))
+    
+    async def buscar_albumes(self, query: str) -> List[Dict]:
+        """Busca álbumes por nombre o artista"""
+        params = self._album_params()
+        params["SearchTerm"] = query
+        try:
+            data = await self._get_json(f"{self.jellyfin_url}/Users/{self.user_id}/Items", params)
+        except Exception as e:
+            print(f"Error en buscar_albumes: {e}")
+            return []
+        if data is None:
+            return []
+        return [self._parse_album(item) for item in data.get("Items", [])]
+    
+    async def obtener_imagen(self, item_id: str, max_width: Optional[int] = None,
+                             max_height: Optional[int] = None, quality: Optional[int] = None,
+                             tag: Optional[str] = None) -> Optional[bytes]:
+        """Descarga la imagen principal de un item; None si no existe o falló"""
+        session = await self._get_session()
+        url = self._get_image_url(item_id, max_width, max_height, quality, tag)
+        try:
+            async with self._semaphore:
+                async with session.get(url) as response:
+                    if response.status != 200:
+                        return None
+                    return await response.read()
+        except Exception as e:
+            print(f"Error en obtener_imagen: {e}")
+            return None
@@ -0,0 +1,123 @@
+"""
+Decodificación incremental de respuestas JSON
+Recorre una respuesta {"Items": [...], "TotalRecordCount": N, ...} a medida
+que llegan los fragmentos y entrega cada elemento de Items por separado
+(json.JSONDecoder.raw_decode sobre un búfer). Así no hace falta tener en
+memoria a la vez el cuerpo completo y todos los items como diccionarios: el
+llamador convierte cada uno a su registro compacto y descarta el original
+"""
+
+import codecs
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+# Lo que puede seguir a un número o a true/false/null
+_DELIMITER = re.compile(r"[,\]} \t\n\r]")
+
+
+class _Buffer:
+    """Texto decodificado pendiente de analizar, alimentado por fragmentos de bytes"""
+    
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+    
+    def fill(self) -> bool:
+        """Agrega el siguiente fragmento; False si ya no quedan"""
+        if self.eof:
+            return False
+        # Se descarta lo ya analizado para que el búfer no crezca con la respuesta
+        if self.pos:
+            self.text = self.text[self.pos:]
+            self.pos = 0
+        for chunk in self._chunks:
+            if chunk:
+                self.text += self._utf8.decode(chunk)
+                return True
+        self.text += self._utf8.decode(b"", final=True)
+        self.eof = True
+        return False
+    
+    def peek(self) -> str:
+        """Siguiente carácter que no es espacio ('' al final de la respuesta)"""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+    
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"JSON inesperado: se esperaba {char!r} y llegó {found or 'el final'!r}")
+        self.pos += 1
+    
+    def value(self) -> Any:
+        """Decodifica el valor JSON completo que empieza en la posición actual"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # Un número o literal solo está completo si lo sigue un delimitador: con
+            # "3." o "1e" al final del búfer, raw_decode entrega 3 o 1 y el resto
+            # del número llega en el próximo fragmento
+            if (not self.eof and self.text[self.pos] not in '"[{'
+                    and _DELIMITER.search(self.text, end) is None):
+                self.fill()
+                continue
+            self.pos = end
+            return value
+
+
+def iter_items(chunks: Iterable[bytes], key: str = "Items",
+               extra: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    """
+    Entrega uno a uno los elementos del arreglo key de un objeto JSON
+    
+    Args:
+        chunks: Fragmentos de bytes UTF-8 (p. ej. response.iter_content())
+        key: Miembro del objeto de nivel superior que contiene el arreglo
+        extra: Si se indica, recibe los demás miembros del objeto
+            (TotalRecordCount, StartIndex); se completa al agotar el iterador
+    
+    Raises:
+        ValueError: Si la respuesta no es un objeto JSON válido
+            (json.JSONDecodeError también es un ValueError)
+    """
+    buffer = _Buffer(chunks)
+    buffer.expect("{")
+    if buffer.peek() == "}":
+        return
+    while True:
+        name = buffer.value()
+        buffer.expect(":")
+        if name == key and buffer.peek() == "[":
+            buffer.pos += 1
+            if buffer.peek() == "]":
+                buffer.pos += 1
+            else:
+                while True:
+                    yield buffer.value()
+                    if buffer.peek() == "]":
+                        buffer.pos += 1
+                        break
+                    buffer.expect(",")
+        else:
+            value = buffer.value()
+            if extra is not None:
+                extra[name] = value
+        if buffer.peek() == "}":
+            return
+        buffer.expect(",")
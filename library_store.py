@@ -0,0 +1,286 @@
+"""
+Índice local de la biblioteca de Jellyfin
+Guarda álbumes y canciones en SQLite para que el arranque lea el catálogo
+desde disco y solo se descarguen los cambios desde la última sincronización
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import List, Dict, Optional, Callable
+
+
+class LibraryStore:
+    """Almacén SQLite de álbumes y canciones"""
+    
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS meta (
+        clave TEXT PRIMARY KEY,
+        valor TEXT
+    );
+    CREATE TABLE IF NOT EXISTS albumes (
+        id TEXT PRIMARY KEY,
+        nombre TEXT NOT NULL,
+        artista TEXT,
+        anio INTEGER,
+        tiene_imagen INTEGER NOT NULL DEFAULT 0,
+        imagen_tag TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_albumes_nombre ON albumes (nombre COLLATE NOCASE);
+    CREATE TABLE IF NOT EXISTS canciones (
+        id TEXT PRIMARY KEY,
+        album_id TEXT NOT NULL,
+        titulo TEXT NOT NULL,
+        numero INTEGER,
+        duracion TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_canciones_album ON canciones (album_id, numero);
+    """
+    
+    def __init__(self, db_path: str, jellyfin_api):
+        """
+        Abre (o crea) el índice local
+        
+        Args:
+            db_path: Ruta del archivo SQLite
+            jellyfin_api: Instancia de JellyfinAPI, usada para reconstruir las URLs
+                de imágenes y streaming (no se guardan porque incluyen la API key)
+        """
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self.jellyfin_api = jellyfin_api
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._migrar()
+        
+        # Si cambió el servidor o el usuario, el índice ya no es válido
+        servidor = f"{jellyfin_api.jellyfin_url}|{jellyfin_api.user_id}"
+        if self.get_meta("servidor") != servidor:
+            self.limpiar()
+            self.set_meta("servidor", servidor)
+    
+    def _migrar(self):
+        """Agrega las columnas nuevas a índices creados por versiones anteriores"""
+        columnas = {row[1] for row in self._conn.execute("PRAGMA table_info(albumes)")}
+        if "imagen_tag" not in columnas:
+            with self._conn:
+                self._conn.execute("ALTER TABLE albumes ADD COLUMN imagen_tag TEXT")
+    
+    def get_meta(self, clave: str) -> Optional[str]:
+        """Obtiene un valor de la tabla de metadatos"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT valor FROM meta WHERE clave = ?", (clave,)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def set_meta(self, clave: str, valor: str):
+        """Guarda un valor en la tabla de metadatos"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (clave, valor) VALUES (?, ?)", (clave, valor)
+            )
+    
+    def limpiar(self):
+        """Borra todo el contenido del índice"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM albumes")
+            self._conn.execute("DELETE FROM canciones")
+            self._conn.execute("DELETE FROM meta")
+    
+    def listar_albumes(self) -> List[Dict]:
+        """
+        Obtiene todos los álbumes guardados, ordenados por nombre
+        
+        Returns:
+            Lista de diccionarios con el mismo formato que JellyfinAPI.listar_albumes
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, nombre, artista, anio, tiene_imagen, imagen_tag FROM albumes "
+                "ORDER BY nombre COLLATE NOCASE"
+            ).fetchall()
+        
+        image_url = self.jellyfin_api._get_image_url
+        return [
+            {
+                "Nombre": nombre,
+                "Id": album_id,
+                "Artista": artista,
+                "Año": anio,
+                "Imagen": image_url(album_id) if tiene_imagen else None,
+                "ImagenTag": imagen_tag
+            } for album_id, nombre, artista, anio, tiene_imagen, imagen_tag in rows
+        ]
+    
+    def contar_albumes(self) -> int:
+        """Cantidad de álbumes guardados"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM albumes").fetchone()[0]
+    
+    def guardar_albumes(self, albums: List[Dict]):
+        """Inserta o actualiza álbumes; descarta las canciones cacheadas de los modificados"""
+        rows = [
+            (a["Id"], a["Nombre"], a.get("Artista"), a.get("Año"),
+             1 if a.get("Imagen") else 0, a.get("ImagenTag"))
+            for a in albums
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO albumes (id, nombre, artista, anio, tiene_imagen, imagen_tag) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.executemany(
+                "DELETE FROM canciones WHERE album_id = ?", [(row[0],) for row in rows]
+            )
+    
+    def conservar_solo_albumes(self, album_ids: List[str]) -> int:
+        """
+        Elimina los álbumes (y sus canciones) que ya no existen en el servidor
+        
+        Returns:
+            Cantidad de álbumes eliminados
+        """
+        with self._lock, self._conn:
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS ids_vigentes (id TEXT PRIMARY KEY)")
+            self._conn.execute("DELETE FROM ids_vigentes")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO ids_vigentes (id) VALUES (?)", [(i,) for i in album_ids]
+            )
+            eliminados = self._conn.execute(
+                "DELETE FROM albumes WHERE id NOT IN (SELECT id FROM ids_vigentes)"
+            ).rowcount
+            self._conn.execute(
+                "DELETE FROM canciones WHERE album_id NOT IN (SELECT id FROM albumes)"
+            )
+        return eliminados
+    
+    def obtener_canciones_del_album(self, album_id: str) -> Optional[List[Dict]]:
+        """
+        Obtiene las canciones guardadas de un álbum
+        
+        Returns:
+            Lista de canciones, o None si el álbum nunca se sincronizó
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, titulo, numero, duracion FROM canciones "
+                "WHERE album_id = ? ORDER BY numero", (album_id,)
+            ).fetchall()
+        
+        if not rows:
+            return None
+        
+        url_stream = self.jellyfin_api.url_stream
+        return [
+            {
+                "Titulo": titulo,
+                "Id": song_id,
+                "Numero": numero,
+                "Duracion": duracion,
+                "StreamUrl": url_stream(song_id)
+            } for song_id, titulo, numero, duracion in rows
+        ]
+    
+    def guardar_canciones(self, album_id: str, songs: List[Dict]) -> bool:
+        """
+        Reemplaza las canciones guardadas de un álbum
+        
+        Returns:
+            False si ya estaban guardadas tal cual (no se escribe nada)
+        """
+        rows = [(s["Id"], s["Titulo"], s.get("Numero", 0), s.get("Duracion")) for s in songs]
+        with self._lock:
+            guardadas = self._conn.execute(
+                "SELECT id, titulo, numero, duracion FROM canciones WHERE album_id = ?", (album_id,)
+            ).fetchall()
+            if set(guardadas) == set(rows):
+                return False
+            with self._conn:
+                self._conn.execute("DELETE FROM canciones WHERE album_id = ?", (album_id,))
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO canciones (id, album_id, titulo, numero, duracion) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(song_id, album_id, titulo, numero, duracion)
+                     for song_id, titulo, numero, duracion in rows]
+                )
+        return True
+    
+    def close(self):
+        """Cierra la conexión con la base de datos"""
+        with self._lock:
+            self._conn.close()
+
+
+class SyncError(Exception):
+    """La sincronización quedó incompleta; la marca de tiempo no avanzó"""
+
+
+class LibrarySync:
+    """Sincroniza el índice local con el servidor Jellyfin"""
+    
+    def __init__(self, jellyfin_api, store: LibraryStore, page_size: int = 200):
+        self.jellyfin_api = jellyfin_api
+        self.store = store
+        self.page_size = page_size
+    
+    def sincronizar(self, on_page: Optional[Callable[[List[Dict]], None]] = None,
+                    is_cancelled: Optional[Callable[[], bool]] = None) -> int:
+        """
+        Trae del servidor los álbumes nuevos o modificados desde la última
+        sincronización (MinDateLastSaved) y elimina los que ya no existen
+        
+        Args:
+            on_page: Callback opcional que recibe cada página durante una
+                sincronización completa (índice vacío)
+            is_cancelled: Callback opcional; si devuelve True la sincronización
+                se interrumpe sin marcarse como completa
+        
+        Returns:
+            Cantidad de álbumes agregados, modificados o eliminados
+        
+        Raises:
+            SyncError: Si falló alguna consulta al servidor; lo ya descargado
+                queda guardado y la próxima sincronización vuelve a pedir
+                los cambios desde la misma fecha
+        """
+        ultima = self.store.get_meta("ultima_sincronizacion")
+        inicio = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        indice_vacio = self.store.contar_albumes() == 0
+        cambios = 0
+        
+        try:
+            for page in self.jellyfin_api.iterar_paginas_albumes(self.page_size, ultima, strict=True):
+                if is_cancelled and is_cancelled():
+                    return cambios
+                self.store.guardar_albumes(page)
+                if ultima is not None:
+                    for album in page:
+                        self.jellyfin_api.invalidar_cache(album["Id"])
+                cambios += len(page)
+                if indice_vacio and on_page:
+                    on_page(page)
+        except Exception as e:
+            # Una página falló: los álbumes modificados de las páginas que
+            # faltan se perderían si se avanzara la marca de tiempo
+            raise SyncError(f"sincronización incompleta ({cambios} álbumes guardados): {e}") from e
+        
+        # Los borrados no aparecen en el filtro por fecha: comparar IDs
+        ids = self.jellyfin_api.listar_ids_albumes()
+        if is_cancelled and is_cancelled():
+            return cambios
+        if ids is None:
+            raise SyncError(f"sincronización incompleta ({cambios} álbumes guardados): "
+                            "no se pudo obtener la lista de álbumes")
+        cambios += self.store.conservar_solo_albumes(ids)
+        
+        # Solo avanzar la marca de tiempo si el índice quedó completo
+        if self.store.contar_albumes() >= len(set(ids)):
+            self.store.set_meta("ultima_sincronizacion", inicio)
+        return cambios
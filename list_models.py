@@ -0,0 +1,444 @@
+"""
+Modelos de lista para las vistas de álbumes, canciones y cola
+Guardan los datos en columnas compactas y solo arman el texto a mostrar
+cuando la vista lo pide (es decir, para las filas visibles)
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Optional, Callable
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QAbstractProxyModel, QModelIndex, pyqtSignal
+
+
+class AlbumListModel(QAbstractListModel):
+    """Modelo de álbumes guardado en columnas (ids, nombres, artistas, años)"""
+    
+    def __init__(self, image_url: Optional[Callable[[str], str]] = None, parent=None):
+        """
+        Args:
+            image_url: Función que genera la URL de la imagen de un álbum a partir
+                de su ID (las URLs no se guardan por fila)
+        """
+        super().__init__(parent)
+        self.image_url = image_url
+        self._ids: List[str] = []
+        self._nombres: List[str] = []
+        self._artistas: List[str] = []
+        self._anios = array('H')  # 0 = sin año
+        self._con_imagen = bytearray()
+        self._tags: List[Optional[str]] = []
+        self._filas_por_id: Dict[str, int] = {}
+        self.art_cache = None
+    
+    def set_art_cache(self, art_cache):
+        """Muestra carátulas desde un AlbumArtCache (se piden solo para las filas visibles)"""
+        self.art_cache = art_cache
+        art_cache.art_ready.connect(self._on_art_ready)
+    
+    def _on_art_ready(self, album_id: str):
+        row = self._filas_por_id.get(album_id)
+        if row is not None:
+            index = self.index(row, 0)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._ids)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.DisplayRole:
+            text = f"{self._nombres[row]} - {self._artistas[row]}"
+            if self._anios[row]:
+                text += f" ({self._anios[row]})"
+            return text
+        if role == Qt.DecorationRole and self.art_cache is not None:
+            # La vista solo pide la decoración de las filas que pinta
+            if not self._con_imagen[row]:
+                return self.art_cache.placeholder
+            pixmap = self.art_cache.pixmap(self._ids[row], self._tags[row])
+            return pixmap if pixmap is not None else self.art_cache.placeholder
+        if role == Qt.UserRole:
+            return self.album(row)
+        return None
+    
+    def clear(self):
+        """Elimina todos los álbumes"""
+        self.beginResetModel()
+        self._ids.clear()
+        self._nombres.clear()
+        self._artistas.clear()
+        self._anios = array('H')
+        self._con_imagen = bytearray()
+        self._tags.clear()
+        self._filas_por_id.clear()
+        self.endResetModel()
+    
+    def set_albums(self, albums: List[Dict]):
+        """Reemplaza el contenido del modelo"""
+        self.beginResetModel()
+        self._ids.clear()
+        self._nombres.clear()
+        self._artistas.clear()
+        self._anios = array('H')
+        self._con_imagen = bytearray()
+        self._tags.clear()
+        self._filas_por_id.clear()
+        self._extend(albums)
+        self.endResetModel()
+    
+    def append_albums(self, albums: List[Dict]):
+        """Agrega álbumes al final del modelo"""
+        if not albums:
+            return
+        first = len(self._ids)
+        self.beginInsertRows(QModelIndex(), first, first + len(albums) - 1)
+        self._extend(albums)
+        self.endInsertRows()
+    
+    def _extend(self, albums: List[Dict]):
+        first = len(self._ids)
+        for offset, album in enumerate(albums):
+            self._filas_por_id[album["Id"]] = first + offset
+            self._ids.append(album["Id"])
+            self._nombres.append(album["Nombre"])
+            self._artistas.append(album.get("Artista") or "Desconocido")
+            self._anios.append(album.get("Año") or 0)
+            self._con_imagen.append(1 if album.get("Imagen") else 0)
+            self._tags.append(album.get("ImagenTag"))
+    
+    def album(self, row: int) -> Dict:
+        """Arma el diccionario de un álbum (mismo formato que JellyfinAPI)"""
+        album_id = self._ids[row]
+        return {
+            "Nombre": self._nombres[row],
+            "Id": album_id,
+            "Artista": self._artistas[row],
+            "Año": self._anios[row] or None,
+            "Imagen": self.image_url(album_id) if self._con_imagen[row] and self.image_url else None,
+            "ImagenTag": self._tags[row]
+        }
+    
+    def row_of(self, album_id: str) -> int:
+        """Fila de un álbum por su ID, o -1 si no está"""
+        return self._filas_por_id.get(album_id, -1)
+    
+    def nombre(self, row: int) -> str:
+        return self._nombres[row]
+    
+    def artista(self, row: int) -> str:
+        return self._artistas[row]
+    
+    def columnas_busqueda(self, desde: int = 0):
+        """Copia de las columnas de nombre y artista (desde una fila) para el índice de búsqueda"""
+        return self._nombres[desde:], self._artistas[desde:]
+
+
+class AlbumFilterProxyModel(QAbstractProxyModel):
+    """
+    Filtro de álbumes por lista de filas del modelo original
+    
+    Las filas visibles las calcula el índice de búsqueda; al cambiar el filtro
+    solo se notifican a la vista los tramos de filas que aparecen o desaparecen
+    """
+    
+    # Más tramos que esto y resulta más barato reiniciar la vista
+    MAX_TRAMOS = 32
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: Optional[List[int]] = None  # None = sin filtro
+        self._insertando = False
+    
+    def setSourceModel(self, model):
+        old = self.sourceModel()
+        if old is not None:
+            old.rowsAboutToBeInserted.disconnect(self._on_source_rows_about_to_be_inserted)
+            old.rowsInserted.disconnect(self._on_source_rows_inserted)
+            old.modelReset.disconnect(self._on_source_reset)
+            old.dataChanged.disconnect(self._on_source_data_changed)
+        self.beginResetModel()
+        super().setSourceModel(model)
+        self._rows = None
+        self.endResetModel()
+        model.rowsAboutToBeInserted.connect(self._on_source_rows_about_to_be_inserted)
+        model.rowsInserted.connect(self._on_source_rows_inserted)
+        model.modelReset.connect(self._on_source_reset)
+        model.dataChanged.connect(self._on_source_data_changed)
+    
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().rowCount() if self._rows is None else len(self._rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 1
+    
+    def index(self, row, column=0, parent=QModelIndex()):
+        if parent.isValid() or not (0 <= row < self.rowCount()) or column != 0:
+            return QModelIndex()
+        return self.createIndex(row, column)
+    
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+    
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid():
+            return QModelIndex()
+        row = proxy_index.row()
+        source_row = row if self._rows is None else self._rows[row]
+        return self.sourceModel().index(source_row, 0)
+    
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        source_row = source_index.row()
+        if self._rows is None:
+            return self.index(source_row, 0)
+        pos = bisect_left(self._rows, source_row)
+        if pos < len(self._rows) and self._rows[pos] == source_row:
+            return self.index(pos, 0)
+        return QModelIndex()
+    
+    def source_row(self, row: int) -> int:
+        """Fila del modelo original para una fila visible"""
+        return row if self._rows is None else self._rows[row]
+    
+    def set_filter(self, rows: Optional[List[int]]):
+        """
+        Aplica un filtro
+        
+        Args:
+            rows: Filas del modelo original a mostrar (ascendentes), o None para mostrar todas
+        """
+        total = self.sourceModel().rowCount()
+        old = list(range(total)) if self._rows is None else self._rows
+        new = list(range(total)) if rows is None else rows
+        
+        if len(new) <= len(old) and self._aplicar_quitados(old, new, rows):
+            return
+        if len(new) >= len(old) and self._aplicar_agregados(old, new, rows):
+            return
+        
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+    
+    def _aplicar_quitados(self, old, new, rows) -> bool:
+        """Notifica solo los tramos eliminados si new es subconjunto de old"""
+        tramos = []
+        j = 0
+        for i, row in enumerate(old):
+            if j < len(new) and new[j] == row:
+                j += 1
+            elif tramos and tramos[-1][1] == i - 1:
+                tramos[-1][1] = i
+            else:
+                tramos.append([i, i])
+                if len(tramos) > self.MAX_TRAMOS:
+                    return False
+        if j != len(new):
+            return False
+        
+        current = list(old)
+        for start, end in reversed(tramos):
+            self.beginRemoveRows(QModelIndex(), start, end)
+            del current[start:end + 1]
+            self._rows = current
+            self.endRemoveRows()
+        self._rows = rows
+        return True
+    
+    def _aplicar_agregados(self, old, new, rows) -> bool:
+        """Notifica solo los tramos agregados si new es superconjunto de old"""
+        tramos = []
+        j = 0
+        for i, row in enumerate(new):
+            if j < len(old) and old[j] == row:
+                j += 1
+            elif tramos and tramos[-1][1] == i - 1:
+                tramos[-1][1] = i
+            else:
+                tramos.append([i, i])
+                if len(tramos) > self.MAX_TRAMOS:
+                    return False
+        if j != len(old):
+            return False
+        
+        current = list(old)
+        for start, end in tramos:
+            self.beginInsertRows(QModelIndex(), start, end)
+            current[start:start] = new[start:end + 1]
+            self._rows = current
+            self.endInsertRows()
+        self._rows = rows
+        return True
+    
+    def _on_source_rows_about_to_be_inserted(self, parent, first, last):
+        # Sin filtro el conteo es el del modelo original: hay que avisar antes
+        # de que crezca. Con un filtro activo, las filas nuevas se incorporan
+        # al volver a filtrar
+        if self._rows is None:
+            self.beginInsertRows(QModelIndex(), first, last)
+            self._insertando = True
+    
+    def _on_source_rows_inserted(self, parent, first, last):
+        if self._insertando:
+            self._insertando = False
+            self.endInsertRows()
+    
+    def _on_source_reset(self):
+        self.beginResetModel()
+        self._rows = None
+        self.endResetModel()
+    
+    def _on_source_data_changed(self, top_left, bottom_right, roles=()):
+        if self._rows is None:
+            first, last = top_left.row(), bottom_right.row()
+        else:
+            first = bisect_left(self._rows, top_left.row())
+            last = bisect_right(self._rows, bottom_right.row()) - 1
+        if first <= last:
+            self.dataChanged.emit(self.index(first, 0), self.index(last, 0), roles)
+
+
+class SongListModel(QAbstractListModel):
+    """Modelo de las canciones del álbum seleccionado"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._songs: List[Dict] = []
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._songs)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        song = self._songs[index.row()]
+        if role == Qt.DisplayRole:
+            return f"{song['Numero'] or 0:02d}. {song['Titulo']} ({song['Duracion']})"
+        if role == Qt.UserRole:
+            return song
+        return None
+    
+    def set_songs(self, songs: List[Dict]):
+        """Reemplaza las canciones mostradas"""
+        self.beginResetModel()
+        self._songs = list(songs)
+        self.endResetModel()
+    
+    def song(self, row: int) -> Dict:
+        return self._songs[row]
+
+
+class QueueListModel(QAbstractListModel):
+    """
+    Modelo de la cola de reproducción sobre una PlayQueue
+    
+    Todas las modificaciones de la cola pasan por el modelo, que notifica
+    cambios por filas: avanzar de canción solo actualiza la fila anterior y
+    la actual, y agregar canciones solo inserta las filas nuevas
+    """
+    # Cambió el contenido u orden de la cola (no la marca de la canción en curso)
+    queue_changed = pyqtSignal()
+    
+    def __init__(self, play_queue, parent=None):
+        super().__init__(parent)
+        self.queue = play_queue
+        self._marked = -1  # Fila que muestra ▶
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.queue)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.DisplayRole:
+            track = self.queue[row]
+            text = f"{row + 1:02d}. {track.titulo} ({track.duracion})"
+            if row == self._marked:
+                text = "▶ " + text
+            return text
+        if role == Qt.UserRole:
+            return self.queue.song(row)
+        return None
+    
+    def set_songs(self, songs: List[Dict], current_index: int = -1):
+        """Reemplaza toda la cola"""
+        self.beginResetModel()
+        self.queue.replace(songs, current_index)
+        self._marked = -1
+        self.endResetModel()
+        self.queue_changed.emit()
+    
+    def restore(self, rows: List[list], current_index: int = -1):
+        """Reemplaza la cola con filas guardadas (PlayQueue.rows)"""
+        self.beginResetModel()
+        self.queue.replace_rows(rows, current_index)
+        self._marked = -1
+        self.endResetModel()
+    
+    def clear(self):
+        """Vacía la cola"""
+        self.beginResetModel()
+        self.queue.clear()
+        self._marked = -1
+        self.endResetModel()
+        self.queue_changed.emit()
+    
+    def append_songs(self, songs: List[Dict]):
+        """Agrega canciones al final de la cola"""
+        if not songs:
+            return
+        first = len(self.queue)
+        self.beginInsertRows(QModelIndex(), first, first + len(songs) - 1)
+        self.queue.extend(songs)
+        self.endInsertRows()
+        self.queue_changed.emit()
+    
+    def move(self, source: int, target: int):
+        """Mueve una canción (cambia el número de las filas intermedias)"""
+        self.queue.move(source, target)
+        self._emit_rows_changed(min(source, target), max(source, target))
+        self.queue_changed.emit()
+    
+    def shuffle_remaining(self):
+        """Mezcla las canciones posteriores a la actual"""
+        start = self.queue.shuffle_remaining()
+        self._emit_rows_changed(start, len(self.queue) - 1)
+        self.queue_changed.emit()
+    
+    def undo(self) -> bool:
+        """Deshace el último movimiento o mezcla; False si no había nada que deshacer"""
+        operation = self.queue.undo()
+        if operation is None:
+            return False
+        if operation[0] == "move":
+            _, source, target = operation
+            self._emit_rows_changed(min(source, target), max(source, target))
+        else:
+            _, start, previous = operation
+            self._emit_rows_changed(start, start + len(previous) - 1)
+        self.queue_changed.emit()
+        return True
+    
+    def set_current(self, current_index: int, is_playing: bool):
+        """Mueve la marca ▶: solo se actualizan la fila anterior y la nueva"""
+        previous = self._marked
+        self._marked = current_index if is_playing else -1
+        if previous == self._marked:
+            return
+        for row in (previous, self._marked):
+            if 0 <= row < len(self.queue):
+                index = self.index(row, 0)
+                self.dataChanged.emit(index, index, [Qt.DisplayRole])
+    
+    def _emit_rows_changed(self, first: int, last: int):
+        if first <= last:
+            self.dataChanged.emit(
+                self.index(first, 0), self.index(last, 0), [Qt.DisplayRole, Qt.UserRole]
+            )
@@ -13,31 +13,21 @@ Configuración:
     Modifica las variables en jellyfin_api.py para configurar tu servidor Jellyfin.
 """
 
+import startup_timing
 import sys
 import os
-from PyQt5.QtWidgets import QApplication, QMessageBox
-from PyQt5.QtCore import Qt, QCoreApplication
-from reproductor_gui_ui import ReproductorJellyfinUI
-from jellyfin_api import DEFAULT_CONFIG
+from importlib.util import find_spec
 
 def check_dependencies():
-    """Verifica que todas las dependencias estén instaladas"""
+    """
+    Verifica que todas las dependencias estén instaladas
+    Solo busca los módulos (find_spec) sin importarlos: importar vlc carga libvlc
+    """
     missing_deps = []
     
-    try:
-        import PyQt5
-    except ImportError:
-        missing_deps.append("PyQt5")
-    
-    try:
-        import vlc
-    except ImportError:
-        missing_deps.append("python-vlc")
-    
-    try:
-        import requests
-    except ImportError:
-        missing_deps.append("requests")
+    for module, package in (("PyQt5", "PyQt5"), ("vlc", "python-vlc"), ("requests", "requests")):
+        if find_spec(module) is None:
+            missing_deps.append(package)
     
     if missing_deps:
         print("❌ Faltan las siguientes dependencias:")
@@ -51,6 +41,8 @@ def check_dependencies():
 
 def show_config_info():
     """Muestra información sobre la configuración actual"""
+    from jellyfin_api import DEFAULT_CONFIG
+    
     print("🎵 Reproductor Jellyfin - Versión UI")
     print("=" * 40)
     print(f"Servidor: {DEFAULT_CONFIG['JELLYFIN_URL']}")
@@ -68,6 +60,12 @@ def main():
     # Mostrar información de configuración
     show_config_info()
     
+    # Las importaciones de Qt y de la interfaz van después de verificar dependencias
+    from PyQt5.QtWidgets import QApplication, QMessageBox
+    from PyQt5.QtCore import Qt, QCoreApplication, QTimer
+    from reproductor_gui_ui import ReproductorJellyfinUI
+    startup_timing.mark("módulos importados")
+    
     # Establecer atributos de Qt antes de crear QApplication
     QCoreApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
     QCoreApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
@@ -86,6 +84,12 @@ def main():
         gui = ReproductorJellyfinUI()
         gui.show()
         
+        # El primer ciclo del event loop corre con la ventana ya pintada
+        def reportar_arranque():
+            startup_timing.mark("ventana visible")
+            startup_timing.report()
+        QTimer.singleShot(0, reportar_arranque)
+        
         # Ejecutar la aplicación
         return app.exec_()
         
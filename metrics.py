@@ -0,0 +1,256 @@
+"""
+Métricas de rendimiento
+Histogramas de latencia y tamaño y contadores, con etiquetas, en un registro
+global seguro entre hilos. Se exportan como JSON o en el formato de texto de
+Prometheus. Este módulo no depende de Qt: lo usan la API, el pool de tareas y
+la interfaz (el panel y el volcado periódico están en metrics_panel.py)
+"""
+
+import bisect
+import functools
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Sequence, Tuple
+
+# Límites superiores de los buckets (segundos y bytes)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+_Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Histograma de buckets fijos con suma, mínimo y máximo"""
+    __slots__ = ("bounds", "counts", "count", "sum", "min", "max")
+    
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        # Un bucket por límite más el de +Inf
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+    
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+    
+    def percentile(self, q: float) -> Optional[float]:
+        """Percentil aproximado: límite superior del bucket que lo contiene (acotado al máximo)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.bounds, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+    
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "buckets": dict(zip([*map(str, self.bounds), "+Inf"], self.counts)),
+        }
+
+
+class MetricsRegistry:
+    """Registro de histogramas y contadores identificados por nombre y etiquetas"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[_Labels, Histogram]] = {}
+        self._bounds: Dict[str, Tuple[float, ...]] = {}
+        self._counters: Dict[str, Dict[_Labels, float]] = {}
+        self._help: Dict[str, str] = {}
+    
+    def describe(self, name: str, text: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        """Registra la descripción (y los buckets, si es un histograma) de una métrica"""
+        with self._lock:
+            self._help[name] = text
+            self._bounds[name] = tuple(buckets)
+    
+    def observe(self, name: str, value: float, **labels):
+        """Agrega una observación a un histograma"""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self._bounds.get(name, LATENCY_BUCKETS))
+            histogram.observe(value)
+    
+    def inc(self, name: str, amount: float = 1, **labels):
+        """Incrementa un contador"""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+    
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Mide la duración del bloque en segundos"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+    
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+    
+    def snapshot(self) -> Dict:
+        """Copia de todas las métricas como diccionarios (para JSON o el panel)"""
+        with self._lock:
+            return {
+                "timestamp": time.time(),
+                "histograms": {
+                    name: [{"labels": dict(key), **h.to_dict()} for key, h in series.items()]
+                    for name, series in self._histograms.items()
+                },
+                "counters": {
+                    name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                    for name, series in self._counters.items()
+                },
+            }
+    
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False, separators=(",", ":"))
+    
+    def to_prometheus(self) -> str:
+        """Formato de texto de exposición de Prometheus"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, h in series.items():
+                    cumulative = 0
+                    for bound, n in zip([*map(_format_number, h.bounds), "+Inf"], h.counts):
+                        cumulative += n
+                        lines.append(f"{name}_bucket{_format_labels(key, le=bound)} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {_format_number(h.sum)}")
+                    lines.append(f"{name}_count{_format_labels(key)} {h.count}")
+            for name, series in sorted(self._counters.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_format_labels(key)} {_format_number(value)}")
+        return "\n".join(lines) + "\n"
+    
+    def dump(self, directory: str):
+        """Escribe metrics.json y metrics.prom en directory (escritura atómica)"""
+        os.makedirs(directory, exist_ok=True)
+        for filename, content in (("metrics.json", self.to_json()), ("metrics.prom", self.to_prometheus())):
+            path = os.path.join(directory, filename)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(key: _Labels, **extra) -> str:
+    pairs = [*key, *extra.items()]
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+# Registro global de la aplicación
+REGISTRY = MetricsRegistry()
+REGISTRY.describe("jellyfin_request_seconds", "Duración de las peticiones HTTP al servidor (hasta leer el cuerpo)")
+REGISTRY.describe("jellyfin_response_bytes", "Tamaño de las respuestas del servidor", SIZE_BUCKETS)
+REGISTRY.describe("jellyfin_request_errors_total", "Respuestas HTTP con código de error")
+REGISTRY.describe("task_queue_seconds", "Espera de las tareas en la cola del pool antes de ejecutarse")
+REGISTRY.describe("task_run_seconds", "Duración de las tareas en segundo plano")
+REGISTRY.describe("ui_slot_seconds", "Duración de los slots de la interfaz en el hilo principal")
+REGISTRY.describe("playback_ttfa_seconds", "Tiempo desde pedir la reproducción hasta el primer audio")
+REGISTRY.describe("playback_buffering_seconds", "Duración de cada espera por búfer durante la reproducción")
+REGISTRY.describe("playback_errors_total", "Errores de reproducción de VLC")
+
+_ID_RE = re.compile(r"/(Users|Items|Audio)/[^/]+")
+
+# Marca por hilo: quien pidió la respuesta en streaming registra él mismo la métrica
+_local = threading.local()
+
+
+def endpoint_label(path: str) -> str:
+    """Ruta sin IDs para usar como etiqueta (/Items/{id}/Download)"""
+    return _ID_RE.sub(r"/\1/{id}", path)
+
+
+@contextmanager
+def defer_stream_metrics():
+    """
+    Dentro del bloque, requests_hook no registra las respuestas en streaming
+    exitosas: quien las lee llama a observe_response al terminar el cuerpo
+    (JellyfinAPI._read_items)
+    """
+    _local.deferred = True
+    try:
+        yield
+    finally:
+        _local.deferred = False
+
+
+def observe_response(response, seconds: float, size: int):
+    """Registra latencia, tamaño y error (si lo hubo) de una respuesta"""
+    from urllib.parse import urlsplit
+    
+    endpoint = endpoint_label(urlsplit(response.url).path)
+    REGISTRY.observe("jellyfin_request_seconds", seconds, endpoint=endpoint)
+    REGISTRY.observe("jellyfin_response_bytes", size, endpoint=endpoint)
+    if response.status_code >= 400:
+        REGISTRY.inc("jellyfin_request_errors_total", endpoint=endpoint, status=str(response.status_code))
+
+
+def requests_hook(response, *args, **kwargs):
+    """
+    Hook de respuesta de requests.Session: registra latencia y tamaño por endpoint
+    
+    En las descargas en streaming solo se mide hasta los encabezados y se usa
+    Content-Length, para no leer el cuerpo antes que quien hizo la petición;
+    dentro de defer_stream_metrics las exitosas las registra quien las lee
+    """
+    seconds = response.elapsed.total_seconds()
+    if kwargs.get("stream"):
+        if response.status_code == 200 and getattr(_local, "deferred", False):
+            return response
+        size = int(response.headers.get("Content-Length") or 0)
+    else:
+        start = time.perf_counter()
+        size = len(response.content)
+        seconds += time.perf_counter() - start
+    observe_response(response, seconds, size)
+    return response
+
+
+def timed_slot(fn):
+    """Decorador para métodos de la interfaz: registra su duración en ui_slot_seconds"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with REGISTRY.timer("ui_slot_seconds", slot=fn.__name__):
+            return fn(*args, **kwargs)
+    return wrapper
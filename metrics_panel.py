@@ -0,0 +1,98 @@
+"""
+Panel de depuración y volcado periódico de las métricas
+El panel muestra, para cada histograma del registro, cantidad, p50, p95 y
+máximo, y los contadores; se refresca una vez por segundo mientras está
+visible. MetricsDumper escribe metrics.json y metrics.prom cada cierto tiempo
+"""
+
+from PyQt5.QtCore import QObject, Qt, QTimer
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import QHeaderView, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget
+
+from metrics import REGISTRY, MetricsRegistry
+
+
+def _formatear(name: str, value) -> str:
+    if value is None:
+        return "-"
+    if name.endswith("_bytes"):
+        return f"{value / 1024:.1f} KB" if value >= 1024 else f"{value:.0f} B"
+    return f"{value * 1000:.1f} ms"
+
+
+class MetricsPanel(QWidget):
+    """Ventana con la tabla de métricas del registro"""
+    
+    COLUMNS = ("Métrica", "Etiquetas", "Cantidad", "p50", "p95", "Máx.")
+    
+    def __init__(self, registry: MetricsRegistry = REGISTRY, parent=None):
+        super().__init__(parent, Qt.Window)
+        self.registry = registry
+        self.setWindowTitle("Métricas")
+        self.resize(760, 420)
+        
+        self.table = QTableWidget(0, len(self.COLUMNS), self)
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.table.setFont(QFont("Monospace", 9))
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.table)
+        
+        self._timer = QTimer(self)
+        self._timer.setInterval(1000)
+        self._timer.timeout.connect(self.refresh)
+    
+    def showEvent(self, event):
+        self.refresh()
+        self._timer.start()
+        super().showEvent(event)
+    
+    def hideEvent(self, event):
+        self._timer.stop()
+        super().hideEvent(event)
+    
+    def refresh(self):
+        snapshot = self.registry.snapshot()
+        rows = []
+        for name, series in sorted(snapshot["histograms"].items()):
+            for entry in series:
+                rows.append((
+                    name, entry["labels"], str(entry["count"]),
+                    _formatear(name, entry["p50"]), _formatear(name, entry["p95"]),
+                    _formatear(name, entry["max"])
+                ))
+        for name, series in sorted(snapshot["counters"].items()):
+            for entry in series:
+                rows.append((name, entry["labels"], f"{entry['value']:g}", "", "", ""))
+        
+        self.table.setRowCount(len(rows))
+        for row, (name, labels, *values) in enumerate(rows):
+            label_text = ", ".join(f"{k}={v}" for k, v in sorted(labels.items()))
+            for column, text in enumerate((name, label_text, *values)):
+                item = self.table.item(row, column)
+                if item is None:
+                    item = QTableWidgetItem()
+                    self.table.setItem(row, column, item)
+                item.setText(text)
+        self.table.resizeColumnToContents(0)
+
+
+class MetricsDumper(QObject):
+    """Escribe las métricas a disco cada interval_s segundos (y al cerrar)"""
+    
+    def __init__(self, directory: str, interval_s: float, registry: MetricsRegistry = REGISTRY, parent=None):
+        super().__init__(parent)
+        self.directory = directory
+        self.registry = registry
+        self._timer = QTimer(self)
+        self._timer.setInterval(int(interval_s * 1000))
+        self._timer.timeout.connect(self.dump)
+        self._timer.start()
+    
+    def dump(self):
+        try:
+            self.registry.dump(self.directory)
+        except OSError as e:
+            print(f"Error al guardar las métricas en {self.directory}: {e}")
@@ -0,0 +1,167 @@
+"""
+Cola de reproducción compacta
+Cada canción es un registro con __slots__ que guarda solo lo necesario para
+mostrarla; la URL de streaming se genera a partir del ID cuando hace falta
+"""
+
+import random
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+class Track:
+    """Canción de la cola (sin __dict__: unos 70 bytes más los textos compartidos)"""
+    __slots__ = ("id", "titulo", "numero", "duracion")
+    
+    def __init__(self, id: str, titulo: str, numero: int = 0, duracion: str = "00:00"):
+        self.id = id
+        self.titulo = titulo
+        self.numero = numero
+        self.duracion = duracion
+    
+    @classmethod
+    def from_song(cls, song: Dict) -> "Track":
+        """Crea el registro a partir de un diccionario de canción de JellyfinAPI"""
+        return cls(song["Id"], song["Titulo"], song.get("Numero") or 0, song.get("Duracion") or "00:00")
+
+
+class PlayQueue:
+    """
+    Cola de reproducción con la posición actual
+    
+    Agregar al final es O(1) amortizado; mover y mezclar las restantes se
+    pueden deshacer (pila de operaciones)
+    """
+    
+    def __init__(self, url_for: Callable[[str], str]):
+        """
+        Args:
+            url_for: Genera la URL de streaming a partir del ID de la canción
+        """
+        self.url_for = url_for
+        self.current = -1
+        self._tracks: List[Track] = []
+        self._undo: List[tuple] = []
+    
+    def __len__(self):
+        return len(self._tracks)
+    
+    def __bool__(self):
+        return bool(self._tracks)
+    
+    def __getitem__(self, index: int) -> Track:
+        return self._tracks[index]
+    
+    def __iter__(self):
+        return iter(self._tracks)
+    
+    def url(self, index: int) -> str:
+        """URL de streaming de una canción (se genera, no se guarda)"""
+        return self.url_for(self._tracks[index].id)
+    
+    def song(self, index: int) -> Dict:
+        """Diccionario de la canción, con el mismo formato que JellyfinAPI"""
+        track = self._tracks[index]
+        return {
+            "Titulo": track.titulo,
+            "Id": track.id,
+            "Numero": track.numero,
+            "Duracion": track.duracion,
+            "StreamUrl": self.url_for(track.id)
+        }
+    
+    def current_track(self) -> Optional[Track]:
+        if 0 <= self.current < len(self._tracks):
+            return self._tracks[self.current]
+        return None
+    
+    def has_next(self) -> bool:
+        return self.current < len(self._tracks) - 1
+    
+    def replace(self, songs: Iterable[Dict], current: int = -1):
+        """Reemplaza toda la cola"""
+        self._tracks = [Track.from_song(song) for song in songs]
+        self.current = current
+        self._undo.clear()
+    
+    def extend(self, songs: Iterable[Dict]) -> int:
+        """
+        Agrega canciones al final
+        
+        Returns:
+            Cantidad de canciones agregadas
+        """
+        before = len(self._tracks)
+        self._tracks.extend(Track.from_song(song) for song in songs)
+        return len(self._tracks) - before
+    
+    def rows(self) -> List[list]:
+        """Canciones como filas [id, titulo, numero, duracion] (para guardar la sesión)"""
+        return [[t.id, t.titulo, t.numero, t.duracion] for t in self._tracks]
+    
+    def replace_rows(self, rows: Iterable[list], current: int = -1):
+        """Reemplaza la cola a partir de filas guardadas con rows()"""
+        self._tracks = [Track(*row) for row in rows]
+        self.current = current
+        self._undo.clear()
+    
+    def clear(self):
+        self._tracks = []
+        self.current = -1
+        self._undo.clear()
+    
+    def move(self, source: int, target: int, record_undo: bool = True):
+        """Mueve la canción de la posición source a target, conservando la actual"""
+        if source == target:
+            return
+        track = self._tracks.pop(source)
+        self._tracks.insert(target, track)
+        if self.current == source:
+            self.current = target
+        elif source < self.current <= target:
+            self.current -= 1
+        elif target <= self.current < source:
+            self.current += 1
+        if record_undo:
+            self._undo.append(("move", source, target))
+    
+    def shuffle_remaining(self) -> int:
+        """
+        Mezcla las canciones posteriores a la actual
+        
+        Returns:
+            Posición de la primera canción mezclada
+        """
+        start = self.current + 1
+        remaining = self._tracks[start:]
+        self._undo.append(("shuffle", start, remaining[:]))
+        random.shuffle(remaining)
+        self._tracks[start:] = remaining
+        return start
+    
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+    
+    def undo(self) -> Optional[tuple]:
+        """
+        Deshace el último movimiento o mezcla
+        
+        Returns:
+            La operación deshecha (("move", source, target) o ("shuffle", start, canciones)),
+            o None si no había nada que deshacer
+        """
+        if not self._undo:
+            return None
+        operation = self._undo.pop()
+        if operation[0] == "move":
+            _, source, target = operation
+            self.move(target, source, record_undo=False)
+        else:
+            _, start, previous = operation
+            current_track = self.current_track()
+            self._tracks[start:start + len(previous)] = previous
+            # La canción en curso pudo estar entre las mezcladas
+            if current_track is not None and start <= self.current < start + len(previous):
+                self.current = start + next(
+                    i for i, track in enumerate(previous) if track is current_track
+                )
+        return operation
@@ -0,0 +1,233 @@
+"""
+Motor de reproducción sobre VLC
+Mantiene dos reproductores: el activo y uno en espera que abre y precarga
+(en pausa) la siguiente canción de la cola, para que el cambio de pista sea
+inmediato y no dependa de la red. Los medios del álbum seleccionado se pueden
+analizar por adelantado (prepare) para ahorrar el sondeo al reproducir
+"""
+
+import functools
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+import vlc
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+def create_vlc_instance(network_caching_ms: int, file_caching_ms: int) -> "vlc.Instance":
+    """
+    Instancia de VLC ajustada para empezar rápido
+    
+    Args:
+        network_caching_ms: Búfer de red antes de empezar a sonar
+        file_caching_ms: Búfer de archivos locales (caché de audio)
+    """
+    return vlc.Instance([
+        f"--network-caching={network_caching_ms}",
+        f"--file-caching={file_caching_ms}",
+        # Solo audio: no se inicializan salidas de video ni se buscan subtítulos
+        "--no-video",
+        "--no-sub-autodetect-file",
+        "--quiet",
+    ])
+
+
+class PlaybackEngine(QObject):
+    """Reproductor VLC con precarga de la siguiente canción"""
+    # Medios analizados por adelantado que se conservan, y espera máxima del análisis
+    MAX_PREPARED = 32
+    PARSE_TIMEOUT_MS = 5000
+    
+    # Se emiten en el hilo de la UI y solo para la canción en curso: los eventos de
+    # VLC encolados antes de play() o stop() se descartan
+    track_ended = pyqtSignal()
+    time_changed = pyqtSignal(int)  # Posición en ms
+    length_changed = pyqtSignal(int)  # Duración en ms
+    buffering = pyqtSignal(float)  # Porcentaje del búfer de red
+    error_occurred = pyqtSignal()
+    
+    # Interna: (generación, nombre de la señal, valor) desde el hilo de VLC
+    _vlc_event = pyqtSignal(int, str, object)
+    
+    def __init__(self, instance: "vlc.Instance", gapless: bool = True, analyzer=None, parent=None):
+        """
+        Args:
+            instance: Instancia de VLC
+            gapless: Si es False no se precarga la siguiente canción
+            analyzer: SpectrumAnalyzer opcional que sigue a la canción en curso
+        """
+        super().__init__(parent)
+        self.instance = instance
+        self.gapless = gapless
+        self.analyzer = analyzer
+        self.player = instance.media_player_new()
+        self._standby = instance.media_player_new()
+        # Identifica la canción en espera: el ID de la pista o, si no se dio, la URL
+        self._standby_key = None
+        self._volume = 100
+        # URL -> Media ya analizado (sondeo del formato hecho de antemano)
+        self._prepared: "OrderedDict[str, vlc.Media]" = OrderedDict()
+        # Aumenta en cada play() y stop(); cada evento lleva la que había al ocurrir
+        self._generation = 0
+        self._vlc_event.connect(self._deliver)
+        
+        # Evento de VLC -> (señal, campo de event.u con el valor a emitir)
+        events = (
+            (vlc.EventType.MediaPlayerEndReached, "track_ended", None),
+            (vlc.EventType.MediaPlayerTimeChanged, "time_changed", "new_time"),
+            (vlc.EventType.MediaPlayerLengthChanged, "length_changed", "new_length"),
+            (vlc.EventType.MediaPlayerBuffering, "buffering", "new_cache"),
+            (vlc.EventType.MediaPlayerEncounteredError, "error_occurred", None),
+        )
+        for player in (self.player, self._standby):
+            event_manager = player.event_manager()
+            for event_type, signal, field in events:
+                event_manager.event_attach(
+                    event_type, functools.partial(self._on_event, player, signal, field)
+                )
+    
+    def _on_event(self, player, signal, field, event):
+        """Callback de VLC (hilo propio de VLC): no llamar a libvlc desde aquí"""
+        # La generación se lee antes de comprobar el reproductor: play() cambia
+        # de reproductor antes de aumentarla, así un evento viejo nunca lleva la nueva
+        generation = self._generation
+        if player is not self.player:
+            return
+        self._vlc_event.emit(generation, signal, getattr(event.u, field) if field else None)
+    
+    def _deliver(self, generation, signal, value):
+        """Publica en el hilo de la UI un evento de VLC, salvo que sea de antes de play() o stop()"""
+        if generation != self._generation:
+            return
+        if value is None:
+            getattr(self, signal).emit()
+        else:
+            getattr(self, signal).emit(value)
+    
+    def play(self, url: str, start_ms: int = 0, key: Optional[str] = None):
+        """
+        Reproduce url; si es la canción precargada, solo cambia de reproductor
+        
+        Args:
+            url: URL o ruta local
+            start_ms: Posición inicial en ms (para reanudar una sesión)
+            key: ID de la canción; si coincide con el de la precarga se usa el
+                reproductor en espera aunque url haya cambiado desde entonces
+                (la canción terminó de bajarse a la caché o cambió la calidad)
+        """
+        if self.is_preloaded(url, key) and start_ms <= 0:
+            previous = self.player
+            self.player, self._standby = self._standby, previous
+            self._standby_key = None
+            self._generation += 1
+            self.player.set_pause(0)
+            self.player.audio_set_volume(self._volume)
+            previous.stop()
+            # La duración llegó mientras estaba en espera: se vuelve a publicar
+            length = self.player.get_length()
+            if length > 0:
+                self.length_changed.emit(length)
+        else:
+            self.player.stop()
+            self._generation += 1
+            media = self._media(url)
+            if start_ms > 0:
+                media.add_option(f":start-time={start_ms / 1000:.3f}")
+            self.player.set_media(media)
+            self.player.play()
+            self.player.audio_set_volume(self._volume)
+        
+        if self.analyzer:
+            self.analyzer.start(url, self.get_time)
+    
+    def is_preloaded(self, url: str, key: Optional[str] = None) -> bool:
+        """Indica si play(url, key=key) solo cambiará al reproductor en espera"""
+        return self.gapless and self._standby_key is not None and (key or url) == self._standby_key
+    
+    def preload(self, url: str, key: Optional[str] = None):
+        """
+        Abre y precarga url en el reproductor en espera, sin reproducirla
+        
+        Args:
+            key: ID de la canción (ver play); si ya está precargada no se vuelve a abrir
+        """
+        if not self.gapless or not url or self.is_preloaded(url, key):
+            return
+        self._standby.stop()
+        media = self._media(url)
+        # La entrada se abre y se llena el búfer, pero queda en pausa en el primer cuadro
+        media.add_option(":start-paused")
+        self._standby.set_media(media)
+        self._standby.play()
+        self._standby_key = key or url
+    
+    def prepare(self, urls: Iterable[str]):
+        """
+        Analiza en segundo plano (hilos de libvlc) los medios de urls, para que
+        al reproducirlos no haya que esperar el sondeo del formato
+        """
+        for url in urls:
+            if url in self._prepared:
+                self._prepared.move_to_end(url)
+                continue
+            media = self.instance.media_new(url)
+            media.parse_with_options(vlc.MediaParseFlag.network, self.PARSE_TIMEOUT_MS)
+            self._prepared[url] = media
+        while len(self._prepared) > self.MAX_PREPARED:
+            _, media = self._prepared.popitem(last=False)
+            media.release()
+    
+    def _media(self, url: str) -> "vlc.Media":
+        """Media ya analizado de url si lo hay; si no, uno nuevo"""
+        media = self._prepared.pop(url, None)
+        return media if media is not None else self.instance.media_new(url)
+    
+    def clear_preload(self):
+        """Descarta la canción precargada"""
+        if self._standby_key is not None:
+            self._standby.stop()
+            self._standby_key = None
+    
+    def pause(self):
+        self.player.pause()
+        if self.analyzer:
+            self.analyzer.set_pause(True)
+    
+    def set_pause(self, paused: int):
+        self.player.set_pause(paused)
+        if self.analyzer:
+            self.analyzer.set_pause(bool(paused))
+    
+    def stop(self):
+        """Detiene la reproducción y descarta la precarga"""
+        self.player.stop()
+        self._generation += 1
+        self.clear_preload()
+        if self.analyzer:
+            self.analyzer.stop()
+    
+    def get_time(self) -> int:
+        return self.player.get_time()
+    
+    def get_length(self) -> int:
+        return self.player.get_length()
+    
+    def audio_set_volume(self, volume: int):
+        self._volume = volume
+        self.player.audio_set_volume(volume)
+    
+    def audio_set_balance(self, balance: float):
+        # python-vlc no expone balance en todas las versiones
+        if hasattr(self.player, "audio_set_balance"):
+            self.player.audio_set_balance(balance)
+    
+    def release(self):
+        """Libera ambos reproductores"""
+        # Primero el analizador: su hilo consulta get_time() del reproductor principal
+        if self.analyzer:
+            self.analyzer.release()
+        for media in self._prepared.values():
+            media.release()
+        self._prepared.clear()
+        self.player.release()
+        self._standby.release()
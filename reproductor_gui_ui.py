@@ -1,23 +1,36 @@
 import sys
 import time
-import vlc
 import random
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
     QPushButton, QLineEdit, QLabel, QListWidget, QMessageBox,
-    QTabWidget, QSplitter, QFrame, QProgressBar, QComboBox, QListWidgetItem,
-    QSlider, QGroupBox, QCheckBox, QMainWindow
+    QTabWidget, QSplitter, QFrame, QProgressBar, QComboBox,
+    QSlider, QGroupBox, QCheckBox, QMainWindow, QShortcut
 )
-from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal
-from PyQt5.QtGui import QFont, QIcon, QPalette, QColor, QPainter, QBrush, QLinearGradient
-from PyQt5 import uic
+from PyQt5.QtCore import Qt, QTimer, QRect, QSize, pyqtSignal
+from PyQt5.QtGui import QFont, QIcon, QPalette, QColor, QPainter, QBrush, QLinearGradient, QKeySequence
 from jellyfin_api import JellyfinAPI, DEFAULT_CONFIG
+from api_cache import ResponseCache
+from http_transport import HttpTransport, CircuitBreaker
+from library_store import LibraryStore, LibrarySync
+from task_pool import TaskPool
+from audio_cache import AudioCache
+from stream_selection import StreamSelector
+from album_art import AlbumArtCache
+from play_queue import PlayQueue
+from session_store import SessionStore
+from list_models import AlbumListModel, AlbumFilterProxyModel, SongListModel, QueueListModel
+from search_index import AlbumSearchIndex
 from config_ui import get_config, apply_config_to_window
 from winamp_styles import apply_winamp_theme_to_window
 from icon_helper import IconHelper, print_icon_status
+from ui_compiler import cargar_ui
+import startup_timing
+from metrics import REGISTRY, timed_slot
+from metrics_panel import MetricsPanel, MetricsDumper
 
 class VisualizerWidget(QWidget):
-    """Widget para simular el visualizador de Winamp"""
+    """Widget del visualizador de Winamp (espectro real si hay analizador, si no simulado)"""
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setMinimumHeight(50)
@@ -27,11 +40,30 @@ class VisualizerWidget(QWidget):
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_visualizer)
         self.is_playing = False
+        self.analyzer = None
+        # Se pinta todo el fondo en paintEvent: Qt no necesita borrarlo antes
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self._brush = None
+        self._brush_height = None
+        self._last_heights = None
+    
+    def set_analyzer(self, analyzer):
+        """
+        Usa el espectro de un SpectrumAnalyzer en lugar de barras aleatorias
+        (mientras analice la canción en curso; ver SpectrumAnalyzer.start)
+        """
+        self.analyzer = analyzer
     
     def start_animation(self):
         """Inicia la animación del visualizador"""
         self.is_playing = True
-        self.timer.start(100)
+        if self.analyzer and self.analyzer.is_active():
+            # Con espectro real se actualiza a la frecuencia de refresco de la pantalla
+            screen = QApplication.primaryScreen()
+            refresh_rate = screen.refreshRate() if screen else 60
+            self.timer.start(max(1, int(1000 / (refresh_rate or 60))))
+        else:
+            self.timer.start(100)
         self.setVisible(True)
     
     def stop_animation(self):
@@ -41,81 +73,127 @@ class VisualizerWidget(QWidget):
         self.setVisible(False)
         # Resetear barras a estado estático
         self.bars = [5 for _ in range(32)]
-        self.update()
+        self._update_if_changed()
     
     def update_visualizer(self):
-        """Actualiza el visualizador con datos aleatorios"""
+        """Actualiza el visualizador con el espectro o, sin analizador, con datos aleatorios"""
         if not self.is_playing:
             return
-            
-        for i in range(len(self.bars)):
-            if random.random() < 0.3:  # 30% de probabilidad de cambio
-                self.bars[i] = random.randint(1, 25)
-        self.update()
+        
+        if self.analyzer and self.analyzer.is_active():
+            self.bars = (self.analyzer.bands() * 25).tolist()
+        else:
+            for i in range(len(self.bars)):
+                if random.random() < 0.3:  # 30% de probabilidad de cambio
+                    self.bars[i] = random.randint(1, 25)
+        self._update_if_changed()
+    
+    def _bar_heights(self):
+        """Altura en píxeles de cada barra"""
+        height = self.height()
+        return [int((value / 25) * height) for value in self.bars]
+    
+    def _update_if_changed(self):
+        """Solo repinta si alguna barra cambió de altura en píxeles"""
+        heights = self._bar_heights()
+        if heights != self._last_heights:
+            self._last_heights = heights
+            self.update()
+    
+    def _gradient_brush(self):
+        """Pincel con el gradiente verde de Winamp, reconstruido solo si cambia la altura"""
+        height = self.height()
+        if self._brush is None or self._brush_height != height:
+            gradient = QLinearGradient(0, 0, 0, height)
+            gradient.setColorAt(0, QColor(0, 255, 0))
+            gradient.setColorAt(1, QColor(0, 128, 0))
+            self._brush = QBrush(gradient)
+            self._brush_height = height
+        return self._brush
+    
+    def resizeEvent(self, event):
+        self._last_heights = None
+        super().resizeEvent(event)
     
     def paintEvent(self, event):
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
         
         # Fondo negro
         painter.fillRect(self.rect(), QColor(0, 0, 0))
         
-        # Dibujar barras del espectro
+        # Barras del espectro en una sola llamada (rectángulos alineados: sin antialiasing)
+        height = self.height()
         bar_width = self.width() // len(self.bars)
-        for i, height in enumerate(self.bars):
-            x = i * bar_width
-            bar_height = int((height / 25) * self.height())  # Convertir a int
-            y = self.height() - bar_height
-            
-            # Gradiente verde como Winamp
-            gradient = QLinearGradient(x, y, x, self.height())
-            gradient.setColorAt(0, QColor(0, 255, 0))
-            gradient.setColorAt(1, QColor(0, 128, 0))
-            
-            # Convertir todas las coordenadas a enteros
-            painter.fillRect(int(x + 1), int(y), int(bar_width - 2), int(bar_height), QBrush(gradient))
+        rects = [
+            QRect(i * bar_width + 1, height - bar_height, bar_width - 2, bar_height)
+            for i, bar_height in enumerate(self._bar_heights())
+            if bar_height > 0
+        ]
+        if rects:
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(self._gradient_brush())
+            painter.drawRects(rects)
 
-class WorkerThread(QThread):
-    """Hilo para cargar datos de Jellyfin sin bloquear la interfaz"""
-    albums_loaded = pyqtSignal(list)
-    songs_loaded = pyqtSignal(list)
-    error_occurred = pyqtSignal(str)
-    
-    def __init__(self, jellyfin_api):
-        super().__init__()
-        self.jellyfin_api = jellyfin_api
-        self.task = None
-        self.album_id = None
-    
-    def load_albums(self):
-        self.task = "albums"
-        self.start()
-    
-    def load_songs(self, album_id):
-        self.task = "songs"
-        self.album_id = album_id
-        self.start()
+def tarea_probar_conexion(ctx, jellyfin_api):
+    return jellyfin_api.test_connection()
+
+def tarea_cargar_albumes(ctx, jellyfin_api, library_sync, page_size):
+    """Tarea del pool: carga (o sincroniza) los álbumes reportando cada página"""
+    if library_sync:
+        # Con índice local solo se descargan los cambios; las páginas
+        # se reportan únicamente en la primera sincronización
+        return library_sync.sincronizar(on_page=ctx.report, is_cancelled=ctx.is_cancelled)
     
-    def run(self):
-        try:
-            if self.task == "albums":
-                albums = self.jellyfin_api.listar_albumes()
-                self.albums_loaded.emit(albums)
-            elif self.task == "songs":
-                songs = self.jellyfin_api.obtener_canciones_del_album(self.album_id)
-                self.songs_loaded.emit(songs)
-        except Exception as e:
-            self.error_occurred.emit(str(e))
+    total = 0
+    for page in jellyfin_api.iterar_paginas_albumes(page_size):
+        if ctx.is_cancelled():
+            break
+        total += len(page)
+        ctx.report(page)
+    return total
+
+def tarea_listar_albumes_locales(ctx, library_store):
+    """Tarea del pool: lee los álbumes guardados en el índice local"""
+    return library_store.listar_albumes()
+
+def tarea_construir_indice(ctx, nombres, artistas):
+    """Tarea del pool: construye el índice de búsqueda de álbumes"""
+    return AlbumSearchIndex(nombres, artistas)
+
+def tarea_buscar_en_servidor(ctx, metodo, query):
+    """Tarea del pool: ejecuta una búsqueda del servidor y devuelve (consulta, resultados)"""
+    return query, metodo(query)
+
+def tarea_llenar_cache_audio(ctx, audio_cache, items, on_transfer):
+    """Tarea del pool: descarga a la caché de audio las canciones indicadas"""
+    return audio_cache.fill(items, is_cancelled=ctx.is_cancelled, on_transfer=on_transfer)
+
+def tarea_medir_caudal(ctx, stream_selector, url):
+    """Tarea del pool: mide el caudal descargando el comienzo de una canción"""
+    stream_selector.probe(url, is_cancelled=ctx.is_cancelled)
+
+def tarea_cargar_canciones(ctx, jellyfin_api, library_store, album_id):
+    """Tarea del pool: carga las canciones de un álbum y las guarda en el índice"""
+    songs = jellyfin_api.obtener_canciones_del_album(album_id)
+    if songs and library_store and not ctx.is_cancelled():
+        library_store.guardar_canciones(album_id, songs)
+    return songs
 
 class ReproductorJellyfinUI(QMainWindow):
+    # Canales del pool usados por la búsqueda en el servidor
+    CANALES_BUSQUEDA_SERVIDOR = ("search_albums", "search_tracks", "search_artists")
+    # Espera tras mostrar la ventana antes de inicializar VLC (modo fast_start)
+    RETARDO_VLC_MS = 300
+    
     def __init__(self):
         super().__init__()
         
         # Cargar configuración
         self.config = get_config()
         
-        # Cargar la interfaz desde el archivo .ui
-        uic.loadUi('main_window.ui', self)
+        # Cargar la interfaz compilada desde main_window.ui (se regenera si cambia)
+        cargar_ui(self)
+        startup_timing.mark("interfaz cargada")
         
         # Aplicar configuración
         apply_config_to_window(self)
@@ -130,27 +208,142 @@ class ReproductorJellyfinUI(QMainWindow):
         print_icon_status()
         
         # Inicializar variables
+        network = self.config["network"]
         self.jellyfin_api = JellyfinAPI(
             DEFAULT_CONFIG["JELLYFIN_URL"],
             DEFAULT_CONFIG["API_KEY"],
-            DEFAULT_CONFIG["USER_ID"]
+            DEFAULT_CONFIG["USER_ID"],
+            ResponseCache(
+                self.config["library"]["response_cache_size"],
+                self.config["library"]["response_cache_ttl"]
+            ),
+            HttpTransport(
+                pool_size=network["pool_size"],
+                connect_timeout=network["connect_timeout"],
+                read_timeout=network["read_timeout"],
+                retries=network["retries"],
+                backoff_base=network["backoff_base"],
+                backoff_max=network["backoff_max"],
+                breaker=CircuitBreaker(network["breaker_failures"], network["breaker_reset_s"])
+            ),
+            lean_fetch=self.config["library"]["lean_fetch"]
         )
-        self.worker_thread = WorkerThread(self.jellyfin_api)
-        self.worker_thread.albums_loaded.connect(self.on_albums_loaded)
-        self.worker_thread.songs_loaded.connect(self.on_songs_loaded)
-        self.worker_thread.error_occurred.connect(self.on_error)
+        
+        # Índice local de la biblioteca (SQLite)
+        self.library_store = None
+        self.library_sync = None
+        if self.config["library"]["enable_local_index"]:
+            try:
+                self.library_store = LibraryStore(
+                    self.config["library"]["db_path"], self.jellyfin_api
+                )
+                self.library_sync = LibrarySync(
+                    self.jellyfin_api,
+                    self.library_store,
+                    self.config["library"]["album_page_size"]
+                )
+            except Exception as e:
+                print(f"Error al abrir el índice local: {e}")
+        
+        # Caché de audio en disco: las canciones ya descargadas se reproducen localmente
+        self.audio_cache = None
+        if self.config["playback"]["audio_cache_mb"] > 0:
+            try:
+                self.audio_cache = AudioCache(
+                    self.config["playback"]["audio_cache_dir"],
+                    self.config["playback"]["audio_cache_mb"] * 1024 * 1024,
+                    self.jellyfin_api.session
+                )
+            except Exception as e:
+                print(f"Error al abrir la caché de audio: {e}")
+        
+        # Calidad de streaming adaptada al caudal medido en las descargas
+        playback_config = self.config["playback"]
+        self.stream_selector = StreamSelector(
+            self.jellyfin_api,
+            quality=playback_config["stream_quality"],
+            tiers_kbps=playback_config["stream_tiers_kbps"],
+            original_min_kbps=playback_config["stream_original_min_kbps"],
+            container=playback_config["transcode_container"],
+            audio_codec=playback_config["transcode_codec"]
+        )
+        
+        # Pool de tareas: cada canal entrega solo el resultado de la petición más reciente
+        self.task_pool = TaskPool(self.config["library"]["worker_threads"], self)
+        self.task_pool.result_ready.connect(self.on_task_result)
+        self.task_pool.partial_result.connect(self.on_task_partial)
+        self.task_pool.task_failed.connect(self.on_task_failed)
+        
+        # Pool propio para las descargas de la caché de audio (como AlbumArtCache):
+        # duran lo que una canción y no deben demorar las cargas de la interfaz
+        self.cache_pool = TaskPool(1, self)
+        self.cache_pool.task_failed.connect(self.on_cache_fill_failed)
         
         # Variables de reproducción
         self.instance = None
         self.player = None
-        self.queue = []
-        self.queue_info = []
-        self.current_index = -1
+        self.vlc_intentado = False
+        # Cola única: registros compactos con la posición actual (URLs generadas al vuelo)
+        self.queue = PlayQueue(self.jellyfin_api.url_stream)
         self.is_playing = False
         self.is_paused = False
-        self.albums = []
+        self.posicion_actual = -1
+        self.duracion_actual = 0
+        self.sync_incremental = False
+        # Lectura del índice local en curso: la sincronización espera a que termine
+        # (decide si es incremental según los álbumes mostrados)
+        self.carga_local_pendiente = False
+        self.sincronizar_tras_carga_local = False
+        self.estado_carga_local = None
         self.current_album_songs = []
         
+        # Modelos de las listas (los datos viven en el modelo, no en items)
+        self.album_model = AlbumListModel(self.jellyfin_api._get_image_url, self)
+        self.song_model = SongListModel(self)
+        self.queue_model = QueueListModel(self.queue, self)
+        self.album_filter = AlbumFilterProxyModel(self)
+        self.album_filter.setSourceModel(self.album_model)
+        self.albumsList.setModel(self.album_filter)
+        self.songsList.setModel(self.song_model)
+        self.queueList.setModel(self.queue_model)
+        
+        # Sesión: la cola y la posición se guardan en disco con escrituras agrupadas
+        self.session = None
+        # (ID de canción, ms) restaurado de la sesión anterior, pendiente de reanudar
+        self.posicion_reanudar = None
+        if playback_config["restore_session"]:
+            try:
+                self.session = SessionStore(playback_config["session_path"], self.queue, parent=self)
+                self.queue_model.queue_changed.connect(self.session.queue_changed)
+            except OSError as e:
+                print(f"Error al abrir la sesión guardada: {e}")
+        
+        # Carátulas: se descargan en segundo plano solo para las filas visibles
+        self.album_art = None
+        if self.config["ui"]["show_album_art"]:
+            art_size = self.config["ui"]["album_art_size"]
+            self.album_art = AlbumArtCache(
+                self.jellyfin_api,
+                self.config["ui"]["album_art_cache_dir"],
+                art_size,
+                self.config["ui"]["album_art_memory_items"],
+                parent=self
+            )
+            self.album_model.set_art_cache(self.album_art)
+            self.albumsList.setIconSize(QSize(art_size, art_size))
+        
+        # Búsqueda local: índice construido en segundo plano y filtro con debounce
+        self.search_index = None
+        self.busqueda_actual = ""
+        self.filas_locales = None
+        self.filas_servidor = set()
+        self.artistas_servidor = []
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.config["ui"]["search_debounce_ms"])
+        self.search_timer.timeout.connect(self.aplicar_busqueda)
+        self.album_model.modelReset.connect(self.reconstruir_indice_busqueda)
+        
         # Configurar el visualizador
         self.visualizer = VisualizerWidget()
         self.verticalLayout.addWidget(self.visualizer)
@@ -159,18 +352,42 @@ class ReproductorJellyfinUI(QMainWindow):
         if not self.config["features"]["enable_visualizer"]:
             self.visualizer.setVisible(False)
         
+        # Métricas: panel de depuración (Ctrl+Shift+M) y volcado periódico a disco
+        self.metrics_panel = None
+        self.metrics_dumper = None
+        if self.config["features"]["metrics_dump_interval_s"] > 0:
+            self.metrics_dumper = MetricsDumper(
+                self.config["features"]["metrics_dir"],
+                self.config["features"]["metrics_dump_interval_s"],
+                parent=self
+            )
+        # Instantes de inicio de la reproducción y de la espera por búfer en curso
+        self.inicio_reproduccion = None
+        self.inicio_buffering = None
+        
         # Conectar señales
         self.connect_signals()
         
-        # Configurar timer
-        self.setup_timer()
-        
-        # Verificar VLC
-        self.check_vlc_installation()
+        # VLC se inicializa al reproducir, o poco después de mostrar la ventana con
+        # fast_start (ver asegurar_reproductor), y los datos se cargan cuando la
+        # ventana ya está visible
+        startup_timing.mark("ventana construida")
+        QTimer.singleShot(0, self.cargar_datos_iniciales)
+    
+    def cargar_datos_iniciales(self):
+        """Primer ciclo del event loop: datos locales y luego la red en segundo plano"""
+        # Mostrar el catálogo y la cola guardados antes de tocar la red
+        self.cargar_albumes_locales()
+        self.restaurar_sesion()
+        startup_timing.mark("datos locales mostrados")
         
         # Probar conexión
         if self.config["interface"]["auto_connect"]:
             self.test_connection()
+        
+        # Arranque rápido: VLC queda listo antes del primer doble clic
+        if self.config["playback"]["fast_start"]:
+            QTimer.singleShot(self.RETARDO_VLC_MS, self.asegurar_reproductor)
     
     def connect_signals(self):
         """Conecta todas las señales de la interfaz"""
@@ -191,98 +408,305 @@ class ReproductorJellyfinUI(QMainWindow):
         
         # Búsqueda y refresh
         self.searchInput.textChanged.connect(self.on_search_changed)
-        self.refreshButton.clicked.connect(self.load_albums)
+        self.refreshButton.clicked.connect(self.refrescar)
         
         # Listas
-        self.albumsList.itemClicked.connect(self.on_album_selected)
-        self.songsList.itemDoubleClicked.connect(self.on_song_double_clicked)
-        self.queueList.itemDoubleClicked.connect(self.on_queue_item_double_clicked)
+        self.albumsList.clicked.connect(self.on_album_selected)
+        self.songsList.doubleClicked.connect(self.on_song_double_clicked)
+        self.queueList.doubleClicked.connect(self.on_queue_item_double_clicked)
+        
+        # Atajos de la cola (con el foco en la lista): deshacer y mover canciones
+        for keys, slot in ((QKeySequence.Undo, self.deshacer_cola),
+                           (QKeySequence("Alt+Up"), lambda: self.mover_en_cola(-1)),
+                           (QKeySequence("Alt+Down"), lambda: self.mover_en_cola(1))):
+            shortcut = QShortcut(keys, self.queueList)
+            shortcut.setContext(Qt.WidgetShortcut)
+            shortcut.activated.connect(slot)
         
         # Controles de audio
         self.volumeSlider.valueChanged.connect(self.on_volume_changed)
         self.balanceSlider.valueChanged.connect(self.on_balance_changed)
+        
+        QShortcut(QKeySequence("Ctrl+Shift+M"), self).activated.connect(self.mostrar_metricas)
+    
+    def mostrar_metricas(self):
+        """Muestra el panel de métricas (Ctrl+Shift+M)"""
+        if self.metrics_panel is None:
+            self.metrics_panel = MetricsPanel(parent=self)
+        self.metrics_panel.show()
+        self.metrics_panel.raise_()
+    
+    def asegurar_reproductor(self) -> bool:
+        """
+        Crea la instancia de VLC y el reproductor la primera vez que se necesitan
+        
+        Returns:
+            True si hay reproductor disponible
+        """
+        if not self.vlc_intentado:
+            self.vlc_intentado = True
+            self.check_vlc_installation()
+        return self.player is not None
     
     def check_vlc_installation(self):
         """Verifica si VLC está instalado"""
         try:
-            self.instance = vlc.Instance()
-            self.player = self.instance.media_player_new()
+            # Importaciones diferidas: cargar libvlc (y NumPy) demora el arranque
+            import vlc
+            from playback import PlaybackEngine, create_vlc_instance
+            from spectrum import SpectrumAnalyzer
+            
+            playback_config = self.config["playback"]
+            self.instance = create_vlc_instance(
+                int(playback_config["cache_duration"] * 1000),
+                int(playback_config["file_cache_duration"] * 1000)
+            )
+            analyzer = None
+            if self.config["features"]["enable_visualizer"] and SpectrumAnalyzer.available():
+                try:
+                    analyzer = SpectrumAnalyzer(
+                        self.instance, len(self.visualizer.bars),
+                        analyze_streams=self.config["features"]["spectrum_streams"]
+                    )
+                except Exception as e:
+                    print(f"Error al iniciar el analizador de espectro: {e}")
+            self.visualizer.set_analyzer(analyzer)
+            self.player = PlaybackEngine(
+                self.instance, self.config["playback"]["gapless"], analyzer, self
+            )
+            # El estado de reproducción llega por eventos de VLC (sin sondeo periódico)
+            self.player.track_ended.connect(self.on_track_ended)
+            self.player.time_changed.connect(self.on_time_changed)
+            self.player.length_changed.connect(self.on_length_changed)
+            self.player.buffering.connect(self.on_buffering)
+            self.player.error_occurred.connect(self.on_playback_error)
+            self.player.audio_set_volume(self.volumeSlider.value())
+            self.player.audio_set_balance(self.balanceSlider.value() / 100.0)
+            startup_timing.mark("VLC inicializado")
         except Exception as e:
             QMessageBox.critical(self, "Error VLC", 
                                f"Error al inicializar VLC: {str(e)}\n"
                                "Asegúrate de que VLC esté instalado.")
     
-    def setup_timer(self):
-        """Configura el timer para actualizar el tiempo de reproducción"""
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.actualizar_tiempo)
-        self.timer.start(1000)
-    
     def test_connection(self):
-        """Prueba la conexión con Jellyfin"""
-        if self.jellyfin_api.test_connection():
+        """Prueba la conexión con Jellyfin en segundo plano"""
+        self.statusLabel.setText("🔄 Conectando...")
+        self.task_pool.submit("connection", tarea_probar_conexion, self.jellyfin_api)
+    
+    def on_connection_tested(self, conectado):
+        """Callback con el resultado de la prueba de conexión"""
+        startup_timing.mark("conexión probada")
+        if conectado:
             self.statusLabel.setText("✅ Conectado a Jellyfin")
             self.load_albums()
         else:
             self.statusLabel.setText("❌ Error de conexión")
     
+    def cargar_albumes_locales(self, estado=None):
+        """
+        Muestra los álbumes guardados en el índice local (se leen en segundo
+        plano: con decenas de miles de álbumes la consulta bloquearía la interfaz)
+        
+        Args:
+            estado: Texto de la barra de estado al terminar ({} = cantidad de
+                álbumes); por defecto solo se indica si el índice tenía álbumes
+        """
+        if not self.library_store:
+            return
+        
+        self.carga_local_pendiente = True
+        self.estado_carga_local = estado
+        self.task_pool.submit("local_albums", tarea_listar_albumes_locales, self.library_store)
+    
+    @timed_slot
+    def on_local_albums_loaded(self, albums):
+        """Callback con los álbumes leídos del índice local"""
+        self.carga_local_pendiente = False
+        if albums:
+            self.album_model.set_albums(albums)
+        estado = self.estado_carga_local
+        if estado is None and albums:
+            estado = "💾 {} álbumes (índice local)"
+        if estado:
+            self.statusLabel.setText(estado.format(self.album_model.rowCount()))
+        
+        if self.sincronizar_tras_carga_local:
+            self.sincronizar_tras_carga_local = False
+            self.load_albums()
+    
+    def restaurar_sesion(self):
+        """Restaura la cola y la posición de la sesión anterior (solo disco)"""
+        if not self.session:
+            return
+        data = self.session.load()
+        if not data:
+            return
+        try:
+            self.queue_model.restore(data["tracks"], data["current"])
+        except (TypeError, ValueError) as e:
+            print(f"Sesión guardada inválida: {e}")
+            return
+        self.session.set_position(self.queue.current, data["position_ms"])
+        track = self.queue.current_track()
+        if track is not None:
+            # Queda lista para reanudar en el mismo segundo con Reproducir
+            self.posicion_reanudar = (track.id, data["position_ms"])
+            self.currentSongLabel.setText(f"{track.titulo} ({track.duracion})")
+            posicion = time.strftime('%M:%S', time.gmtime(data["position_ms"] // 1000))
+            self.timeLabel.setText(f"{posicion} / {track.duracion}")
+        self.actualizar_lista_cola()
+        self.actualizar_estado_botones()
+    
+    def refrescar(self):
+        """Descarta las respuestas cacheadas y vuelve a cargar los álbumes"""
+        self.jellyfin_api.invalidar_cache()
+        self.load_albums()
+    
     def load_albums(self):
-        """Carga la lista de álbumes"""
+        """Carga la lista de álbumes (o sincroniza el índice local)"""
         self.statusLabel.setText("🔄 Cargando...")
-        self.worker_thread.load_albums()
+        if self.carga_local_pendiente:
+            self.sincronizar_tras_carga_local = True
+            return
+        
+        # Si ya se muestra el índice local, la sincronización solo trae cambios
+        self.sync_incremental = bool(self.library_sync and self.album_model.rowCount())
+        if not self.sync_incremental:
+            self.album_model.clear()
+        self.task_pool.submit(
+            "albums", tarea_cargar_albumes,
+            self.jellyfin_api, self.library_sync, self.config["library"]["album_page_size"]
+        )
+    
+    def on_task_result(self, channel, request_id, result):
+        """Despacha el resultado de la petición vigente de cada canal"""
+        if channel == "connection":
+            self.on_connection_tested(result)
+        elif channel == "albums":
+            if self.library_sync:
+                self.on_library_synced(result)
+            else:
+                self.on_albums_finished(result)
+        elif channel == "local_albums":
+            self.on_local_albums_loaded(result)
+        elif channel == "songs":
+            self.on_songs_loaded(result)
+        elif channel == "search_index":
+            self.on_search_index_ready(result)
+        elif channel in self.CANALES_BUSQUEDA_SERVIDOR:
+            self.on_server_search_results(channel, *result)
+    
+    def on_cache_fill_failed(self, channel, request_id, error_msg):
+        """Una descarga de la caché de audio falló: la canción se seguirá pidiendo por streaming"""
+        print(f"Error al llenar la caché de audio: {error_msg}")
+    
+    def on_task_partial(self, channel, request_id, value):
+        """Despacha resultados parciales (páginas de álbumes)"""
+        if channel == "albums":
+            self.on_albums_loaded(value)
     
+    def on_task_failed(self, channel, request_id, error_msg):
+        """Maneja errores de las tareas en segundo plano"""
+        if channel == "albums" and self.library_sync:
+            self.on_library_sync_failed(error_msg)
+            return
+        if channel == "local_albums":
+            # Sin índice local legible se sigue con lo que traiga el servidor
+            print(f"Error al leer el índice local: {error_msg}")
+            self.on_local_albums_loaded([])
+            return
+        self.on_error(error_msg)
+    
+    @timed_slot
     def on_albums_loaded(self, albums):
-        """Callback cuando se cargan los álbumes"""
-        self.albums = albums
-        self.albumsList.clear()
-        
-        for album in albums:
-            display_text = f"{album['Nombre']} - {album['Artista']}"
-            if album.get('Año'):
-                display_text += f" ({album['Año']})"
-            
-            item = QListWidgetItem(display_text)
-            item.setData(Qt.UserRole, album)
-            self.albumsList.addItem(item)
-        
-        self.statusLabel.setText(f"✅ {len(albums)} álbumes")
+        """Callback cuando llega una página de álbumes"""
+        startup_timing.mark("primera página de álbumes")
+        self.album_model.append_albums(albums)
+        self.statusLabel.setText(f"🔄 {self.album_model.rowCount()} álbumes...")
+    
+    def on_albums_finished(self, total):
+        """Callback cuando terminan de cargarse todas las páginas de álbumes"""
+        self.reconstruir_indice_busqueda()
+        self.statusLabel.setText(f"✅ {total} álbumes")
     
-    def on_album_selected(self, item):
+    @timed_slot
+    def on_library_synced(self, cambios):
+        """Callback cuando termina la sincronización del índice local"""
+        if self.sync_incremental and cambios:
+            self.cargar_albumes_locales("✅ {} álbumes")
+            return
+        if not self.sync_incremental:
+            self.reconstruir_indice_busqueda()
+        self.statusLabel.setText(f"✅ {self.album_model.rowCount()} álbumes")
+    
+    def on_library_sync_failed(self, error_msg):
+        """
+        La sincronización quedó incompleta: se muestra lo que se alcanzó a
+        guardar y la próxima sincronización vuelve a pedir los mismos cambios
+        """
+        print(f"Error al sincronizar la biblioteca: {error_msg}")
+        estado = "⚠️ {} álbumes (sincronización incompleta)"
+        if self.sync_incremental:
+            self.cargar_albumes_locales(estado)
+            return
+        self.reconstruir_indice_busqueda()
+        self.statusLabel.setText(estado.format(self.album_model.rowCount()))
+    
+    def on_album_selected(self, index):
         """Callback cuando se selecciona un álbum"""
-        album = item.data(Qt.UserRole)
+        album = self.album_model.album(self.album_filter.source_row(index.row()))
         self.albumInfoLabel.setText(f"{album['Nombre']} - {album['Artista']}")
         
+        # Mostrar las canciones guardadas y reconciliar con el servidor
+        if self.library_store:
+            songs = self.library_store.obtener_canciones_del_album(album['Id'])
+            if songs:
+                self.on_songs_loaded(songs)
+        
         # Cargar canciones del álbum
         self.statusLabel.setText("🔄 Cargando canciones...")
-        self.worker_thread.load_songs(album['Id'])
+        self.task_pool.submit(
+            "songs", tarea_cargar_canciones,
+            self.jellyfin_api, self.library_store, album['Id']
+        )
     
+    @timed_slot
     def on_songs_loaded(self, songs):
         """Callback cuando se cargan las canciones"""
-        self.current_album_songs = songs
-        self.songsList.clear()
-        
-        for song in songs:
-            display_text = f"{song['Numero']:02d}. {song['Titulo']} ({song['Duracion']})"
-            item = QListWidgetItem(display_text)
-            item.setData(Qt.UserRole, song)
-            self.songsList.addItem(item)
+        if songs and songs == self.current_album_songs:
+            # El servidor confirmó lo que ya mostraba el índice local
+            self.statusLabel.setText("✅ Listo")
+            return
         
+        self.current_album_songs = songs
+        self.song_model.set_songs(songs)
         self.statusLabel.setText("✅ Listo")
+        self.preparar_album()
+    
+    def preparar_album(self):
+        """VLC analiza de antemano las primeras canciones del álbum seleccionado"""
+        cantidad = self.config["playback"]["preparse_tracks"]
+        if not self.player or cantidad <= 0:
+            return
+        try:
+            self.player.prepare(
+                self.url_para(song["Id"]) for song in self.current_album_songs[:cantidad]
+            )
+        except Exception as e:
+            print(f"Error al analizar las canciones del álbum: {e}")
     
-    def on_song_double_clicked(self, item):
+    def on_song_double_clicked(self, index):
         """Callback cuando se hace doble clic en una canción"""
-        song = item.data(Qt.UserRole)
-        self.queue = [song['StreamUrl']]
-        self.queue_info = [song]
-        self.current_index = 0
+        song = self.song_model.song(index.row())
+        self.queue_model.set_songs([song], 0)
         self.actualizar_lista_cola()
         self.reproducir_actual()
     
-    def on_queue_item_double_clicked(self, item):
+    def on_queue_item_double_clicked(self, index):
         """Callback cuando se hace doble clic en un item de la cola"""
-        index = self.queueList.row(item)
-        if 0 <= index < len(self.queue):
-            self.current_index = index
+        row = index.row()
+        if 0 <= row < len(self.queue):
+            self.queue.current = row
             self.reproducir_actual()
     
     def reproducir_album(self):
@@ -291,9 +715,7 @@ class ReproductorJellyfinUI(QMainWindow):
             QMessageBox.warning(self, "Sin álbum", "Selecciona un álbum primero.")
             return
         
-        self.queue = [song['StreamUrl'] for song in self.current_album_songs]
-        self.queue_info = self.current_album_songs.copy()
-        self.current_index = 0
+        self.queue_model.set_songs(self.current_album_songs, 0)
         self.actualizar_lista_cola()
         self.reproducir_actual()
     
@@ -303,31 +725,26 @@ class ReproductorJellyfinUI(QMainWindow):
             QMessageBox.warning(self, "Sin álbum", "Selecciona un álbum primero.")
             return
         
-        for song in self.current_album_songs:
-            self.queue.append(song['StreamUrl'])
-            self.queue_info.append(song)
-        
+        self.queue_model.append_songs(self.current_album_songs)
         self.actualizar_lista_cola()
+        self.precargar_siguiente()
+        self.llenar_cache_audio()
         QMessageBox.information(self, "Álbum agregado", 
                               f"Se agregaron {len(self.current_album_songs)} canciones.")
     
+    @timed_slot
     def actualizar_lista_cola(self):
-        """Actualiza la lista visual de la cola de reproducción"""
-        self.queueList.clear()
-        for i, song_info in enumerate(self.queue_info):
-            display_text = f"{i+1:02d}. {song_info['Titulo']} ({song_info['Duracion']})"
-            if i == self.current_index and self.is_playing:
-                display_text = "▶ " + display_text
-            item = QListWidgetItem(display_text)
-            self.queueList.addItem(item)
+        """Actualiza la marca de la canción en curso y los botones (el contenido de la
+        cola se notifica al modelo donde cambia)"""
+        self.queue_model.set_current(self.queue.current, self.is_playing)
         
         self.actualizar_estado_botones()
     
     def actualizar_estado_botones(self):
         """Actualiza el estado habilitado/deshabilitado de los botones"""
         has_queue = len(self.queue) > 0
-        has_previous = self.current_index > 0
-        has_next = self.current_index < len(self.queue) - 1
+        has_previous = self.queue.current > 0
+        has_next = self.queue.current < len(self.queue) - 1
         
         self.playButton.setEnabled(has_queue and not self.is_playing)
         self.pauseButton.setEnabled(self.is_playing)
@@ -336,11 +753,27 @@ class ReproductorJellyfinUI(QMainWindow):
         self.stopButton.setEnabled(self.is_playing or self.is_paused)
         self.shuffleButton.setEnabled(len(self.queue) > 1)
     
+    def mover_en_cola(self, delta):
+        """Mueve la canción seleccionada de la cola una posición arriba o abajo"""
+        row = self.queueList.currentIndex().row()
+        target = row + delta
+        if row < 0 or not (0 <= target < len(self.queue)):
+            return
+        self.queue_model.move(row, target)
+        self.queueList.setCurrentIndex(self.queue_model.index(target, 0))
+        self.actualizar_lista_cola()
+        self.precargar_siguiente()
+    
+    def deshacer_cola(self):
+        """Deshace el último movimiento o mezcla de la cola"""
+        if self.queue_model.undo():
+            self.actualizar_lista_cola()
+            self.precargar_siguiente()
+            self.llenar_cache_audio()
+    
     def limpiar_cola(self):
         """Limpia la cola de reproducción"""
-        self.queue.clear()
-        self.queue_info.clear()
-        self.current_index = -1
+        self.queue_model.clear()
         self.detener()
         self.actualizar_lista_cola()
         QMessageBox.information(self, "Cola limpiada", "Cola de reproducción limpiada.")
@@ -350,40 +783,125 @@ class ReproductorJellyfinUI(QMainWindow):
         if len(self.queue) <= 1:
             return
         
-        import random
-        # Mezclar solo las canciones que quedan por reproducir
-        remaining_songs = self.queue[self.current_index + 1:]
-        remaining_info = self.queue_info[self.current_index + 1:]
-        
-        # Crear pares de (url, info) para mezclar juntos
-        pairs = list(zip(remaining_songs, remaining_info))
-        random.shuffle(pairs)
-        
-        # Reemplazar las canciones restantes
-        self.queue[self.current_index + 1:] = [pair[0] for pair in pairs]
-        self.queue_info[self.current_index + 1:] = [pair[1] for pair in pairs]
-        
+        # Mezclar solo las canciones que quedan por reproducir (se puede deshacer con Ctrl+Z)
+        self.queue_model.shuffle_remaining()
         self.actualizar_lista_cola()
+        self.precargar_siguiente()
+        self.llenar_cache_audio()
         QMessageBox.information(self, "Aleatorio", "Cola mezclada.")
     
     def on_search_changed(self, text):
+        """Reinicia el debounce de la búsqueda en cada tecla"""
+        self.search_timer.start()
+    
+    @timed_slot
+    def aplicar_busqueda(self):
         """Filtra la lista de álbumes según el texto de búsqueda"""
-        for i in range(self.albumsList.count()):
-            item = self.albumsList.item(i)
-            album = item.data(Qt.UserRole)
-            
-            # Buscar en nombre del álbum y artista
-            search_text = text.lower()
-            album_name = album['Nombre'].lower()
-            artist_name = album['Artista'].lower()
-            
-            if search_text in album_name or search_text in artist_name:
-                item.setHidden(False)
-            else:
-                item.setHidden(True)
+        text = self.searchInput.text()
+        if text != self.busqueda_actual:
+            # Consulta nueva: descartar lo que llegó del servidor para la anterior
+            self.busqueda_actual = text
+            self.filas_servidor = set()
+            self.artistas_servidor = []
+            self.buscar_en_servidor(text)
+        
+        if self.search_index is None:
+            # El índice se está construyendo: se aplicará al terminar
+            if text.strip():
+                return
+            self.filas_locales = None
+        else:
+            self.filas_locales = self.search_index.buscar(text)
+        self.actualizar_filtro()
+    
+    def actualizar_filtro(self):
+        """Aplica al proxy la unión de resultados locales y del servidor"""
+        if self.filas_locales is None:
+            self.album_filter.set_filter(None)
+            return
+        
+        filas = set(self.filas_locales)
+        filas.update(self.filas_servidor)
+        for artista in self.artistas_servidor:
+            filas.update(self.search_index.filas_de_artista(artista))
+        self.album_filter.set_filter(sorted(filas))
+    
+    def buscar_en_servidor(self, text):
+        """Lanza en paralelo las búsquedas de álbumes, canciones y artistas en el servidor"""
+        for channel in self.CANALES_BUSQUEDA_SERVIDOR:
+            self.task_pool.cancel(channel)
+        
+        if (self.config["ui"]["search_mode"] != "hybrid"
+                or len(text.strip()) < self.config["ui"]["server_search_min_chars"]):
+            return
+        
+        metodos = (
+            self.jellyfin_api.buscar_albumes,
+            self.jellyfin_api.buscar_canciones,
+            self.jellyfin_api.buscar_artistas
+        )
+        for channel, metodo in zip(self.CANALES_BUSQUEDA_SERVIDOR, metodos):
+            self.task_pool.submit(channel, tarea_buscar_en_servidor, metodo, text)
+    
+    def on_server_search_results(self, channel, query, results):
+        """Combina los resultados del servidor con los locales a medida que llegan"""
+        if query != self.busqueda_actual or not results:
+            return
+        
+        if channel == "search_albums":
+            self.filas_servidor.update(self.agregar_albumes_externos(results))
+        elif channel == "search_tracks":
+            albums = [
+                {
+                    "Nombre": song.get("Album") or "Desconocido",
+                    "Id": song["AlbumId"],
+                    "Artista": song.get("AlbumArtist") or "Desconocido"
+                } for song in results if song.get("AlbumId")
+            ]
+            self.filas_servidor.update(self.agregar_albumes_externos(albums))
+        elif channel == "search_artists":
+            self.artistas_servidor = results
+        
+        if self.search_index is not None:
+            self.actualizar_filtro()
+    
+    def agregar_albumes_externos(self, albums):
+        """
+        Agrega al modelo los álbumes que todavía no estaban cargados
+        
+        Returns:
+            Filas del modelo de todos los álbumes recibidos
+        """
+        nuevos = {}
+        for album in albums:
+            if self.album_model.row_of(album["Id"]) < 0:
+                nuevos.setdefault(album["Id"], album)
+        
+        if nuevos:
+            desde = self.album_model.rowCount()
+            self.album_model.append_albums(list(nuevos.values()))
+            if self.search_index is not None:
+                self.search_index.agregar(*self.album_model.columnas_busqueda(desde))
+        
+        return [self.album_model.row_of(album["Id"]) for album in albums]
+    
+    def reconstruir_indice_busqueda(self):
+        """Construye el índice de búsqueda en segundo plano"""
+        self.search_index = None
+        if self.album_model.rowCount():
+            nombres, artistas = self.album_model.columnas_busqueda()
+            self.task_pool.submit("search_index", tarea_construir_indice, nombres, artistas)
+    
+    def on_search_index_ready(self, index):
+        """Callback cuando el índice de búsqueda está listo"""
+        # Incorporar las filas agregadas mientras se construía
+        if len(index) < self.album_model.rowCount():
+            index.agregar(*self.album_model.columnas_busqueda(len(index)))
+        self.search_index = index
+        self.aplicar_busqueda()
     
     def on_error(self, error_msg):
-        """Maneja errores del worker thread"""
+        """Maneja errores de las tareas en segundo plano"""
         self.statusLabel.setText(f"❌ Error: {error_msg}")
         QMessageBox.critical(self, "Error", f"Error: {error_msg}")
     
@@ -401,7 +919,10 @@ class ReproductorJellyfinUI(QMainWindow):
     
     def reproducir_actual(self):
         """Reproduce la canción actual de la cola"""
-        if not self.queue or self.current_index < 0:
+        if not self.queue or self.queue.current < 0:
+            return
+        
+        if not self.asegurar_reproductor():
             return
         
         try:
@@ -414,29 +935,36 @@ class ReproductorJellyfinUI(QMainWindow):
                     self.visualizer.start_animation()
                     self.actualizar_lista_cola()
                     return
-                self.player.stop()
             
-            media = self.instance.media_new(self.queue[self.current_index])
-            self.player.set_media(media)
-            self.player.play()
+            self.posicion_actual = -1
+            self.duracion_actual = 0
+            track = self.queue.current_track()
+            start_ms = 0
+            if self.posicion_reanudar and self.posicion_reanudar[0] == track.id:
+                start_ms = self.posicion_reanudar[1]
+            self.posicion_reanudar = None
+            url = self.url_reproduccion(self.queue.current)
+            if self.player.is_preloaded(url, track.id) and start_ms <= 0:
+                origen = "precargada"
+            else:
+                origen = "red" if url.startswith(("http://", "https://")) else "cache"
+            self.inicio_reproduccion = (time.perf_counter(), origen)
+            self.inicio_buffering = None
+            self.player.play(url, start_ms, key=track.id)
+            if self.session:
+                self.session.set_position(self.queue.current, start_ms)
             
             self.is_playing = True
             self.is_paused = False
             
             # Actualizar interfaz
-            song_info = self.queue_info[self.current_index]
-            self.currentSongLabel.setText(f"{song_info['Titulo']} ({song_info['Duracion']})")
+            self.currentSongLabel.setText(f"{track.titulo} ({track.duracion})")
             self.visualizer.start_animation()
             
-            # Intentar conectar evento de fin de canción (con manejo de errores)
-            try:
-                event_manager = self.player.event_manager()
-                if event_manager:
-                    event_manager.event_attach(vlc.EventType.MediaPlayerEndReached, self.song_ended)
-            except Exception as e:
-                print(f"Error al conectar evento de fin de canción: {e}")
-            
             self.actualizar_lista_cola()
+            self.precargar_siguiente()
+            self.llenar_cache_audio()
+            self.medir_caudal()
             
         except Exception as e:
             QMessageBox.critical(self, "Error de reproducción", f"Error al reproducir: {str(e)}")
@@ -450,27 +978,27 @@ class ReproductorJellyfinUI(QMainWindow):
                 self.is_paused = True
                 self.visualizer.stop_animation()
                 self.actualizar_lista_cola()
+                if self.session:
+                    self.session.flush()
             except Exception as e:
                 print(f"Error al pausar: {e}")
     
     def siguiente(self):
         """Reproduce la siguiente canción"""
-        if self.current_index < len(self.queue) - 1:
-            self.current_index += 1
+        if self.queue.current < len(self.queue) - 1:
+            self.queue.current += 1
             self.reproducir_actual()
     
     def anterior(self):
         """Reproduce la canción anterior"""
-        if self.current_index > 0:
-            self.current_index -= 1
+        if self.queue.current > 0:
+            self.queue.current -= 1
             self.reproducir_actual()
     
     def detener(self):
         """Detiene la reproducción"""
         try:
             if self.player:
-                # Limpiar eventos antes de detener
-                self.limpiar_eventos_vlc()
                 self.player.stop()
         except Exception as e:
             print(f"Error al detener: {e}")
@@ -482,55 +1010,155 @@ class ReproductorJellyfinUI(QMainWindow):
         self.timeLabel.setText("00:00 / 00:00")
         self.progressBar.setVisible(False)
         self.actualizar_lista_cola()
+        if self.session:
+            self.session.set_position(self.queue.current, 0)
+            self.session.flush()
     
-    def limpiar_eventos_vlc(self):
-        """Limpia los eventos de VLC para evitar problemas de memoria"""
-        try:
-            if self.player:
-                event_manager = self.player.event_manager()
-                if event_manager:
-                    # Detener todos los eventos
-                    event_manager.event_detach(vlc.EventType.MediaPlayerEndReached)
-        except Exception as e:
-            print(f"Error al limpiar eventos VLC: {e}")
+    def url_reproduccion(self, index: int) -> str:
+        """
+        Ruta local de la canción si está en la caché de audio; si no, su URL
+        de streaming con la calidad elegida según el caudal medido
+        """
+        return self.url_para(self.queue[index].id)
+    
+    def url_para(self, item_id: str) -> str:
+        """Como url_reproduccion, a partir del ID de la canción"""
+        key, url = self.stream_selector.stream_for(item_id)
+        if self.audio_cache:
+            # Se prefiere el original; si no está, la versión del nivel actual
+            for cached_key in dict.fromkeys((item_id, key)):
+                path = self.audio_cache.local_path(cached_key)
+                if path:
+                    return path
+        return url
+    
+    def llenar_cache_audio(self):
+        """
+        Descarga en segundo plano las siguientes canciones de la cola
+        
+        Se empieza después de las que VLC ya está descargando (la actual y la
+        precargada): bajarlas otra vez duplicaría el tráfico
+        """
+        if not self.audio_cache or self.queue.current < 0:
+            return
+        first = self.queue.current + 1
+        if self.player and self.player.gapless:
+            first += 1
+        last = self.queue.current + 1 + self.config["playback"]["audio_cache_prefetch"]
+        items = [
+            self.stream_selector.stream_for(track.id)
+            for track in self.queue[first:last]
+        ]
+        if not items:
+            return
+        self.cache_pool.submit(
+            "audio_cache", tarea_llenar_cache_audio,
+            self.audio_cache, items, self.stream_selector.add_sample
+        )
+    
+    def medir_caudal(self):
+        """
+        Sin caché de audio no hay descargas que midan el caudal: se mide
+        descargando el comienzo de la siguiente canción
+        """
+        if self.audio_cache or self.stream_selector.quality != "auto":
+            return
+        if 0 <= self.queue.current < len(self.queue) - 1:
+            _, url = self.stream_selector.stream_for(self.queue[self.queue.current + 1].id)
+            self.task_pool.submit("stream_probe", tarea_medir_caudal, self.stream_selector, url)
     
-    def song_ended(self, event):
-        """Callback cuando termina una canción"""
+    def precargar_siguiente(self):
+        """Precarga la siguiente canción de la cola para que el cambio sea inmediato"""
+        if not self.player or not (self.is_playing or self.is_paused):
+            return
         try:
-            # Usar QTimer para evitar problemas de threading
-            from PyQt5.QtCore import QTimer
-            QTimer.singleShot(100, self.siguiente)
+            if 0 <= self.queue.current < len(self.queue) - 1:
+                index = self.queue.current + 1
+                self.player.preload(self.url_reproduccion(index), key=self.queue[index].id)
+            else:
+                self.player.clear_preload()
         except Exception as e:
-            print(f"Error en song_ended: {e}")
+            print(f"Error al precargar la siguiente canción: {e}")
     
-    def actualizar_tiempo(self):
-        """Actualiza el tiempo de reproducción y verifica si la canción terminó"""
-        if self.player and self.is_playing:
-            try:
-                current_time = self.player.get_time()
-                total_time = self.player.get_length()
-                
-                if current_time >= 0 and total_time > 0:
-                    current_str = time.strftime('%M:%S', time.gmtime(current_time // 1000))
-                    total_str = time.strftime('%M:%S', time.gmtime(total_time // 1000))
-                    self.timeLabel.setText(f"{current_str} / {total_str}")
-                    
-                    # Actualizar barra de progreso
-                    progress = int((current_time / total_time) * 100)
-                    self.progressBar.setValue(progress)
-                    self.progressBar.setVisible(True)
-                    
-                    # Verificar si la canción terminó (fallback si el evento no funciona)
-                    if current_time >= total_time - 1000:  # Si falta menos de 1 segundo
-                        self.is_playing = False
-                        self.siguiente()
-                        
-            except Exception as e:
-                # Si hay error al obtener el tiempo, la canción probablemente terminó
-                if self.is_playing:
-                    print(f"Error al obtener tiempo de reproducción: {e}")
-                    self.is_playing = False
-                    self.siguiente()
+    def on_length_changed(self, length_ms):
+        """Evento de VLC: se conoce la duración de la canción"""
+        self.duracion_actual = length_ms
+        self.mostrar_tiempo(self.posicion_actual)
+    
+    def on_time_changed(self, time_ms):
+        """Evento de VLC: avanzó la reproducción (llega varias veces por segundo)"""
+        if self.inicio_reproduccion is not None and time_ms > 0:
+            # Primer avance desde play(): tiempo hasta el primer audio
+            inicio, origen = self.inicio_reproduccion
+            self.inicio_reproduccion = None
+            ttfa = time.perf_counter() - inicio
+            REGISTRY.observe("playback_ttfa_seconds", ttfa, source=origen)
+            self.statusLabel.setText(f"▶ Primer audio en {ttfa * 1000:.0f} ms ({origen})")
+        segundo_anterior = self.posicion_actual // 1000
+        self.posicion_actual = time_ms
+        if time_ms // 1000 != segundo_anterior:
+            self.mostrar_tiempo(time_ms)
+            if self.session:
+                self.session.set_position(self.queue.current, time_ms)
+    
+    def mostrar_tiempo(self, current_time):
+        """Actualiza la etiqueta de tiempo y la barra de progreso"""
+        total_time = self.duracion_actual
+        if current_time < 0 or total_time <= 0:
+            return
+        current_str = time.strftime('%M:%S', time.gmtime(current_time // 1000))
+        total_str = time.strftime('%M:%S', time.gmtime(total_time // 1000))
+        self.timeLabel.setText(f"{current_str} / {total_str}")
+        
+        # Actualizar barra de progreso
+        progress = min(100, int((current_time / total_time) * 100))
+        self.progressBar.setValue(progress)
+        self.progressBar.setVisible(True)
+    
+    def on_buffering(self, percent):
+        """Evento de VLC: llenando el búfer de red"""
+        if self.is_playing and percent < 100:
+            self.timeLabel.setText(f"⏳ {percent:.0f}%")
+            if self.inicio_buffering is None:
+                self.inicio_buffering = time.perf_counter()
+        elif percent >= 100 and self.inicio_buffering is not None:
+            REGISTRY.observe("playback_buffering_seconds", time.perf_counter() - self.inicio_buffering)
+            self.inicio_buffering = None
+    
+    def on_track_ended(self):
+        """Evento de VLC: terminó la canción; es el único punto que avanza la cola"""
+        if self.config["playback"]["auto_advance"] and self.queue.current < len(self.queue) - 1:
+            self.siguiente()
+        else:
+            self.detener()
+    
+    def on_playback_error(self):
+        """Evento de VLC: no se pudo reproducir la canción actual; se pasa a la siguiente"""
+        REGISTRY.inc("playback_errors_total")
+        track = self.queue.current_track()
+        if track is not None:
+            titulo = track.titulo
+            print(f"Error de reproducción en {titulo}")
+            self.statusLabel.setText(f"❌ No se pudo reproducir: {titulo}")
+        self.on_track_ended()
+    
+    def closeEvent(self, event):
+        """Cancela las tareas pendientes y guarda el estado de las cachés al cerrar"""
+        self.task_pool.cancel_all()
+        self.cache_pool.cancel_all()
+        if self.album_art:
+            self.album_art.cancel_pending()
+        if self.player:
+            self.player.release()
+        if self.audio_cache:
+            self.audio_cache.close()
+        if self.session:
+            self.session.flush()
+        if self.metrics_dumper:
+            self.metrics_dumper.dump()
+        if self.metrics_panel:
+            self.metrics_panel.close()
+        super().closeEvent(event)
 
 def main():
     app = QApplication(sys.argv)
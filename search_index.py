@@ -0,0 +1,137 @@
+"""
+Índice de búsqueda local de álbumes
+Normaliza nombre y artista (minúsculas, sin acentos) y mantiene un índice de
+trigramas para responder cada tecla sin recorrer toda la biblioteca
+"""
+
+import unicodedata
+from array import array
+from typing import List, Dict, Optional
+
+
+def normalizar(texto: str) -> str:
+    """Pasa a minúsculas y elimina acentos/diacríticos ("Canción" -> "cancion")"""
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in descompuesto if not unicodedata.combining(c)).casefold()
+
+
+def _trigramas(texto: str) -> set:
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class AlbumSearchIndex:
+    """Índice de trigramas sobre "nombre artista" de cada fila del modelo de álbumes"""
+    
+    def __init__(self, nombres: List[str], artistas: List[str]):
+        """
+        Construye el índice (costoso para bibliotecas grandes: conviene hacerlo
+        en segundo plano)
+        
+        Args:
+            nombres: Nombres de los álbumes, en el orden de las filas del modelo
+            artistas: Artistas de los álbumes, en el mismo orden
+        """
+        self._textos: List[str] = []
+        self._postings: Dict[str, array] = {}
+        self._ultima_consulta: Optional[List[str]] = None
+        self._ultimo_resultado: Optional[List[int]] = None
+        self._filas_por_artista: Optional[Dict[str, List[int]]] = None
+        self.agregar(nombres, artistas)
+    
+    def agregar(self, nombres: List[str], artistas: List[str]):
+        """Indexa filas nuevas agregadas al final del modelo"""
+        for nombre, artista in zip(nombres, artistas):
+            row = len(self._textos)
+            # El salto de línea evita coincidencias que crucen nombre y artista
+            texto = f"{normalizar(nombre)}\n{normalizar(artista)}"
+            self._textos.append(texto)
+            for trigrama in _trigramas(texto):
+                posting = self._postings.get(trigrama)
+                if posting is None:
+                    posting = self._postings[trigrama] = array('I')
+                posting.append(row)
+            if self._filas_por_artista is not None:
+                self._filas_por_artista.setdefault(texto.split("\n", 1)[1], []).append(row)
+        
+        # Las filas nuevas invalidan el resultado usado para refinar consultas
+        self._ultima_consulta = None
+        self._ultimo_resultado = None
+    
+    def filas_de_artista(self, artista: str) -> List[int]:
+        """Filas cuyo artista coincide exactamente (sin distinguir acentos ni mayúsculas)"""
+        if self._filas_por_artista is None:
+            self._filas_por_artista = {}
+            for row, texto in enumerate(self._textos):
+                self._filas_por_artista.setdefault(texto.split("\n", 1)[1], []).append(row)
+        return self._filas_por_artista.get(normalizar(artista), [])
+    
+    def __len__(self):
+        return len(self._textos)
+    
+    def buscar(self, consulta: str) -> Optional[List[int]]:
+        """
+        Busca álbumes cuyo nombre o artista contengan todas las palabras de la consulta
+        
+        Returns:
+            Filas coincidentes en orden ascendente, o None si la consulta está vacía
+        """
+        tokens = normalizar(consulta).split()
+        if not tokens:
+            self._ultima_consulta = None
+            self._ultimo_resultado = None
+            return None
+        
+        # Al seguir escribiendo, cada palabra anterior queda contenida en una nueva:
+        # basta con filtrar el resultado anterior
+        candidatos = None
+        anterior = self._ultima_consulta
+        if anterior and len(anterior) <= len(tokens) and all(
+                a in t for a, t in zip(anterior, tokens)):
+            candidatos = self._ultimo_resultado
+        else:
+            for token in tokens:
+                if len(token) >= 3:
+                    filas = self._filas_por_trigramas(token)
+                    if filas is None:
+                        continue
+                    if candidatos is None:
+                        candidatos = filas
+                    else:
+                        filas = set(filas)
+                        candidatos = [r for r in candidatos if r in filas]
+        
+        if candidatos is None:
+            candidatos = range(len(self._textos))
+        
+        # Verificar cada palabra por separado (listas por comprensión, sin generadores anidados)
+        textos = self._textos
+        resultado = candidatos
+        for token in tokens:
+            resultado = [r for r in resultado if token in textos[r]]
+        
+        self._ultima_consulta = tokens
+        self._ultimo_resultado = resultado
+        return resultado
+    
+    def _filas_por_trigramas(self, token: str) -> Optional[List[int]]:
+        """
+        Filas que contienen todos los trigramas del token (candidatas, sin verificar)
+        
+        Returns:
+            Filas candidatas, o None si el token es tan común que conviene
+            recorrer todas las filas en lugar de intersectar conjuntos grandes
+        """
+        postings = sorted(
+            (self._postings.get(t, ()) for t in _trigramas(token)), key=len
+        )
+        if not postings[0]:
+            return []
+        if len(postings[0]) > len(self._textos) // 8:
+            return None
+        
+        filas = set(postings[0])
+        for posting in postings[1:]:
+            filas.intersection_update(posting)
+            if not filas:
+                break
+        return sorted(filas)
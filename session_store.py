@@ -0,0 +1,130 @@
+"""
+Persistencia de la sesión de reproducción
+Guarda la cola y la posición (canción y segundo) en dos archivos JSON
+compactos: la cola solo se reescribe cuando cambia y la posición, que cambia
+seguido, va en un archivo aparte muy pequeño. Las escrituras se agrupan con un
+temporizador y son atómicas (archivo temporal + os.replace)
+"""
+
+import json
+import os
+from typing import Dict, Optional
+
+from PyQt5.QtCore import QObject, QTimer
+
+
+def _escribir_json(path: str, data) -> bool:
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        return True
+    except OSError as e:
+        print(f"Error al guardar la sesión en {path}: {e}")
+        return False
+
+
+def _leer_json(path: str):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class SessionStore(QObject):
+    """Guarda y restaura la cola de reproducción y la posición"""
+    
+    VERSION = 1
+    
+    def __init__(self, path: str, play_queue, delay_ms: int = 5000, parent=None):
+        """
+        Args:
+            path: Archivo de la cola; la posición se guarda en el mismo
+                nombre con el sufijo ".pos"
+            play_queue: PlayQueue a guardar
+            delay_ms: Espera desde el primer cambio pendiente antes de escribir
+        """
+        super().__init__(parent)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.position_path = path + ".pos"
+        self._queue = play_queue
+        self._queue_dirty = False
+        self._position: Optional[Dict] = None
+        self._position_dirty = False
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self.flush)
+    
+    def load(self) -> Optional[Dict]:
+        """
+        Lee la sesión guardada (solo disco, sin red)
+        
+        Returns:
+            {"tracks": filas de PlayQueue, "current": índice, "position_ms": ms},
+            o None si no hay sesión
+        """
+        data = _leer_json(self.path)
+        if not isinstance(data, dict) or data.get("version") != self.VERSION:
+            return None
+        tracks = data.get("tracks") or []
+        if not tracks:
+            return None
+        
+        current, position_ms = -1, 0
+        position = _leer_json(self.position_path)
+        if isinstance(position, dict):
+            current = position.get("current", -1)
+            position_ms = position.get("position_ms", 0)
+            # La posición pudo escribirse para otra versión de la cola: se busca por ID
+            track_id = position.get("id")
+            if not (0 <= current < len(tracks)) or tracks[current][0] != track_id:
+                current = next((i for i, row in enumerate(tracks) if row[0] == track_id), -1)
+                if current < 0:
+                    position_ms = 0
+        return {"tracks": tracks, "current": current, "position_ms": position_ms}
+    
+    def queue_changed(self):
+        """Marca la cola para guardarla en la próxima escritura"""
+        self._queue_dirty = True
+        self.set_position(self._queue.current)
+        self._schedule()
+    
+    def _schedule(self):
+        if not self._timer.isActive():
+            self._timer.start()
+    
+    def set_position(self, current: int, position_ms: Optional[int] = None):
+        """
+        Registra la canción actual y el segundo de reproducción
+        
+        Args:
+            current: Índice de la canción actual
+            position_ms: Posición en ms (None = conservar la anterior si es la misma canción)
+        """
+        queue = self._queue
+        track_id = queue[current].id if 0 <= current < len(queue) else None
+        previous = self._position
+        if position_ms is None:
+            same = previous is not None and previous["id"] == track_id
+            position_ms = previous["position_ms"] if same else 0
+        self._position = {"current": current, "id": track_id, "position_ms": position_ms}
+        if self._position != previous:
+            self._position_dirty = True
+            self._schedule()
+    
+    def flush(self):
+        """Escribe ya lo pendiente"""
+        self._timer.stop()
+        if self._queue_dirty:
+            data = {"version": self.VERSION, "tracks": self._queue.rows()}
+            if _escribir_json(self.path, data):
+                self._queue_dirty = False
+        if self._position_dirty and self._position is not None:
+            if _escribir_json(self.position_path, self._position):
+                self._position_dirty = False
@@ -0,0 +1,199 @@
+"""
+Analizador de espectro para el visualizador
+Un reproductor VLC secundario decodifica la misma canción con callbacks de
+audio (sin salida de sonido) y copia el PCM a un búfer circular; un hilo de
+análisis calcula la FFT con NumPy y publica las bandas para la interfaz.
+Ese segundo decodificador abre la canción por su cuenta: por defecto solo se
+analizan archivos locales (caché de audio), porque con una URL de streaming
+la canción se descargaría dos veces
+"""
+
+import ctypes
+import threading
+import time
+from typing import Callable, Optional
+
+import vlc
+
+try:
+    import numpy as np
+except ImportError:  # Dependencia opcional: sin NumPy el visualizador es simulado
+    np = None
+
+
+class SpectrumAnalyzer:
+    """Espectro en bandas logarítmicas con caída de picos, calculado fuera del hilo de la UI"""
+    
+    SAMPLE_RATE = 44100
+    FFT_SIZE = 2048
+    MIN_FREQ = 40
+    MAX_FREQ = 16000
+    FLOOR_DB = -70.0
+    # Fracción de la escala que baja cada barra por cuadro cuando la señal cae
+    PEAK_DECAY = 0.03
+    # Desfase tolerado respecto del reproductor principal antes de resincronizar
+    MAX_DRIFT_MS = 300
+    
+    @staticmethod
+    def available() -> bool:
+        return np is not None
+    
+    def __init__(self, instance: "vlc.Instance", bands: int = 32, fps: float = 60.0,
+                 analyze_streams: bool = False):
+        """
+        Args:
+            instance: Instancia de VLC
+            bands: Cantidad de bandas (barras) del espectro
+            fps: Frecuencia de actualización del análisis
+            analyze_streams: Analizar también las URL http(s); duplica la
+                descarga de cada canción que no está en la caché de audio
+        """
+        if np is None:
+            raise ImportError("SpectrumAnalyzer requiere numpy (pip install numpy)")
+        
+        self.instance = instance
+        self.analyze_streams = analyze_streams
+        self.interval = 1.0 / fps
+        self._reference_time: Optional[Callable[[], int]] = None
+        
+        # Búfer circular: un único productor (hilo de VLC) y un único consumidor
+        # (hilo de análisis); el contador de escritura se publica al final
+        self._ring = np.zeros(self.FFT_SIZE * 4, dtype=np.int16)
+        self._write_count = 0
+        self._offsets = np.arange(-self.FFT_SIZE, 0)
+        
+        self._window = np.hanning(self.FFT_SIZE).astype(np.float32)
+        self._window_gain = float(self._window.sum()) * 32768.0
+        freqs = np.fft.rfftfreq(self.FFT_SIZE, 1.0 / self.SAMPLE_RATE)
+        edges = np.geomspace(self.MIN_FREQ, self.MAX_FREQ, bands + 1)
+        starts = np.searchsorted(freqs, edges[:-1]).clip(1)
+        # Cada banda tiene al menos un bin (las bandas graves son más angostas que un bin)
+        for i in range(1, bands):
+            starts[i] = max(starts[i], starts[i - 1] + 1)
+        self._band_starts = starts
+        self._band_end = int(np.searchsorted(freqs, edges[-1]))
+        self._bands = np.zeros(bands, dtype=np.float32)
+        
+        self._player = instance.media_player_new()
+        # Se guardan referencias a los callbacks para que ctypes no los libere
+        self._play_cb = vlc.CallbackDecorators.AudioPlayCb(self._on_play)
+        self._flush_cb = vlc.CallbackDecorators.AudioFlushCb(self._on_flush)
+        self._player.audio_set_callbacks(self._play_cb, None, None, self._flush_cb, None, None)
+        self._player.audio_set_format("S16N", self.SAMPLE_RATE, 1)
+        
+        self._active = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="spectrum", daemon=True)
+        self._thread.start()
+    
+    # --- Hilo de VLC: solo copiar muestras, sin llamar a libvlc ---
+    
+    def _on_play(self, opaque, samples, count, pts):
+        frames = np.ctypeslib.as_array(ctypes.cast(samples, ctypes.POINTER(ctypes.c_int16)),
+                                       shape=(count,))
+        ring = self._ring
+        size = len(ring)
+        if count >= size:
+            frames = frames[-size:]
+            count = size
+        pos = self._write_count % size
+        first = min(count, size - pos)
+        ring[pos:pos + first] = frames[:first]
+        ring[:count - first] = frames[first:]
+        self._write_count += count
+    
+    def _on_flush(self, opaque, pts):
+        self._ring[:] = 0
+    
+    # --- Control (hilo de la UI) ---
+    
+    def start(self, url: str, reference_time: Optional[Callable[[], int]] = None):
+        """
+        Empieza a analizar url (si es una URL de streaming y no se activó
+        analyze_streams, solo detiene el análisis anterior)
+        
+        Args:
+            url: Misma URL o ruta que reproduce el reproductor principal
+            reference_time: Devuelve la posición del reproductor principal en ms,
+                para corregir el desfase del análisis
+        """
+        if not self.analyze_streams and url.startswith(("http://", "https://")):
+            self.stop()
+            return
+        media = self.instance.media_new(url)
+        media.add_option(":no-video")
+        self._player.set_media(media)
+        self._player.play()
+        self._reference_time = reference_time
+        self._active.set()
+    
+    def set_pause(self, paused: bool):
+        self._player.set_pause(1 if paused else 0)
+        if paused:
+            self._active.clear()
+        else:
+            self._active.set()
+    
+    def stop(self):
+        self._active.clear()
+        self._reference_time = None
+        self._player.stop()
+        self._bands = np.zeros_like(self._bands)
+    
+    def is_active(self) -> bool:
+        """Indica si se está analizando la canción en curso"""
+        return self._active.is_set()
+    
+    def release(self):
+        """Detiene el hilo de análisis y libera el reproductor secundario"""
+        self._closed = True
+        self._reference_time = None
+        self._active.set()
+        # El hilo puede estar en _sync usando libvlc: esperar antes de liberar
+        self._thread.join(timeout=2.0)
+        self._player.stop()
+        self._player.release()
+    
+    def bands(self):
+        """Último espectro calculado: una lectura atómica de un array que no se modifica"""
+        return self._bands
+    
+    # --- Hilo de análisis ---
+    
+    def _run(self):
+        last_sync = 0.0
+        while True:
+            self._active.wait()
+            if self._closed:
+                return
+            started = time.monotonic()
+            self._bands = self._analyze(self._bands)
+            if started - last_sync >= 1.0:
+                last_sync = started
+                self._sync()
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+    
+    def _analyze(self, previous):
+        count = self._write_count
+        samples = self._ring.take(self._offsets + count, mode='wrap')
+        spectrum = np.abs(np.fft.rfft(samples * self._window))
+        power = spectrum[:self._band_end] ** 2
+        band_power = np.add.reduceat(power, self._band_starts)
+        band_power /= np.diff(np.append(self._band_starts, self._band_end)).clip(1)
+        db = 10.0 * np.log10(band_power / self._window_gain ** 2 + 1e-12)
+        levels = np.clip(1.0 - db / self.FLOOR_DB, 0.0, 1.0).astype(np.float32)
+        # Las barras suben de inmediato y bajan de a poco
+        return np.maximum(levels, previous - self.PEAK_DECAY)
+    
+    def _sync(self):
+        """Corrige el desfase con el reproductor principal"""
+        reference_time = self._reference_time
+        if reference_time is None:
+            return
+        try:
+            target = reference_time()
+            current = self._player.get_time()
+            if target > 0 and current >= 0 and abs(target - current) > self.MAX_DRIFT_MS:
+                self._player.set_time(target)
+        except Exception as e:
+            print(f"Error al sincronizar el analizador de espectro: {e}")
@@ -0,0 +1,35 @@
+"""
+Medición del tiempo de arranque
+Registra marcas con el tiempo transcurrido desde que se importó este módulo
+(lo primero que hace main.py) e imprime un resumen cuando la ventana ya es
+visible; las marcas posteriores (conexión, primeros álbumes) se imprimen al
+momento en que ocurren
+"""
+
+import time
+from typing import List, Tuple
+
+_inicio = time.perf_counter()
+_marcas: List[Tuple[str, float]] = []
+_reportado = False
+
+
+def mark(nombre: str):
+    """Registra una marca de arranque (solo la primera vez que ocurre cada una)"""
+    if any(n == nombre for n, _ in _marcas):
+        return
+    transcurrido = time.perf_counter() - _inicio
+    _marcas.append((nombre, transcurrido))
+    if _reportado:
+        print(f"⏱️  {nombre}: {transcurrido * 1000:.0f} ms")
+
+
+def report():
+    """Imprime las marcas registradas hasta ahora"""
+    global _reportado
+    _reportado = True
+    print("⏱️  Arranque:")
+    anterior = 0.0
+    for nombre, transcurrido in _marcas:
+        print(f"   {nombre:<28} {transcurrido * 1000:7.0f} ms  (+{(transcurrido - anterior) * 1000:.0f})")
+        anterior = transcurrido
@@ -0,0 +1,125 @@
+"""
+Selección adaptativa de la calidad de streaming
+Mide el caudal real de las descargas de audio y elige, para cada canción
+siguiente, entre el archivo original y un nivel de bitrate transcodificado
+por el servidor (/Audio/{id}/universal)
+"""
+
+import threading
+import time
+from typing import List, Optional, Tuple, Callable
+
+import requests
+
+
+class StreamSelector:
+    """Elige el nivel de bitrate según el caudal medido (media móvil exponencial)"""
+    
+    # Peso de cada muestra nueva en la media móvil
+    ALPHA = 0.3
+    # Muestras más cortas que esto no son representativas (latencia, TCP slow start)
+    MIN_SAMPLE_SECONDS = 0.5
+    
+    def __init__(self, jellyfin_api, quality="auto", tiers_kbps: Optional[List[int]] = None,
+                 original_min_kbps: int = 1500, container: str = "mp3",
+                 audio_codec: str = "mp3", safety: float = 0.75):
+        """
+        Args:
+            jellyfin_api: Instancia de JellyfinAPI (genera las URLs)
+            quality: "auto", "original" o un bitrate fijo en kbps
+            tiers_kbps: Niveles de transcodificación disponibles
+            original_min_kbps: Caudal útil mínimo para pedir el archivo original
+            container: Contenedor de la transcodificación
+            audio_codec: Códec de la transcodificación
+            safety: Fracción del caudal medido que se permite usar
+        """
+        self.jellyfin_api = jellyfin_api
+        self.quality = quality
+        self.tiers_kbps = sorted(tiers_kbps or [320, 192, 128, 96, 64], reverse=True)
+        self.original_min_kbps = original_min_kbps
+        self.container = container
+        self.audio_codec = audio_codec
+        self.safety = safety
+        self._throughput_bps: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def throughput_kbps(self) -> Optional[float]:
+        """Caudal estimado en kbps, o None si todavía no hay muestras"""
+        with self._lock:
+            return self._throughput_bps / 1000 if self._throughput_bps is not None else None
+    
+    def add_sample(self, num_bytes: int, seconds: float):
+        """Registra una transferencia observada (puede llamarse desde cualquier hilo)"""
+        if seconds < self.MIN_SAMPLE_SECONDS or num_bytes <= 0:
+            return
+        bps = num_bytes * 8 / seconds
+        with self._lock:
+            if self._throughput_bps is None:
+                self._throughput_bps = bps
+            else:
+                self._throughput_bps += self.ALPHA * (bps - self._throughput_bps)
+    
+    def current_tier(self) -> Optional[int]:
+        """
+        Nivel a usar para la próxima canción
+        
+        Returns:
+            Bitrate en kbps, o None para el archivo original
+        """
+        if self.quality == "original":
+            return None
+        if self.quality != "auto":
+            return int(self.quality)
+        
+        throughput = self.throughput_kbps
+        if throughput is None:
+            # Sin mediciones se empieza por el original, como antes
+            return None
+        usable = throughput * self.safety
+        if usable >= self.original_min_kbps:
+            return None
+        for tier in self.tiers_kbps:
+            if usable >= tier:
+                return tier
+        return self.tiers_kbps[-1]
+    
+    def stream_for(self, item_id: str) -> Tuple[str, str]:
+        """
+        Clave de caché y URL de una canción con el nivel actual
+        
+        Returns:
+            (clave, url); la clave distingue el original de cada transcodificación
+        """
+        tier = self.current_tier()
+        if tier is None:
+            return item_id, self.jellyfin_api.url_stream(item_id)
+        url = self.jellyfin_api.url_stream_universal(
+            item_id, tier * 1000, self.container, self.audio_codec
+        )
+        return f"{item_id}_{tier}k", url
+    
+    def probe(self, url: str, max_bytes: int = 256 * 1024,
+              is_cancelled: Optional[Callable[[], bool]] = None):
+        """
+        Mide el caudal descargando el comienzo de una URL (para cuando no hay
+        caché de audio cuyas descargas sirvan de muestra)
+        """
+        session = self.jellyfin_api.session
+        start = time.monotonic()
+        received = 0
+        try:
+            with session.get(url, headers={"Range": f"bytes=0-{max_bytes - 1}"},
+                             stream=True, timeout=(5, 15)) as response:
+                if response.status_code not in (200, 206):
+                    return
+                for chunk in response.iter_content(64 * 1024):
+                    if is_cancelled and is_cancelled():
+                        return
+                    received += len(chunk)
+                    if received >= max_bytes:
+                        break
+        except requests.RequestException as e:
+            print(f"Error al medir el caudal: {e}")
+            return
+        self.add_sample(received, time.monotonic() - start)
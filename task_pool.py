@@ -0,0 +1,153 @@
+"""
+Ejecutor de tareas en segundo plano para la interfaz
+Basado en QThreadPool: cada tarea tiene un ID de petición y pertenece a un
+canal ("albums", "songs", ...); una tarea nueva en un canal reemplaza a la
+anterior y solo se entregan los resultados de la petición más reciente
+"""
+
+import itertools
+import time
+import traceback
+from typing import Callable, Dict, Tuple
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+from metrics import REGISTRY
+
+
+class TaskContext:
+    """Contexto que recibe cada tarea para consultar cancelación y reportar avances"""
+    
+    def __init__(self, pool: "TaskPool", channel: str, request_id: int):
+        self.channel = channel
+        self.request_id = request_id
+        self.submitted_at = time.monotonic()
+        self.cancelled = False
+        self._pool = pool
+    
+    def is_cancelled(self) -> bool:
+        """Indica si la tarea fue cancelada o reemplazada por otra más nueva"""
+        return self.cancelled
+    
+    def report(self, value):
+        """Entrega un resultado parcial (por ejemplo, una página de álbumes)"""
+        if not self.cancelled:
+            self._pool._signals.partial.emit(self.channel, self.request_id, value)
+
+
+class _TaskSignals(QObject):
+    """Señales internas emitidas desde los hilos del pool"""
+    finished = pyqtSignal(str, int, object)
+    partial = pyqtSignal(str, int, object)
+    failed = pyqtSignal(str, int, str)
+
+
+class _Task(QRunnable):
+    """Envuelve una función para ejecutarla en el QThreadPool"""
+    
+    def __init__(self, context: TaskContext, signals: _TaskSignals, fn: Callable, args: tuple):
+        super().__init__()
+        self.context = context
+        self.signals = signals
+        self.fn = fn
+        self.args = args
+    
+    def run(self):
+        ctx = self.context
+        if ctx.cancelled:
+            return
+        # Los canales con ID ("art:<id>") se agrupan por prefijo
+        channel = ctx.channel.split(":", 1)[0]
+        started = time.monotonic()
+        REGISTRY.observe("task_queue_seconds", started - ctx.submitted_at, channel=channel)
+        try:
+            result = self.fn(ctx, *self.args)
+        except Exception as e:
+            traceback.print_exc()
+            if not ctx.cancelled:
+                self.signals.failed.emit(ctx.channel, ctx.request_id, str(e))
+            return
+        finally:
+            REGISTRY.observe("task_run_seconds", time.monotonic() - started, channel=channel)
+        if not ctx.cancelled:
+            self.signals.finished.emit(ctx.channel, ctx.request_id, result)
+
+
+class TaskPool(QObject):
+    """Pool de tareas cancelables con entrega solo de la petición más reciente"""
+    result_ready = pyqtSignal(str, int, object)
+    partial_result = pyqtSignal(str, int, object)
+    task_failed = pyqtSignal(str, int, str)
+    
+    def __init__(self, max_threads: int = 4, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads)
+        self._ids = itertools.count(1)
+        self._latest: Dict[str, Tuple[TaskContext, _Task]] = {}
+        
+        # Las señales se emiten desde los hilos del pool y llegan encoladas al hilo de la UI
+        self._signals = _TaskSignals()
+        self._signals.finished.connect(self._on_finished)
+        self._signals.partial.connect(self._on_partial)
+        self._signals.failed.connect(self._on_failed)
+    
+    def submit(self, channel: str, fn: Callable, *args) -> int:
+        """
+        Encola fn(context, *args) en el canal indicado, cancelando la tarea
+        anterior del mismo canal
+        
+        Returns:
+            ID de la petición
+        """
+        self.cancel(channel)
+        request_id = next(self._ids)
+        context = TaskContext(self, channel, request_id)
+        task = _Task(context, self._signals, fn, args)
+        self._latest[channel] = (context, task)
+        self._pool.start(task)
+        return request_id
+    
+    def cancel(self, channel: str):
+        """Cancela la tarea vigente de un canal (si todavía no empezó, se quita de la cola)"""
+        entry = self._latest.pop(channel, None)
+        if entry is None:
+            return
+        context, task = entry
+        context.cancelled = True
+        try:
+            self._pool.tryTake(task)
+        except RuntimeError:
+            # El QThreadPool ya ejecutó y liberó la tarea
+            pass
+    
+    def cancel_all(self):
+        """Cancela todas las tareas vigentes"""
+        for channel in list(self._latest):
+            self.cancel(channel)
+    
+    def is_current(self, channel: str, request_id: int) -> bool:
+        """Indica si request_id es la petición vigente del canal"""
+        entry = self._latest.get(channel)
+        return entry is not None and entry[0].request_id == request_id
+    
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        """Espera a que terminen las tareas en ejecución"""
+        return self._pool.waitForDone(msecs)
+    
+    @pyqtSlot(str, int, object)
+    def _on_finished(self, channel, request_id, result):
+        if self.is_current(channel, request_id):
+            del self._latest[channel]
+            self.result_ready.emit(channel, request_id, result)
+    
+    @pyqtSlot(str, int, object)
+    def _on_partial(self, channel, request_id, value):
+        if self.is_current(channel, request_id):
+            self.partial_result.emit(channel, request_id, value)
+    
+    @pyqtSlot(str, int, str)
+    def _on_failed(self, channel, request_id, message):
+        if self.is_current(channel, request_id):
+            del self._latest[channel]
+            self.task_failed.emit(channel, request_id, message)
@@ -0,0 +1,64 @@
+"""
+Pruebas de la decodificación incremental de json_stream
+Ejecutar con: python -m pytest tests
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from json_stream import iter_items
+
+BODY = {
+    "Items": [3.5, -0.25, 1e3, 2.5E-2, 10, True, None, "año", {"Id": "x", "Año": 1999}, [1, 2]],
+    "TotalRecordCount": 10,
+    "StartIndex": 0,
+}
+
+
+def _split(data: bytes, cuts):
+    """Fragmentos de data cortados en las posiciones cuts"""
+    bounds = [0, *cuts, len(data)]
+    return [data[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+def test_flotante_partido():
+    extra = {}
+    items = list(iter_items([b'{"Items":[3.', b'5],"T":1}'], extra=extra))
+    assert items == [3.5]
+    assert extra == {"T": 1}
+
+
+@pytest.mark.parametrize("raw", [b'{"Items":[1e', b'{"Items":[1E+'])
+def test_exponente_partido(raw):
+    rest = b'{"Items":[1E+2]}'[len(raw):]
+    assert list(iter_items([raw, rest])) == [100.0]
+
+
+@pytest.mark.parametrize("separators", [(",", ":"), (", ", ": ")])
+def test_todos_los_cortes(separators):
+    data = json.dumps(BODY, ensure_ascii=False, separators=separators).encode("utf-8")
+    for cut in range(1, len(data)):
+        extra = {}
+        assert list(iter_items(_split(data, [cut]), extra=extra)) == BODY["Items"], cut
+        assert extra == {"TotalRecordCount": 10, "StartIndex": 0}, cut
+
+
+def test_byte_a_byte():
+    data = json.dumps(BODY).encode("utf-8")
+    assert list(iter_items(data[i:i + 1] for i in range(len(data)))) == BODY["Items"]
+
+
+def test_numero_al_final_de_la_respuesta():
+    extra = {}
+    assert list(iter_items([b'{"Items":[],"TotalRecordCount":4', b'2}'], extra=extra)) == []
+    assert extra == {"TotalRecordCount": 42}
+
+
+def test_json_invalido():
+    with pytest.raises(ValueError):
+        list(iter_items([b'{"Items":[3.', b'x]}']))
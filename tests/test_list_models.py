@@ -0,0 +1,74 @@
+"""
+Pruebas de los modelos de lista con QAbstractItemModelTester
+Ejecutar con: python -m pytest tests
+"""
+
+import os
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from PyQt5.QtCore import QtWarningMsg, qInstallMessageHandler
+from PyQt5.QtTest import QAbstractItemModelTester
+from PyQt5.QtWidgets import QApplication
+
+from list_models import AlbumListModel, AlbumFilterProxyModel
+
+_app = QApplication.instance() or QApplication([])
+
+
+def _albums(first: int, count: int):
+    return [{"Id": f"a{i}", "Nombre": f"Álbum {i}", "Artista": f"Artista {i % 7}", "Año": 2000 + i % 20}
+            for i in range(first, first + count)]
+
+
+@pytest.fixture
+def proxy():
+    """Proxy sobre un modelo de 10 álbumes, vigilado por QAbstractItemModelTester"""
+    avisos = []
+    
+    def handler(msg_type, context, message):
+        if msg_type >= QtWarningMsg:
+            avisos.append(message)
+    
+    previo = qInstallMessageHandler(handler)
+    model = AlbumListModel()
+    model.set_albums(_albums(0, 10))
+    proxy = AlbumFilterProxyModel()
+    proxy.setSourceModel(model)
+    tester = QAbstractItemModelTester(proxy, QAbstractItemModelTester.FailureReportingMode.Warning)
+    yield proxy
+    del tester
+    qInstallMessageHandler(previo)
+    assert avisos == []
+
+
+def test_append_sin_filtro(proxy):
+    proxy.sourceModel().append_albums(_albums(10, 5))
+    assert proxy.rowCount() == 15
+    assert proxy.index(14, 0).data() == proxy.sourceModel().index(14, 0).data()
+
+
+def test_append_con_filtro(proxy):
+    proxy.set_filter([1, 3, 5])
+    proxy.sourceModel().append_albums(_albums(10, 5))
+    assert proxy.rowCount() == 3
+    proxy.set_filter(None)
+    assert proxy.rowCount() == 15
+
+
+def test_set_filter(proxy):
+    proxy.set_filter([0, 2, 4, 6, 8])
+    assert [proxy.source_row(r) for r in range(proxy.rowCount())] == [0, 2, 4, 6, 8]
+    proxy.set_filter([2, 4])
+    assert proxy.rowCount() == 2
+    proxy.set_filter([1, 2, 3, 4, 9])
+    assert proxy.rowCount() == 5
+    proxy.set_filter(list(range(0, 10, 3)))
+    assert proxy.rowCount() == 4
+    proxy.set_filter([])
+    assert proxy.rowCount() == 0
+    proxy.set_filter(None)
+    assert proxy.rowCount() == 10
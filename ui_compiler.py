@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Compilación de main_window.ui a un módulo Python
+Al iniciar, la ventana carga main_window_ui.py (generado con uic.compileUi)
+en lugar de interpretar el XML con uic.loadUi. El módulo se regenera solo
+cuando cambia el .ui: primero se compara la fecha de modificación y, si el
+.ui es más nuevo, el hash de su contenido (guardado en la cabecera del
+módulo). Antes de compilar se aplican las correcciones Qt6 → Qt5 de
+fix_qt_syntax.py
+
+Uso:
+    python ui_compiler.py    # Fuerza la regeneración
+"""
+
+import hashlib
+import importlib.util
+import io
+import os
+import sys
+
+from PyQt5 import uic
+
+from fix_qt_syntax import fix_qt_syntax_content
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+UI_PATH = os.path.join(BASE_DIR, "main_window.ui")
+COMPILED_PATH = os.path.join(BASE_DIR, "main_window_ui.py")
+
+_HASH_PREFIX = "# ui-sha256: "
+
+
+def _hash_guardado(py_path):
+    """Hash del .ui con el que se generó el módulo, o None"""
+    try:
+        with open(py_path, encoding="utf-8") as f:
+            first_line = f.readline()
+    except OSError:
+        return None
+    if first_line.startswith(_HASH_PREFIX):
+        return first_line[len(_HASH_PREFIX):].strip()
+    return None
+
+
+def compilar_ui(ui_path=UI_PATH, py_path=COMPILED_PATH, force=False):
+    """
+    Genera py_path a partir de ui_path si hace falta
+    
+    Args:
+        ui_path: Archivo .ui de Qt Designer
+        py_path: Módulo Python a generar
+        force: Regenerar aunque el .ui no haya cambiado
+    
+    Returns:
+        True si se regeneró el módulo
+    """
+    ui_mtime = os.path.getmtime(ui_path)
+    if not force and os.path.exists(py_path) and os.path.getmtime(py_path) >= ui_mtime:
+        return False
+    
+    with open(ui_path, encoding="utf-8") as f:
+        content = f.read()
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    if not force and _hash_guardado(py_path) == digest:
+        # Solo cambió la fecha (checkout, copia): se marca como actualizado
+        os.utime(py_path)
+        return False
+    
+    content, changes = fix_qt_syntax_content(content)
+    if changes:
+        print(f"🔧 {sum(count for _, _, count in changes)} referencias de Qt6 corregidas al compilar")
+    
+    out = io.StringIO()
+    uic.compileUi(io.StringIO(content), out)
+    tmp_path = py_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(f"{_HASH_PREFIX}{digest}\n")
+        f.write(out.getvalue())
+    os.replace(tmp_path, py_path)
+    print(f"🛠️  Interfaz compilada: {os.path.basename(py_path)}")
+    return True
+
+
+def _importar_modulo(py_path):
+    spec = importlib.util.spec_from_file_location("main_window_ui", py_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def cargar_ui(window, ui_path=UI_PATH, py_path=COMPILED_PATH):
+    """
+    Construye la interfaz en window, como uic.loadUi(ui_path, window)
+    
+    Los widgets quedan como atributos de window. Si no se puede compilar
+    (p. ej. directorio de solo lectura sin módulo generado) se usa loadUi
+    """
+    try:
+        compilar_ui(ui_path, py_path)
+        module = _importar_modulo(py_path)
+    except Exception as e:
+        print(f"⚠️  No se pudo usar la interfaz compilada ({e}); se carga {os.path.basename(ui_path)}")
+        uic.loadUi(ui_path, window)
+        return
+    
+    ui = module.Ui_MainWindow()
+    ui.setupUi(window)
+    for name, value in vars(ui).items():
+        setattr(window, name, value)
+
+
+if __name__ == "__main__":
+    compilar_ui(force=True)
+    sys.exit(0)
@@ -3,7 +3,7 @@ Estilos Winamp para la interfaz gráfica
 Este archivo contiene todos los estilos CSS para recrear la apariencia clásica de Winamp
 """
 
-from PyQt5.QtWidgets import QPushButton, QListWidget, QFrame, QProgressBar, QLabel, QLineEdit, QSlider
+from PyQt5.QtWidgets import QPushButton, QListView, QFrame, QProgressBar, QLabel, QLineEdit, QSlider
 
 # Estilos principales
 WINAMP_MAIN_STYLE = """
@@ -48,7 +48,7 @@ QPushButton:disabled {
 """
 
 WINAMP_LIST_STYLE = """
-QListWidget {
+QListView {
     background-color: #1a1a1a;
     border: 1px solid #404040;
     border-radius: 2px;
@@ -57,14 +57,14 @@ QListWidget {
     selection-background-color: #404040;
     selection-color: #ffffff;
 }
-QListWidget::item {
+QListView::item {
     padding: 2px 4px;
     border-bottom: 1px solid #2a2a2a;
 }
-QListWidget::item:selected {
+QListView::item:selected {
     background-color: #404040;
 }
-QListWidget::item:hover {
+QListView::item:hover {
     background-color: #303030;
 }
 """
@@ -172,7 +172,7 @@ def apply_winamp_theme_to_window(window):
     for child in window.findChildren(QPushButton):
         apply_winamp_style(child, "button")
     
-    for child in window.findChildren(QListWidget):
+    for child in window.findChildren(QListView):
         apply_winamp_style(child, "list")
     
     for child in window.findChildren(QFrame):